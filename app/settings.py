@@ -7,11 +7,56 @@ MAX_ATTEMPTS = 3 # n of max attempts until the script stops
 RETRY_DELAY = 2 # seconds between attempts
 LINE_WIDTH = 48 # 80mm line width
 
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", 20)) # seconds between order fetches (also while draining a backlog)
+CHECK_RETRY_DELAY = 10 # seconds before retrying failed system checks
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 10)) # seconds allowed for every API request (auth, orders, status updates)
+PRINTER_STATUS_INTERVAL = float(os.getenv("PRINTER_STATUS_INTERVAL", 0.5)) # seconds between printer status reads (paper, cover); 0 disables the monitor
+
+PICKUP_PRIORITY_ADVANCE = 15 * 60 # seconds a pickup is printed ahead of a delivery due at the same time
+PRIORITY_AGING = 0.5 # seconds of priority an order gains per second waiting in the queue
+PRIORITY_MAX_WAIT = 30 * 60 # seconds after which a queued order is printed first
+
 LOG_FILE = "log.txt"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text") # "text" or "json" (one JSON object per line)
+
+METRICS_PORT = os.getenv("METRICS_PORT") # serves /metrics on this port when set
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", 3600)) # seconds of each rolling percentile window
+LATE_PRINT_MARGIN = int(os.getenv("LATE_PRINT_MARGIN", 900)) # seconds before delivery_time under which a print is late
+
+PROFILE_SECONDS = int(os.getenv("PROFILE_SECONDS", 0)) # profile this many seconds from startup (0 = off)
+PROFILE_WINDOW = 60 # seconds profiled when started from the tray menu
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.01)) # seconds between stack samples
+
+SITE_NAME = os.getenv("SITE_NAME", "default") # name of this site in logs and metrics
+SITES_FILE = os.getenv("SITES_FILE") # JSON file with several sites, enables multi-site mode
+SITE_WORKERS = int(os.getenv("SITE_WORKERS", 4)) # threads shared by all sites in multi-site mode
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10)) # kept-alive connections per host
+ENGINE = os.getenv("ENGINE", "threaded") # "threaded" (ScriptController) or "async" (AsyncScriptController)
+SOUND_ALERT = os.getenv("SOUND_ALERT", "auto") # "auto", "winsound", "bell" or "none"
+HEADLESS = os.getenv("HEADLESS", "") == "1" # run without the tray icon (also: python main.py --headless)
+CONTROL_PORT = os.getenv("CONTROL_PORT") # local control API (status, start/stop, reprint, health), 8765 when headless
+CONTROL_HOST = os.getenv("CONTROL_HOST", "127.0.0.1") # local only by default, the API has no authentication
+RECENT_RECEIPTS = int(os.getenv("RECENT_RECEIPTS", 500)) # rendered receipts kept for reprints, oldest dropped first
+RECEIPTS_TTL = float(os.getenv("RECEIPTS_TTL", 24 * 3600)) # seconds a receipt can be reprinted
+RECEIPTS_DIR = os.getenv("RECEIPTS_DIR", "receipts") # receipts directory (one subdirectory per site), "" keeps them in memory only
+OFFLINE_DIR = os.getenv("OFFLINE_DIR", "offline") # journal of fetched orders and pending acknowledgements (one subdirectory per site), "" keeps it in memory only
+DEDUP_TTL = float(os.getenv("DEDUP_TTL", 7 * 24 * 3600)) # seconds a printed order is remembered, so it is not printed twice if listed again
+DEDUP_CAPACITY = int(os.getenv("DEDUP_CAPACITY", 20000)) # printed orders remembered, oldest dropped first
+ORDER_SOURCE = os.getenv("ORDER_SOURCE", "api") # "api" or "synthetic" (generated orders, for load and soak tests)
+SYNTHETIC_BATCH = int(os.getenv("SYNTHETIC_BATCH", 10)) # new synthetic orders per poll
+SYNTHETIC_SEED = int(os.getenv("SYNTHETIC_SEED", 0)) # seed of the synthetic order generator
+RECORD_FILE = os.getenv("RECORD_FILE") # append HTTP responses and printer bytes to this .jsonl.gz file (see benchmarks/replay.py)
+DRY_RUN = os.getenv("DRY_RUN", "") == "1" # every printer is replaced by an in-memory sink, nothing reaches the paper
 
 BASE_URL = os.getenv("BASE_URL")
 PRINTER_IP = os.getenv("PRINTER_IP")
 PRINTER_PORT = os.getenv("PRINTER_PORT")
+PRINTER_SINK = os.getenv("PRINTER_SINK") # sink URL of the site printer (usb://, serial://, file://, spool://, memory://), default network://PRINTER_IP:PRINTER_PORT
+STATION_PRINTERS = os.getenv("STATION_PRINTERS", "") # kitchen stations, e.g. "grill=192.168.1.30,drinks=192.168.1.31:9100"
+CATEGORY_STATIONS = os.getenv("CATEGORY_STATIONS", "") # product category to station, e.g. "Grelhados=grill,Bebidas=drinks"
+STATION_WORKERS = 8 # threads sending kitchen tickets in parallel
 
 AUTH_URL = f'{BASE_URL}auth/'
 USERNAME = os.getenv("API_USERNAME")
@@ -20,5 +65,5 @@ PASSWORD = os.getenv("PASSWORD")
 ORDERS_URL = f'{BASE_URL}order/print-orders/'
 UPDATE_ORDER_URL = f'{BASE_URL}order/print-orders-status/' # add order.id
 
-CHECK_INTERNET_URL = "https://google.com/"
+CHECK_INTERNET_URL = os.getenv("CHECK_INTERNET_URL", "https://google.com/") # internet check, point it to a local mock in benchmarks
 CHECK_SERVER_HEALTH = f"{BASE_URL}app/health-check/"
\ No newline at end of file
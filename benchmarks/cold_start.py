@@ -0,0 +1,72 @@
+"""
+Measures cold-start time of the headless build against the tray build.
+
+Each run starts a fresh interpreter that imports `main` and builds the controller; the tray
+variant also imports pystray and draws the first icon, as `run_tray` does. Neither variant
+starts the processing loop, so no network or printer is needed.
+
+Usage:
+    python -m benchmarks.cold_start [--runs 10] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEADLESS = """
+import os, tempfile
+import main
+from models.logger import Logger
+from controllers.script import ScriptController
+ScriptController(logger=Logger(os.path.join(tempfile.mkdtemp(), "cold_start.log")))
+"""
+
+TRAY = HEADLESS + """
+import pystray
+main.create_image('gray')
+"""
+
+
+def measure(code: str, runs: int) -> dict:
+    """
+    Runs `code` in `runs` fresh interpreters and returns the wall-clock times in seconds.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1]}
+        times.append(elapsed)
+    return {"runs": runs, "min_seconds": min(times), "median_seconds": statistics.median(times),
+            "max_seconds": max(times)}
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Tempo de arranque a frio: headless vs tray.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="Ficheiro JSON para os resultados (stdout por omissão)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "interpreter": measure("pass", args.runs),
+        "headless": measure(HEADLESS, args.runs),
+        "tray": measure(TRAY, args.runs)
+    }
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
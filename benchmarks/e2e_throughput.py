@@ -0,0 +1,177 @@
+"""
+End-to-end throughput of the real controller against a mock backend and a mock printer.
+
+For every combination of backlog size, network latency and failure rates, the mocks
+(benchmarks/mocks.py) are started in a child process with that many pending orders and the
+controller is run until every order is acknowledged, it stops on a critical error or the
+timeout expires. The run reports orders per minute, the per-order latency (from the start of
+the run to the acknowledgement), when the last receipt reached the printer and the CPU time
+and memory of the controller process.
+
+Usage:
+    python -m benchmarks.e2e_throughput [--engine threaded|async] [--backlog 10 100]
+        [--latency-ms 0 50] [--fetch-failure-rate 0] [--ack-failure-rate 0 0.05]
+        [--items 3] [--timeout 120] [--seed 0] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import importlib
+import contextlib
+import itertools
+import multiprocessing
+import urllib.request
+from datetime import datetime
+
+from benchmarks.mocks import serve_mocks
+
+# The controller modules read the settings on import, so they are imported by `run` after
+# `main` has pointed CHECK_INTERNET_URL to the mock backend and set OFFLINE_DIR and RECEIPTS_DIR
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory_mb() -> dict:
+    """Current and peak resident memory of this process in MB (None where unavailable)."""
+    current = peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    except ImportError:
+        pass
+    return {"rss_mb": current, "peak_rss_mb": peak}
+
+
+def run(engine: str, backlog: int, items: int, latency_ms: float, fetch_failure_rate: float,
+        ack_failure_rate: float, timeout: float, seed: int, ports: tuple) -> dict:
+    """
+    Runs the controller once against fresh mocks.
+
+    Returns:
+        dict: Configuration and results of the run.
+    """
+    from models.site import Site
+    from models.logger import Logger
+    from services.alerts import SilentAlert
+    from utils.quantiles import QuantileSketch
+
+    config = {"engine": engine, "backlog": backlog, "items": items, "latency_ms": latency_ms,
+              "fetch_failure_rate": fetch_failure_rate, "ack_failure_rate": ack_failure_rate, "seed": seed}
+
+    parent, child = multiprocessing.Pipe()
+    mocks = multiprocessing.Process(target=serve_mocks, daemon=True, args=(
+        {"backlog": backlog, "items": items, "latency": latency_ms / 1000, "fetch_failure_rate": fetch_failure_rate,
+         "ack_failure_rate": ack_failure_rate, "seed": seed, "port": ports[0], "printer_port": ports[1]}, child))
+    mocks.start()
+    endpoints = parent.recv()
+
+    if engine == "async":
+        from controllers.async_script import AsyncScriptController as Controller
+    else:
+        from controllers.script import ScriptController as Controller
+
+    site = Site(name="benchmark", base_url=endpoints["backend_url"], username="benchmark", password="benchmark",
+                printer_ip="127.0.0.1", printer_port=endpoints["printer_port"])
+    controller = Controller(site, Logger(os.path.join(tempfile.mkdtemp(), "e2e.log")), sound=SilentAlert())
+
+    cpu_start = time.process_time()
+    start = time.time()
+    controller.start_script()
+    while True:
+        with urllib.request.urlopen(endpoints["backend_url"] + "_stats") as response:
+            stats = json.load(response)
+        if len(stats["acks"]) >= backlog or time.time() - start > timeout or not controller.running:
+            break
+        time.sleep(0.1)
+    cpu_seconds = time.process_time() - cpu_start
+    wall = time.time() - start
+    stopped_by_error = not controller.running
+    status = controller.status_message
+    controller.stop_script()
+
+    parent.send("stop")
+    printer = parent.recv()
+    mocks.join(timeout=5)
+
+    acks = sorted(ack - start for ack in stats["acks"].values())
+    elapsed = acks[-1] if len(acks) >= backlog else wall
+    sketch = QuantileSketch()
+    for seconds in acks:
+        sketch.add(seconds * 1000)
+
+    return {
+        "config": config,
+        "results": {
+            "acknowledged": len(acks),
+            "printed": printer["printed"],
+            "completed": len(acks) >= backlog,
+            "stopped_by_error": stopped_by_error,
+            "status": status,
+            "elapsed_seconds": elapsed,
+            "last_print_seconds": printer["last_print"] - start if printer["last_print"] else None,
+            "orders_per_minute": len(acks) / elapsed * 60 if elapsed else None,
+            "latency_ms": sketch.summary(),
+            "cpu_seconds": cpu_seconds,
+            "cpu_percent": cpu_seconds / wall * 100,
+            "http_requests": printer["requests"],
+            **memory_mb()
+        }
+    }
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Débito ponta a ponta do controlador contra mocks locais.")
+    parser.add_argument("--engine", choices=["threaded", "async"], default="threaded")
+    parser.add_argument("--backlog", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0])
+    parser.add_argument("--fetch-failure-rate", type=float, nargs="+", default=[0])
+    parser.add_argument("--ack-failure-rate", type=float, nargs="+", default=[0])
+    parser.add_argument("--items", type=int, default=3, help="Produtos por pedido")
+    parser.add_argument("--timeout", type=float, default=120, help="Segundos máximos por execução")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Ficheiro JSON para os resultados (stdout por omissão)")
+    args = parser.parse_args(argv)
+
+    ports = (free_port(), free_port())
+    os.environ["CHECK_INTERNET_URL"] = f"http://127.0.0.1:{ports[0]}/app/health-check/"
+    os.environ["OFFLINE_DIR"] = ""  # Journal in memory, orders of earlier runs must not be acknowledged again
+    os.environ["RECEIPTS_DIR"] = ""  # Receipts in memory, disk writes must not count in the results
+
+    # Load the lazily imported modules now, so the first run doesn't pay for them
+    for module in ("escpos.printer", "requests", "controllers.script", "controllers.async_script"):
+        importlib.import_module(module)
+
+    # Keep anything the controller prints to stdout (the authentication does) out of the JSON output
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        runs = [run(args.engine, backlog, args.items, latency, fetch_rate, ack_rate, args.timeout, args.seed, ports)
+                for backlog, latency, fetch_rate, ack_rate in itertools.product(
+                    args.backlog, args.latency_ms, args.fetch_failure_rate, args.ack_failure_rate)]
+    results = {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+               "runs": runs}
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(text)
+    print(text)
+    # Threads of the threaded controller keep sleeping after stop_script returns, don't wait for them
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
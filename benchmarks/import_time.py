@@ -0,0 +1,100 @@
+"""
+Startup import-time budget.
+
+Imports `main` and the default controller in fresh interpreters with `python -X importtime`
+and fails when the median import time exceeds the budget, or when a module that should load
+lazily (escpos, requests, pystray, ...) is imported at startup. The budget and the lazy modules
+are stored in benchmarks/baselines/import_time.json; the budget is machine-dependent, so pass
+--budget-ms to override it on slower hardware.
+
+Usage:
+    python -m benchmarks.import_time [--runs 5] [--budget-ms 400] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "import_time.json")
+
+STARTUP = "import main; from controllers.script import ScriptController"
+
+
+def import_times(code: str) -> list:
+    """
+    Runs `code` with -X importtime and returns its imports as (module, depth, self_us, cumulative_us).
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure(code: str) -> dict:
+    """
+    Import time of `code` alone: the imports done by the interpreter itself (site, encodings, ...)
+    are excluded.
+    """
+    interpreter = {name for name, depth, _, _ in import_times("pass") if depth == 0}
+    imports = import_times(code)
+
+    # -X importtime prints the children of an import before it, group them under their top-level import
+    own, group = [], []
+    for entry in imports:
+        group.append(entry)
+        if entry[1] == 0:
+            if entry[0] not in interpreter:
+                own.extend(group)
+            group = []
+
+    return {
+        "total_ms": sum(cumulative for _, depth, _, cumulative in own if depth == 0) / 1000,
+        "modules": {name for name, *_ in own},
+        "slowest": sorted(((name, cumulative / 1000) for name, _, _, cumulative in own),
+                          key=lambda item: item[1], reverse=True)[:10]
+    }
+
+
+def main(argv: list = None) -> int:
+    with open(BASELINE, "r", encoding="UTF-8") as f:
+        baseline = json.load(f)
+
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de import no arranque.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=baseline["budget_ms"])
+    parser.add_argument("--output", help="Ficheiro JSON para os resultados (stdout por omissão)")
+    args = parser.parse_args(argv)
+
+    runs = [measure(STARTUP) for _ in range(args.runs)]
+    median_ms = statistics.median(run["total_ms"] for run in runs)
+    eager = sorted(name for name in runs[0]["modules"]
+                   if any(name == lazy or name.startswith(lazy + ".") for lazy in baseline["forbidden"]))
+
+    results = {
+        "median_ms": median_ms,
+        "budget_ms": args.budget_ms,
+        "slowest_ms": dict(runs[0]["slowest"]),
+        "eager_lazy_modules": eager,
+        "passed": median_ms <= args.budget_ms and not eager
+    }
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(text)
+    print(text)
+    return 0 if results["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Micro-benchmarks of the CPU-bound render and parse paths, with regression gates.
+
+Each case is timed with `timeit` (best of --repeat rounds, in microseconds per call) over inputs
+parameterised by the number of products, the note length and accented text, and compared with
+benchmarks/baselines/micro.json: a case slower than `threshold` times its baseline fails the run.
+Baselines are machine-dependent, refresh them on the reference machine with --update-baseline.
+
+Usage:
+    python -m benchmarks.micro [--filter print_order] [--repeat 5] [--threshold 1.5]
+        [--update-baseline] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import timeit
+import argparse
+import itertools
+import tempfile
+
+from app.settings import LINE_WIDTH
+from models.order import OrderDto
+from models.logger import Logger
+from utils.strings import wrapper, calculated_space_between
+from services.printer import print_order
+from services.sinks import MemorySink
+from benchmarks.mocks import order_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "micro.json")
+
+ITEMS = (1, 10, 50)
+NOTE_LENGTHS = (0, 200)
+TEXT_LENGTHS = (LINE_WIDTH, 500)
+
+PLAIN = "sem cebola e com molho a parte por favor bem passado "
+ACCENTED = "Atenção: pão sem glúten, açúcar à parte, feijão não, molho é à parte "
+
+
+def text(length: int, accented: bool) -> str:
+    sample = ACCENTED if accented else PLAIN
+    return (sample * (length // len(sample) + 1))[:length]
+
+
+def order_data(items: int, note_length: int, accented: bool) -> dict:
+    data = order_json(1, items)
+    for product in data["order_products"]:
+        product["note"] = text(note_length, accented)
+        if not accented:
+            product["product_name"] = "Picanha a Brasileira"
+            product["product_accompaniment"] = "Arroz e feijao preto"
+    return data
+
+
+def fresh(order: OrderDto) -> OrderDto:
+    """Drops the cached domain models, so every call converts the order again."""
+    order._domain = None
+    return order
+
+
+def cases() -> dict:
+    """
+    Returns the benchmark cases: name -> function without arguments.
+    """
+    logger = Logger(os.path.join(tempfile.mkdtemp(), "micro.log"))
+    printer = MemorySink()
+    result = {}
+
+    for length, accented in itertools.product(TEXT_LENGTHS, (False, True)):
+        suffix = f'len={length},accented={accented}'
+        s = text(length, accented)
+        result[f'wrapper[{suffix}]'] = lambda s=s: wrapper(s)
+        left = text(length // 2, accented)
+        result[f'calculated_space_between[{suffix}]'] = lambda left=left: calculated_space_between(left, "12.5 EUR")
+
+    for items, note_length, accented in itertools.product(ITEMS, NOTE_LENGTHS, (False, True)):
+        suffix = f'items={items},note={note_length},accented={accented}'
+        data = order_data(items, note_length, accented)
+        order = OrderDto(**data)
+        result[f'order_validation[{suffix}]'] = lambda data=data: OrderDto(**data)
+        result[f'manipulate_orderDto[{suffix}]'] = lambda order=order: fresh(order).manipulate_orderDto()
+        result[f'print_order[{suffix}]'] = lambda order=order: print_order(fresh(order), printer, logger)
+
+    return result
+
+
+def measure(func: callable, repeat: int) -> float:
+    """Best time of one call in microseconds, over `repeat` rounds of about 0.2 seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main(argv: list = None) -> int:
+    baseline = {"threshold": 1.5, "cases": {}}
+    if os.path.exists(BASELINE):
+        with open(BASELINE, "r", encoding="UTF-8") as f:
+            baseline = json.load(f)
+
+    parser = argparse.ArgumentParser(description="Micro-benchmarks das funções de render e parse.")
+    parser.add_argument("--filter", default="", help="Só corre os casos cujo nome contém este texto")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=baseline["threshold"],
+                        help="Razão máxima entre o tempo medido e a baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Grava os tempos medidos como baseline")
+    parser.add_argument("--output", help="Ficheiro JSON para os resultados (stdout por omissão)")
+    args = parser.parse_args(argv)
+
+    results, regressions = {}, []
+    for name, func in cases().items():
+        if args.filter not in name:
+            continue
+        us = measure(func, args.repeat)
+        reference = baseline["cases"].get(name)
+        ratio = us / reference if reference else None
+        results[name] = {"us": round(us, 3), "baseline_us": reference, "ratio": ratio and round(ratio, 3)}
+        if ratio is not None and ratio > args.threshold:
+            regressions.append(name)
+
+    if args.update_baseline:
+        baseline["cases"].update({name: result["us"] for name, result in results.items()})
+        with open(BASELINE, "w", encoding="UTF-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+
+    text_output = json.dumps({"threshold": args.threshold, "cases": results, "regressions": regressions}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(text_output)
+    print(text_output)
+    return 1 if regressions and not args.update_baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
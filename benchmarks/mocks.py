@@ -0,0 +1,242 @@
+"""
+Local mocks of the order backend and of a network ESC/POS printer, for benchmarks.
+
+Both run in a child process (`serve_mocks`) so their CPU time does not count against the
+controller being measured.
+"""
+
+import json
+import time
+import random
+import socket
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ESC/POS real-time status request (DLE EOT n) and the answers of a ready printer, by n
+RT_STATUS = b'\x10\x04'
+RT_ONLINE = b'\x12'
+RT_ANSWERS = {
+    "ready": {1: 0x12, 2: 0x12, 3: 0x12, 4: 0x12},
+    "paper_out": {1: 0x1a, 2: 0x32, 3: 0x12, 4: 0x72},   # offline, stopped by paper end, no paper
+    "cover_open": {1: 0x1a, 2: 0x16, 3: 0x12, 4: 0x12}   # offline, cover open
+}
+CUT = b'\x1dV'
+
+
+def order_json(order_id: int, items: int = 3, rng: random.Random = None) -> dict:
+    """Builds an order as returned by `order/print-orders/`."""
+    rng = rng or random.Random(order_id)
+    now = datetime.now()
+    pickup = rng.random() < 0.3
+    return {
+        "id": order_id,
+        "customer": "João Gonçalves",
+        "email": "joao@example.com",
+        "nif": 123456789,
+        "full_address": "" if pickup else f"Rua da Alegria {rng.randint(1, 500)}, 4000-000 Porto",
+        "locality_name": None if pickup else "Porto",
+        "indication": None,
+        "phone_number": "912345678",
+        "delivery_time": (now + timedelta(minutes=rng.randint(15, 120))).isoformat(),
+        "created": now.isoformat(),
+        "order_products": [
+            {
+                "category": rng.choice(["Grelhados", "Bebidas", "Sobremesas"]),
+                "product_name": f"Picanha à Brasileira {k}",
+                "product_accompaniment": "Arroz e feijão preto",
+                "purchased_with_points": False,
+                "quantity": rng.randint(1, 3),
+                "points": 0,
+                "price": 12.5,
+                "note": "sem cebola" if rng.random() < 0.3 else ""
+            }
+            for k in range(items)
+        ],
+        "total_price": 12.5 * items,
+        "printed": False
+    }
+
+
+class MockBackend:
+    """
+    Mock of the API: auth/, order/print-orders/, order/print-orders-status/<id>/ and app/health-check/.
+
+    Attributes:
+        pending (dict): Orders not acknowledged yet, by id.
+        acks (dict): Acknowledged order id -> Unix time of the acknowledgement.
+        latency (float): Seconds added to every response.
+        fetch_failure_rate (float): Probability of answering a fetch with HTTP 500.
+        ack_failure_rate (float): Probability of answering an acknowledgement with HTTP 500.
+        ack_delay (float): Seconds an acknowledged order is still listed as pending (slow backend).
+        down (bool): True to close every connection without answering (network outage).
+    """
+
+    def __init__(self, backlog: int, items: int = 3, latency: float = 0, fetch_failure_rate: float = 0,
+                 ack_failure_rate: float = 0, ack_delay: float = 0, seed: int = 0, port: int = 0):
+        rng = random.Random(seed)
+        self.pending = {i: order_json(i, items, rng) for i in range(1, backlog + 1)}
+        self.acks = {}
+        self.requests = 0
+        self.latency = latency
+        self.fetch_failure_rate = fetch_failure_rate
+        self.ack_failure_rate = ack_failure_rate
+        self.ack_delay = ack_delay
+        self.applying = {}  # Acknowledged order id -> Unix time it stops being listed
+        self.down = False
+        self.rng = random.Random(seed + 1)
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self.handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.url = f'http://127.0.0.1:{self.port}/'
+
+    def fails(self, rate: float) -> bool:
+        with self.lock:
+            return self.rng.random() < rate
+
+    def handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def reply(self, code: int, data):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def begin(self) -> bool:
+                """False if the backend is down, in which case the connection is closed unanswered."""
+                if backend.down:
+                    self.close_connection = True
+                    return False
+                with backend.lock:
+                    backend.requests += 1
+                if backend.latency:
+                    time.sleep(backend.latency)
+                return True
+
+            def do_GET(self):
+                if self.path.startswith("/_stats"):
+                    with backend.lock:
+                        self.reply(200, {"acks": backend.acks, "pending": len(backend.pending),
+                                         "requests": backend.requests})
+                    return
+
+                if not self.begin():
+                    return
+                if self.path.startswith("/order/print-orders/"):
+                    if backend.fails(backend.fetch_failure_rate):
+                        self.reply(500, {"detail": "mock failure"})
+                        return
+                    with backend.lock:
+                        now = time.time()
+                        for order_id in [i for i, moment in backend.applying.items() if moment <= now]:
+                            del backend.applying[order_id]
+                            backend.pending.pop(order_id, None)
+                        orders = list(backend.pending.values())
+                    self.reply(200, orders)
+                else:
+                    self.reply(200, {"status": "ok"})  # health check and internet check
+
+            def do_POST(self):
+                if not self.begin():
+                    return
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.reply(200, {"access": "mock-token"})
+
+            def do_PUT(self):
+                if not self.begin():
+                    return
+                if backend.fails(backend.ack_failure_rate):
+                    self.reply(500, {"detail": "mock failure"})
+                    return
+                order_id = int(self.path.rstrip("/").split("/")[-1])
+                with backend.lock:
+                    if backend.ack_delay:
+                        backend.applying.setdefault(order_id, time.time() + backend.ack_delay)
+                    else:
+                        backend.pending.pop(order_id, None)
+                    backend.acks.setdefault(order_id, time.time())
+                self.reply(200, {})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+class MockPrinter:
+    """
+    TCP printer answering the real-time status requests and counting the received receipts.
+
+    Attributes:
+        state (str): "ready", "paper_out" or "cover_open" (see RT_ANSWERS).
+    """
+
+    def __init__(self, port: int = 0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", port))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.bytes = 0
+        self.cuts = 0
+        self.last_cut = None  # time.time() of the last receipt received
+        self.state = "ready"
+
+    def start(self):
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    def accept_loop(self):
+        while True:
+            connection, _ = self.sock.accept()
+            threading.Thread(target=self.client, args=(connection,), daemon=True).start()
+
+    def client(self, connection: socket.socket):
+        tail = b""
+        with connection:
+            while True:
+                data = connection.recv(65536)
+                if not data:
+                    return
+                if RT_STATUS in data:
+                    answers = RT_ANSWERS[self.state]
+                    requests = data.split(RT_STATUS)[1:]
+                    connection.sendall(bytes(answers.get(request[0] if request else 1, RT_ONLINE[0])
+                                             for request in requests))
+                self.bytes += len(data)
+                cuts = (tail + data).count(CUT) - tail.count(CUT)
+                if cuts:
+                    self.cuts += cuts
+                    self.last_cut = time.time()
+                tail = data[-1:]
+
+
+def serve_mocks(config: dict, connection):
+    """
+    Child process entry point: starts the mocks, sends their ports and waits for "stop", setting
+    the printer state on ("printer_state", state) messages and taking the backend down or up
+    on ("backend_down", bool) messages.
+
+    Args:
+        config (dict): MockBackend keyword arguments, plus "printer_port".
+        connection (multiprocessing.connection.Connection): Pipe to the parent process.
+    """
+    printer = MockPrinter(config.pop("printer_port", 0))
+    backend = MockBackend(**config)
+    backend.start()
+    printer.start()
+    connection.send({"backend_url": backend.url, "printer_port": printer.port})
+    while (message := connection.recv()) != "stop":
+        if isinstance(message, tuple) and message[0] == "printer_state":
+            printer.state = message[1]
+        elif isinstance(message, tuple) and message[0] == "backend_down":
+            backend.down = message[1]
+    connection.send({"printed": printer.cuts, "printer_bytes": printer.bytes, "last_print": printer.last_cut,
+                     "requests": backend.requests})
@@ -0,0 +1,315 @@
+"""
+Replays a recording (services/recorder.py, RECORD_FILE) against the real controller.
+
+A replay backend, started in a child process with a mock printer, answers every request with
+the response recorded for the same method and path at the corresponding moment of the
+recording, after the recorded response time: a fetch at replay time `x` gets the orders the API
+returned at `start of the recording + x * speed`. Orders acknowledged during the replay are
+removed from later fetches, so they are printed once even when the recording still lists them.
+
+The run reports orders per minute, the latency from an order first being served to its
+acknowledgement, CPU and memory, and compares the receipt bytes printed during the replay with
+the recorded ones, so optimisations can be checked on identical real workloads.
+
+Usage:
+    python -m benchmarks.replay recording.jsonl.gz [--speed 1] [--engine threaded|async]
+        [--timeout 3600] [--record replay.jsonl.gz] [--output results.json]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+import contextlib
+import multiprocessing
+import urllib.request
+from datetime import datetime
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.mocks import MockPrinter
+from benchmarks.e2e_throughput import free_port, memory_mb
+
+# The controller modules read the settings on import, so they are imported by `replay` after
+# `main` has set CHECK_INTERNET_URL, RECORD_FILE, OFFLINE_DIR and RECEIPTS_DIR
+
+ORDER_ID = re.compile(r"/(\d+)/?$")  # Order id at the end of a status update path
+
+
+def read_records(path: str, kind: str):
+    from services.recorder import read_recording
+    return (record for record in read_recording(path) if record["type"] == kind)
+
+
+class ReplayBackend:
+    """
+    HTTP server answering with the recorded responses, following the recording clock.
+
+    The recording is read as a stream: only the first and the latest response of every
+    (method, path) are kept.
+
+    Attributes:
+        speed (float): Replay speed, 2 replays one hour of recording in 30 minutes.
+        base_path (str): Path of the API base URL in the recording.
+        served (dict): Order id -> time it was first returned by a fetch.
+        acks (dict): Order id -> time of its successful acknowledgement.
+    """
+
+    def __init__(self, path: str, speed: float = 1, port: int = 0):
+        self.speed = speed
+        self.records = read_records(path, "http")
+        self.upcoming = next(self.records, None)
+        self.origin = self.upcoming["t"] if self.upcoming else 0
+        self.base_path, self.first = self.scan(path)
+        self.latest = {}
+        self.served = {}
+        self.acks = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.started = None
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self.handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}{self.base_path}"
+
+    @staticmethod
+    def scan(path: str) -> tuple:
+        """
+        Returns the path of the API base URL (from the first authentication request) and the first
+        response of every GET/POST path, used for requests made before the recording reaches one.
+        """
+        base_path, first = None, {}
+        for record in read_records(path, "http"):
+            url_path = urlsplit(record["url"]).path
+            if base_path is None and url_path.endswith("/auth/"):
+                base_path = url_path[:-len("auth/")]
+            if record["method"] != "PUT":
+                first.setdefault((record["method"], url_path), record)
+        return base_path or "/", first
+
+    def advance(self):
+        """Applies the records up to the current recording time."""
+        clock = self.origin + (time.time() - self.started) * self.speed
+        while self.upcoming is not None and self.upcoming["t"] <= clock:
+            record = self.upcoming
+            self.latest[(record["method"], urlsplit(record["url"]).path)] = record
+            self.upcoming = next(self.records, None)
+
+    def respond(self, method: str, path: str) -> tuple:
+        """
+        Returns the (status, body, delay) to answer a request with.
+        """
+        with self.lock:
+            self.requests += 1
+            self.advance()
+            record = self.latest.get((method, path)) or self.first.get((method, path))
+            status = record["status"] if record else 200
+            body = (record["body"] if record else None) or ("[]" if method == "GET" else "{}")
+            delay = (record["elapsed"] or 0) / self.speed if record else 0
+
+            if method == "GET" and body.startswith("["):
+                orders = [order for order in json.loads(body) if order.get("id") not in self.acks]
+                for order in orders:
+                    self.served.setdefault(order.get("id"), time.time())
+                body = json.dumps(orders, ensure_ascii=False)
+            match = ORDER_ID.search(path)
+            if method == "PUT" and match and status == 200:
+                self.acks.setdefault(int(match.group(1)), time.time())
+        return status, body, delay
+
+    def stats(self) -> dict:
+        with self.lock:
+            self.advance()
+            return {"finished": self.upcoming is None, "served": self.served, "acks": self.acks,
+                    "outstanding": len(self.served.keys() - self.acks.keys()), "requests": self.requests}
+
+    def handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def reply(self, method: str):
+                if self.path == "/_stats":
+                    status, body, delay = 200, json.dumps(backend.stats()), 0
+                else:
+                    status, body, delay = backend.respond(method, urlsplit(self.path).path)
+                time.sleep(delay)
+                data = body.encode("UTF-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self.reply("GET")
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.reply("POST")
+
+            def do_PUT(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.reply("PUT")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.started = time.time()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+def serve_replay(config: dict, connection):
+    """
+    Child process entry point: starts the replay backend and a mock printer, sends their
+    endpoints and waits for "stop".
+
+    Args:
+        config (dict): ReplayBackend keyword arguments, plus "printer_port".
+        connection (multiprocessing.connection.Connection): Pipe to the parent process.
+    """
+    printer = MockPrinter(config.pop("printer_port", 0))
+    backend = ReplayBackend(**config)
+    printer.start()
+    backend.start()
+    connection.send({"backend_url": backend.url, "printer_port": printer.port})
+    while connection.recv() != "stop":
+        pass
+    connection.send({"printed": printer.cuts, "printer_bytes": printer.bytes, "requests": backend.requests})
+
+
+def printed_hashes(path: str) -> dict:
+    """(order id, station) -> SHA-256 of the first bytes printed for it in a recording."""
+    hashes = {}
+    for record in read_records(path, "print"):
+        hashes.setdefault((record["order_id"], record["station"]), hashlib.sha256(record["data"].encode()).hexdigest())
+    return hashes
+
+
+def replay(path: str, engine: str, speed: float, timeout: float, ports: tuple, record_path: str) -> dict:
+    """
+    Runs the controller against the replayed recording until every served order is acknowledged
+    after the end of the recording, it stops on a critical error or the timeout expires.
+
+    Returns:
+        dict: Configuration and results of the run.
+    """
+    from models.site import Site
+    from models.logger import Logger
+    from services.alerts import SilentAlert
+    from services.recorder import get_recorder
+    from utils.quantiles import QuantileSketch
+
+    parent, child = multiprocessing.Pipe()
+    backend = multiprocessing.Process(target=serve_replay, daemon=True, args=(
+        {"path": path, "speed": speed, "port": ports[0], "printer_port": ports[1]}, child))
+    backend.start()
+    endpoints = parent.recv()
+
+    if engine == "async":
+        from controllers.async_script import AsyncScriptController as Controller
+    else:
+        from controllers.script import ScriptController as Controller
+
+    # Kitchen stations of the .env settings, all printing on the mock printer
+    stations = Site.from_settings()
+    site = Site(name="replay", base_url=endpoints["backend_url"], username="replay", password="replay",
+                printer_ip="127.0.0.1", printer_port=endpoints["printer_port"],
+                station_printers={name: f"127.0.0.1:{endpoints['printer_port']}" for name in stations.station_printers},
+                category_stations=stations.category_stations)
+    controller = Controller(site, Logger(os.path.join(tempfile.mkdtemp(), "replay.log")), sound=SilentAlert())
+
+    cpu_start = time.process_time()
+    start = time.time()
+    controller.start_script()
+    while True:
+        with urllib.request.urlopen(f"http://127.0.0.1:{ports[0]}/_stats") as response:
+            stats = json.load(response)
+        if (stats["finished"] and not stats["outstanding"]) or time.time() - start > timeout or not controller.running:
+            break
+        time.sleep(0.2)
+    cpu_seconds = time.process_time() - cpu_start
+    wall = time.time() - start
+    stopped_by_error = not controller.running
+    status = controller.status_message
+    controller.stop_script()
+
+    parent.send("stop")
+    printer = parent.recv()
+    backend.join(timeout=5)
+
+    sketch = QuantileSketch()
+    for order_id, acked in stats["acks"].items():
+        if order_id in stats["served"]:
+            sketch.add((acked - stats["served"][order_id]) * 1000)
+
+    get_recorder().close()
+    expected, replayed = printed_hashes(path), printed_hashes(record_path)
+    receipts = [key for key in expected if key[1] is None]
+
+    return {
+        "config": {"recording": path, "engine": engine, "speed": speed},
+        "results": {
+            "served": len(stats["served"]),
+            "acknowledged": len(stats["acks"]),
+            "printed": printer["printed"],
+            "completed": stats["finished"] and not stats["outstanding"],
+            "stopped_by_error": stopped_by_error,
+            "status": status,
+            "elapsed_seconds": wall,
+            "orders_per_minute": len(stats["acks"]) / wall * 60 if wall else None,
+            "ack_latency_ms": sketch.summary(),
+            "cpu_seconds": cpu_seconds,
+            "cpu_percent": cpu_seconds / wall * 100,
+            "http_requests": printer["requests"],
+            "receipts": {
+                "recorded": len(receipts),
+                "identical": sum(1 for key in receipts if replayed.get(key) == expected[key]),
+                "different": sum(1 for key in receipts if key in replayed and replayed[key] != expected[key]),
+                "missing": sum(1 for key in receipts if key not in replayed)
+            },
+            **memory_mb()
+        }
+    }
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Reproduz uma gravação (RECORD_FILE) contra o controlador.")
+    parser.add_argument("recording", help="Ficheiro .jsonl.gz gravado com RECORD_FILE")
+    parser.add_argument("--speed", type=float, default=1, help="Velocidade da reprodução (2 = duas vezes mais rápido)")
+    parser.add_argument("--engine", choices=["threaded", "async"], default="threaded")
+    parser.add_argument("--timeout", type=float, default=3600, help="Segundos máximos da reprodução")
+    parser.add_argument("--record", help="Guardar a gravação da reprodução neste ficheiro")
+    parser.add_argument("--output", help="Ficheiro JSON para os resultados (stdout por omissão)")
+    args = parser.parse_args(argv)
+    if args.speed <= 0:
+        parser.error("--speed tem de ser positivo")
+
+    ports = (free_port(), free_port())
+    record_path = args.record or os.path.join(tempfile.mkdtemp(), "replay.jsonl.gz")
+    os.environ["RECORD_FILE"] = record_path
+    os.environ["CHECK_INTERNET_URL"] = f"http://127.0.0.1:{ports[0]}/_stats"
+    os.environ["OFFLINE_DIR"] = ""  # Journal in memory, orders of earlier runs must not be acknowledged again
+    os.environ["RECEIPTS_DIR"] = ""  # Receipts in memory, disk writes must not count in the results
+
+    # Keep anything the controller prints to stdout (the authentication does) out of the JSON output
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result = replay(args.recording, args.engine, args.speed, args.timeout, ports, record_path)
+    result["timestamp"] = datetime.now().isoformat(timespec="seconds")
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(text)
+    print(text)
+    # Threads of the threaded controller keep sleeping after stop_script returns, don't wait for them
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Measures how long `stop_script` takes while the controller waits between polling cycles,
+for the threaded ScriptController and for AsyncScriptController.
+
+Each processing cycle is replaced by an idle one (no network, no printer), so only the
+shutdown path is measured.
+
+Usage:
+    python -m benchmarks.shutdown_latency [--runs 3] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+from app.settings import POLL_INTERVAL
+from models.logger import Logger
+from controllers.script import ScriptController
+from controllers.async_script import AsyncScriptController
+
+
+def measure_threaded(logger: Logger) -> dict:
+    controller = ScriptController(logger=logger)
+    controller.run_cycle = lambda: POLL_INTERVAL
+    controller.start_script()
+    time.sleep(0.2)  # let the worker reach its sleep
+    start = time.perf_counter()
+    controller.stop_script()
+    return {"stop_seconds": time.perf_counter() - start, "thread_alive_after_stop": controller.thread.is_alive()}
+
+
+def measure_async(logger: Logger) -> dict:
+    controller = AsyncScriptController(logger=logger)
+
+    async def idle_cycle():
+        return POLL_INTERVAL
+
+    controller.run_cycle_async = idle_cycle
+    controller.start_script()
+    time.sleep(0.2)
+    start = time.perf_counter()
+    controller.stop_script()
+    return {"stop_seconds": time.perf_counter() - start, "thread_alive_after_stop": controller.thread.is_alive()}
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Latência de paragem dos controladores.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="Ficheiro JSON para os resultados (stdout por omissão)")
+    args = parser.parse_args(argv)
+
+    logger = Logger(os.path.join(tempfile.mkdtemp(), "shutdown_latency.log"))
+    results = {
+        "threaded": [measure_threaded(logger) for _ in range(args.runs)],
+        "async": [measure_async(logger) for _ in range(args.runs)]
+    }
+    for name in ("threaded", "async"):
+        runs = results[name]
+        results[f"{name}_max_stop_seconds"] = max(run["stop_seconds"] for run in runs)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(text)
+    print(text)
+    # Threads of the threaded controller keep sleeping after stop_script returns, don't wait for them
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Soak test: the real controller fed with synthetic orders for a long period.
+
+The controller fetches from a `SyntheticOrderSource` (services/synthetic.py), which adds
+`--batch` new orders on every poll, and prints to the mock printer of benchmarks/mocks.py
+(the synthetic source needs no backend, the controller skips the network checks and the
+authentication). Every `--sample-interval` seconds one JSON line is written with the orders
+generated and acknowledged so far, the resident memory, the CPU usage and the acknowledgement
+latency of the controller, so memory and latency drift can be watched over hours. The final line
+summarises the drift: memory slope in MB per hour and the change of the latency p95 between the
+first and last quarter of the run.
+
+Usage:
+    python -m benchmarks.soak [--engine threaded|async] [--duration 3600] [--batch 10]
+        [--poll-interval 1] [--sample-interval 30] [--seed 0] [--output soak.jsonl]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+
+from benchmarks.mocks import serve_mocks
+from benchmarks.e2e_throughput import free_port, memory_mb
+
+# The controller modules read the settings on import, so they are imported by `soak` after
+# `main` has set POLL_INTERVAL, OFFLINE_DIR and RECEIPTS_DIR
+
+
+def slope(points: list[tuple]) -> float:
+    """Least squares slope of (x, y) points, None with less than two distinct x."""
+    n = len(points)
+    if n < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def quarter_mean(values: list, last: bool) -> float:
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    quarter = values[-max(1, len(values) // 4):] if last else values[:max(1, len(values) // 4)]
+    return sum(quarter) / len(quarter)
+
+
+def soak(engine: str, duration: float, batch: int, sample_interval: float, seed: int, ports: tuple, write) -> dict:
+    """
+    Runs the controller for `duration` seconds, calling `write` with every sample.
+
+    Returns:
+        dict: Drift summary of the run.
+    """
+    from models.site import Site
+    from models.logger import Logger
+    from services.alerts import SilentAlert
+    from services.synthetic import SyntheticOrderGenerator, SyntheticOrderSource
+
+    parent, child = multiprocessing.Pipe()
+    mocks = multiprocessing.Process(target=serve_mocks, daemon=True, args=(
+        {"backlog": 0, "seed": seed, "port": ports[0], "printer_port": ports[1]}, child))
+    mocks.start()
+    endpoints = parent.recv()
+
+    if engine == "async":
+        from controllers.async_script import AsyncScriptController as Controller
+    else:
+        from controllers.script import ScriptController as Controller
+
+    site = Site(name="soak", base_url=endpoints["backend_url"], username="soak", password="soak",
+                printer_ip="127.0.0.1", printer_port=endpoints["printer_port"])
+    source = SyntheticOrderSource(SyntheticOrderGenerator(seed), batch=batch)
+    controller = Controller(site, Logger(os.path.join(tempfile.mkdtemp(), "soak.log")), sound=SilentAlert(),
+                            source=source)
+
+    samples = []
+    start = time.time()
+    cpu_last, wall_last = time.process_time(), start
+    controller.start_script()
+    while time.time() - start < duration and controller.running:
+        time.sleep(min(sample_interval, max(0, duration - (time.time() - start))))
+        now, cpu = time.time(), time.process_time()
+        ack = controller.latency.summary()["ack"]["window"]
+        sample = {
+            "elapsed_s": round(now - start, 1),
+            "generated": source.generated,
+            "acknowledged": source.acknowledged,
+            "pending": len(source.pending),
+            "cpu_percent": round((cpu - cpu_last) / (now - wall_last) * 100, 1),
+            "ack_latency_s": {key: ack.get(key) for key in ("count", "p50", "p95", "p99")},
+            **memory_mb()
+        }
+        cpu_last, wall_last = cpu, now
+        samples.append(sample)
+        write(sample)
+
+    stopped_by_error = not controller.running
+    status = controller.status_message
+    controller.stop_script()
+    parent.send("stop")
+    printer = parent.recv()
+    mocks.join(timeout=5)
+
+    hours = [(sample["elapsed_s"] / 3600, sample["rss_mb"]) for sample in samples if sample["rss_mb"] is not None]
+    p95 = [sample["ack_latency_s"]["p95"] for sample in samples]
+    first, last = quarter_mean(p95, last=False), quarter_mean(p95, last=True)
+    return {
+        "summary": {
+            "engine": engine, "batch": batch, "seed": seed,
+            "elapsed_s": round(time.time() - start, 1),
+            "generated": source.generated,
+            "acknowledged": source.acknowledged,
+            "printed": printer["printed"],
+            "stopped_by_error": stopped_by_error,
+            "status": status,
+            "rss_slope_mb_per_hour": slope(hours),
+            "ack_p95_first_quarter_s": first,
+            "ack_p95_last_quarter_s": last,
+            "ack_p95_drift_s": last - first if first is not None and last is not None else None
+        }
+    }
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Teste de longa duração do controlador com pedidos sintéticos.")
+    parser.add_argument("--engine", choices=["threaded", "async"], default="threaded")
+    parser.add_argument("--duration", type=float, default=3600, help="Duração em segundos")
+    parser.add_argument("--batch", type=int, default=10, help="Pedidos novos por consulta")
+    parser.add_argument("--poll-interval", type=float, default=1, help="Segundos entre consultas")
+    parser.add_argument("--sample-interval", type=float, default=30, help="Segundos entre amostras")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Ficheiro JSON Lines para as amostras (além do stdout)")
+    args = parser.parse_args(argv)
+
+    ports = (free_port(), free_port())
+    os.environ["OFFLINE_DIR"] = ""  # Journal in memory, orders of earlier runs must not be acknowledged again
+    os.environ["RECEIPTS_DIR"] = ""  # Receipts in memory, disk writes must not count in the results
+    os.environ["POLL_INTERVAL"] = str(args.poll_interval)
+
+    stdout = sys.stdout
+    output = open(args.output, "w", encoding="UTF-8") if args.output else None
+
+    def write(data: dict):
+        line = json.dumps(data, ensure_ascii=False)
+        print(line, file=stdout, flush=True)
+        if output:
+            output.write(line + "\n")
+            output.flush()
+
+    # Keep anything the controller prints to stdout out of the samples
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        summary = soak(args.engine, args.duration, args.batch, args.sample_interval, args.seed, ports, write)
+    write(summary)
+    if output:
+        output.close()
+    # Threads of the threaded controller keep sleeping after stop_script returns, don't wait for them
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
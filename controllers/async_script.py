@@ -0,0 +1,598 @@
+"""
+asyncio-based alternative to ScriptController.
+
+The whole pipeline runs as tasks of one event loop (in a dedicated thread): HTTP calls use aiohttp,
+the printers are driven through asyncio streams and waits use `asyncio.sleep`, so `stop_script`
+cancels the running task immediately instead of waiting for a blocking call or a 20 seconds sleep.
+Orders print one at a time, in priority order (see PrintScheduler); only the receipt and the kitchen
+station tickets of one order are sent concurrently.
+"""
+
+import time
+import asyncio
+import threading
+
+from models.site import Site
+from models.logger import Logger
+from models.log_level import LogLevel
+from models.stage import Stage
+from models.event_type import EventType
+from models.error_type import ErrorType
+from models.order import OrderDto
+from models.printer_status import PrinterStatus
+from app.settings import (CHECK_INTERNET_URL, MAX_ATTEMPTS, RETRY_DELAY, POLL_INTERVAL, CHECK_RETRY_DELAY,
+                          PRINTER_STATUS_INTERVAL, REQUEST_TIMEOUT)
+from controllers.script import ScriptController
+from services.alerts import SoundAlert
+from services.events import EventBus
+from services.recorder import get_recorder
+from services.printer import render_order
+from services.stations import render_station_tickets
+from services.order_services import OrderSource, LOCAL_TOKEN
+from services.sinks import NetworkSink, create_sink
+from services.async_services import AsyncPrinter, AsyncSink, get_auth_tokens_async, check_url_async
+from services.metrics import RETRIES, QUEUE_DEPTH
+
+
+class AsyncScriptController(ScriptController):
+    """
+    Same start/stop/status API as ScriptController, backed by an asyncio event loop.
+
+    Status, alert sound, latency tracking and profiling are inherited from ScriptController.
+    """
+
+    def __init__(self, site: Site = None, logger: Logger = None, sound: SoundAlert = None, events: EventBus = None,
+                 source: OrderSource = None):
+        """
+        Initialize script control variables and resources.
+
+        Args:
+            site (Site): Site served by this controller. Defaults to the site of the .env settings
+            logger (Logger): Logger to use
+            sound (SoundAlert): Alert backend played on critical errors. Defaults to SOUND_ALERT
+            events (EventBus): Bus to publish on. By default a new bus feeding the metrics and the log
+            source (OrderSource): Where orders are fetched from and acknowledged. Defaults to ORDER_SOURCE
+        """
+        super().__init__(site, logger, sound, events, source)
+        self.loop = None                  # Event loop of the worker thread
+        self.task = None                  # Main task, cancelled on stop
+        self.session = None               # aiohttp session, open while running
+        self.printers = {}                # AsyncPrinter per (host, port)
+        self.ack_task = None              # Task sending the queued acknowledgements, see start_ack_flush_async
+        self.ack_wakeup_async = None      # Wakes the ack task while it waits to retry, created with the loop
+
+    def start_script(self):
+        """Start the event loop thread if not already running."""
+        if not self.running:
+            with self.lock:
+                self.stop_event.clear()
+                started = threading.Event()
+                self.thread = threading.Thread(target=self.run_event_loop, args=(started,), name="AsyncScriptController")
+                self.thread.start()
+                started.wait()
+                self.running = True
+
+    def stop_script(self):
+        """Cancel the main task and wait for the event loop to finish (usually a few milliseconds)."""
+        with self.lock:
+            if not self.running:
+                return
+            self.stop_event.set()
+            self.cancel_main_task()
+        if self.thread and self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout=5)
+        with self.lock:
+            self.running = False
+        self.stop_alert_sound()
+
+    def cancel_main_task(self):
+        if self.loop is not None and self.task is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.task.cancel)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def error_occurred(self, message: str, log_message: str):
+        """Handle critical errors like ScriptController, then cancel the running task."""
+        super().error_occurred(message, log_message)
+        self.cancel_main_task()
+
+    def run_event_loop(self, started: threading.Event):
+        """Thread target: run the main task in a fresh event loop until it ends or is cancelled."""
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.task = self.loop.create_task(self.main_loop_async())
+            started.set()
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.error_occurred(ErrorType.UNEXPECTED.value, f"Erro Inesperado: {str(e)}")
+        finally:
+            started.set()
+            self.loop.run_until_complete(self.close_printers())
+            self.loop.close()
+            self.cleanup_resources()
+
+    async def main_loop_async(self):
+        """Main processing loop: one cycle per POLL_INTERVAL until cancelled or stopped."""
+        try:
+            import aiohttp
+        except ImportError:
+            self.error_occurred(ErrorType.UNEXPECTED.value, "O modo assíncrono requer o pacote aiohttp.")
+            return
+
+        recorder = get_recorder()  # Records every response when RECORD_FILE is set
+        options = {"response_class": recorder.aiohttp_response_class()} if recorder else {}
+        monitor = None
+        self.ack_wakeup_async = asyncio.Event()
+        if PRINTER_STATUS_INTERVAL:
+            self.set_printer_status(await self.read_printer_status_async())  # Known before the first system checks
+            monitor = asyncio.create_task(self.monitor_printer_async())
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT), **options) as session:
+                self.session = session
+                while not self.stop_event.is_set():
+                    delay = await self.run_cycle_async()
+                    if delay and not self.stop_event.is_set():
+                        await asyncio.sleep(delay)
+        finally:
+            tasks = [task for task in (monitor, self.ack_task) if task is not None]
+            for task in tasks:
+                task.cancel()  # Unsent acknowledgements stay in the journal
+            await asyncio.gather(*tasks, return_exceptions=True)  # Finished before the loop is closed
+
+    async def monitor_printer_async(self):
+        """Read the printer state every PRINTER_STATUS_INTERVAL seconds until cancelled."""
+        while True:
+            await asyncio.sleep(PRINTER_STATUS_INTERVAL)
+            try:
+                self.set_printer_status(await self.read_printer_status_async())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.log(LogLevel.ERROR, f'Erro no monitor da impressora: {str(e)}', site=self.site.name)
+
+    async def read_printer_status_async(self) -> PrinterStatus:
+        """
+        Read the real-time state of the site printer, on the connection used to print (opened if needed).
+
+        Returns:
+            PrinterStatus: Current state, OFFLINE if the printer cannot be reached
+        """
+        printer = self.get_printer(self.site.printer_url)
+        async with printer.lock:
+            try:
+                if not printer.connected:
+                    await printer.connect()
+                if not printer.connected:
+                    return PrinterStatus.OFFLINE
+                return await printer.status()
+            except OSError:
+                return PrinterStatus.OFFLINE
+
+    async def wait_printer_ready_async(self) -> bool:
+        """
+        Wait while printing is paused, resuming as soon as the monitor sees the printer ready.
+
+        Returns:
+            bool: True when the printer is ready, False if a stop was requested while waiting
+        """
+        while not self.printer_ready.is_set():
+            if self.stop_event.is_set():
+                return False
+            await asyncio.sleep(0.1)
+        return not self.stop_event.is_set()
+
+    async def check_printer_async(self) -> bool:
+        """System check of the site printer. A paused printer is reachable, orders wait for it."""
+        return self.printer_paused or await self.get_printer(self.site.printer_url).connect()
+
+    async def run_stage_async(self, stage: Stage, coroutine_factory: callable, order_id: int = None,
+                              attempt: int = None, succeeded: callable = bool, printer: str = None):
+        """
+        Await one pipeline stage, timing it and recording its duration and outcome.
+
+        Args:
+            stage (Stage): Stage being executed
+            coroutine_factory (callable): Function without arguments returning the coroutine to await
+            order_id (int): Order being processed, if any
+            attempt (int): Attempt number (starting at 1), if the stage is retried
+            succeeded (callable): Maps the result to its success status
+            printer (str): Printer involved, defaults to the site printer
+
+        Returns:
+            The coroutine result. Exceptions (other than cancellation) are recorded and re-raised.
+        """
+        start = time.perf_counter()
+        try:
+            result = await coroutine_factory()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.record_stage(stage, time.perf_counter() - start, False, order_id, attempt, error=e, printer=printer)
+            raise
+
+        self.record_stage(stage, time.perf_counter() - start, succeeded(result), order_id, attempt, printer=printer)
+        return result
+
+    async def run_cycle_async(self) -> float:
+        """
+        Run one processing cycle: system checks, authentication, and order processing.
+        Without internet or server, the orders already fetched keep printing (see run_offline_cycle_async).
+        Sources without network (OrderSource.remote False) skip the internet, server and authentication stages.
+
+        Returns:
+            float: Seconds to wait before the next cycle
+        """
+        if not await self.run_stage_async(Stage.HEALTH_CHECK, self.perform_system_checks_async):
+            return CHECK_RETRY_DELAY
+
+        if self.source.remote:
+            if not await self.run_stage_async(Stage.HEALTH_CHECK, self.check_network_async):
+                return await self.run_offline_cycle_async()
+
+            auth_status, token, auth_error = await self.run_stage_async(
+                Stage.AUTH, lambda: get_auth_tokens_async(self.session, self.site), succeeded=lambda result: result[0])
+            if not auth_status:
+                if not await self.check_network_async():
+                    return await self.run_offline_cycle_async()  # Connection lost since the checks
+                self.error_occurred(ErrorType.AUTHENTICATION.value, auth_error)
+                return 0
+        else:
+            token = LOCAL_TOKEN  # Local source (synthetic orders): no network checks nor authentication
+
+        # Acknowledgements queued while offline, sent in the background while fetching
+        self.start_ack_flush_async(token)
+
+        try:
+            data = await self.request_pending_orders_async(token)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.log(LogLevel.WARNING, f'Erro ao pedir os pedidos, a imprimir os já recebidos: {str(e)}',
+                            site=self.site.name)
+            return await self.run_offline_cycle_async()
+
+        try:
+            orders = self.parse_pending_orders(data)
+            if orders and not await self.process_orders_async(orders, token):
+                return 0
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error_occurred(ErrorType.ORDER_PROCESSING.value, f'Erro pedidos: {str(e)}')
+            return 0
+
+        return POLL_INTERVAL
+
+    async def run_offline_cycle_async(self) -> float:
+        """
+        Print the orders fetched before the internet or the server became unreachable; their
+        acknowledgements wait in the journal outbox.
+
+        Returns:
+            float: Seconds to wait before the next cycle
+        """
+        self.set_network_online(False)
+        try:
+            orders = self.parse_pending_orders(self.journal.pending())
+            if orders and not await self.process_orders_async(orders, None):
+                return 0
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error_occurred(ErrorType.ORDER_PROCESSING.value, f'Erro pedidos: {str(e)}')
+            return 0
+        return min(POLL_INTERVAL, CHECK_RETRY_DELAY)
+
+    async def perform_system_checks_async(self) -> bool:
+        """
+        Execute the local prerequisite checks (the printer), stopping on the first failure.
+        Internet and server are checked by `check_network_async`, whose failure does not stop printing.
+
+        Returns:
+            bool: True if all checks pass, False otherwise
+        """
+        checks = [
+            # (check_coroutine_factory, error_message, log_message)
+            (self.check_printer_async, ErrorType.PRINTER_CONNECTION.value, "Sem conexão à impressora"),
+        ]
+
+        for check, err_msg, log_msg in checks:
+            try:
+                if not await check():
+                    self.error_occurred(err_msg, log_msg)
+                    return False
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.error_occurred(err_msg, f"{log_msg}: {str(e)}")
+                return False
+        return True
+
+    async def check_network_async(self) -> bool:
+        """
+        Check the internet connection and the site server, recording the result (see set_network_online).
+
+        Returns:
+            bool: True if both are reachable
+        """
+        try:
+            online = (await check_url_async(self.session, CHECK_INTERNET_URL) and
+                      await check_url_async(self.session, self.site.health_url))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            online = False
+        self.set_network_online(online)
+        return online
+
+    def reprint(self, order_id: int, printer: str = None) -> bool:
+        """
+        Print again one of the last receipts, on the site printer or on a kitchen station printer.
+        While running, the job goes through the event loop (and the printer connections it owns);
+        when stopped, through a blocking connection.
+        """
+        url = self.site.station_url(printer) if printer else self.site.printer_url
+        data = self.receipts.get(order_id)
+        loop = self.loop
+        if data is None or loop is None or loop.is_closed() or not self.running:
+            return super().reprint(order_id, printer)
+
+        async def send():
+            connection = self.get_printer(url)
+            async with connection.lock:
+                if not connection.connected and not await connection.connect():
+                    return False
+                await connection.send(data)
+            self.record_print(url, data, order_id, printer)
+            return True
+
+        self.logger.log(LogLevel.INFO, f'Reimpressão do pedido n {order_id}', order_id=order_id, site=self.site.name,
+                        printer=url)
+        try:
+            return asyncio.run_coroutine_threadsafe(send(), loop).result(timeout=30)
+        except Exception as e:
+            self.logger.log(LogLevel.ERROR, f'Erro na reimpressão do pedido n {order_id} : {str(e)}',
+                            order_id=order_id, site=self.site.name)
+            return False
+
+    def get_printer(self, address: str) -> AsyncPrinter:
+        """
+        Connection to a printer, by sink URL: network printers are driven through asyncio streams,
+        the other sinks through AsyncSink.
+        """
+        if address not in self.printers:
+            sink = create_sink(address)
+            self.printers[address] = (AsyncPrinter(sink.host, sink.port) if isinstance(sink, NetworkSink)
+                                      else AsyncSink(sink))
+        return self.printers[address]
+
+    async def close_printers(self):
+        for printer in self.printers.values():
+            await printer.close()
+        self.printers = {}
+
+    async def process_orders_async(self, orders: list[OrderDto], token: str) -> bool:
+        """
+        Print and acknowledge orders by priority (see PrintScheduler). While a long backlog drains,
+        the API is polled again every POLL_INTERVAL so newly arrived urgent orders jump ahead.
+        Every printed order goes to the journal outbox and its status update is sent by a
+        background task, in the order of printing, so the network never holds the printer.
+        Orders already printed are only acknowledged again (see check_printed).
+
+        Args:
+            orders (list[OrderDto]): Orders to print
+            token (str): Authentication token, None while offline (acknowledgements are only queued)
+
+        Returns:
+            bool: True if all orders processed successfully, False if a critical error occurred
+        """
+        self.scheduler.sync(orders)
+        last_fetch = time.monotonic()
+
+        try:
+            while len(self.scheduler):
+                # Orders stay queued while printing is paused (paper out, cover open)
+                if not await self.wait_printer_ready_async():
+                    return False
+                order = self.scheduler.pop()
+                QUEUE_DEPTH.set(len(self.scheduler) + 1, site=self.site.name)
+
+                digest, reprint = self.check_printed(order)
+                if digest is not None:
+                    if not await self.retry_print_async(self.site.printer_url, order, reprint):
+                        return False
+                    self.printed_orders.add(order.id, digest)
+
+                self.journal.printed(order)
+                if token is None:
+                    continue
+                self.start_ack_flush_async(token)
+
+                if len(self.scheduler) and time.monotonic() - last_fetch >= POLL_INTERVAL:
+                    last_fetch = time.monotonic()
+                    try:
+                        self.scheduler.sync(await self.fetch_pending_orders_async(token))
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self.logger.log(LogLevel.WARNING, f'Erro ao atualizar pedidos durante a impressão: {str(e)}',
+                                        site=self.site.name)
+
+            QUEUE_DEPTH.set(0, site=self.site.name)
+            return True
+        finally:
+            # Also on early exit, for the orders already printed (on stop they wait in the journal)
+            if token is not None and not self.stop_event.is_set():
+                self.start_ack_flush_async(token)
+
+    async def request_pending_orders_async(self, token: str) -> list[dict]:
+        """Fetch the orders waiting to be printed and keep them in the journal (see request_pending_orders)."""
+        data = await self.run_stage_async(Stage.FETCH, lambda: self.source.request_orders_async(self.session, token, self.site),
+                                          succeeded=lambda result: True)
+        return self.journal.sync(data)
+
+    async def fetch_pending_orders_async(self, token: str) -> list[OrderDto]:
+        """Fetch and parse the orders waiting to be printed, except the ones already printed."""
+        return self.parse_pending_orders(await self.request_pending_orders_async(token))
+
+    def start_ack_flush_async(self, token: str):
+        """
+        Send the queued status updates in a background task (see send_acks_async). If one is
+        already sending them it is woken up to pick the new ones. Never awaited by the print loop.
+        """
+        if self.ack_task is None or self.ack_task.done():
+            self.ack_wakeup_async.clear()
+            self.ack_task = asyncio.create_task(self.send_acks_async(token))
+        else:
+            self.ack_wakeup_async.set()
+
+    async def send_acks_async(self, token: str):
+        """
+        Send the queued status updates, retrying the refused ones up to MAX_ATTEMPTS times.
+        Updates that still fail, or that wait for the connection, stay queued.
+        """
+        while await self.flush_acks_async(token) is not None and not self.stop_event.is_set():
+            delay = self.journal.next_retry(MAX_ATTEMPTS)
+            if delay is None:
+                break
+            try:
+                await asyncio.wait_for(self.ack_wakeup_async.wait(), delay)  # Or less, if orders are printed meanwhile
+            except asyncio.TimeoutError:
+                pass
+            self.ack_wakeup_async.clear()
+
+    async def flush_acks_async(self, token: str) -> int:
+        """
+        Send the queued status updates whose time has come, oldest first.
+
+        Returns:
+            int: Number of updates sent, None if the connection failed (the rest wait for the next flush)
+        """
+        import aiohttp
+
+        sent = 0
+        while orders := self.journal.due():
+            for order in orders:
+                try:
+                    ok = await self.run_stage_async(
+                        Stage.STATUS_UPDATE,
+                        lambda: self.source.update_order_status_async(self.session, order, token, self.site),
+                        order_id=order.id)
+                except asyncio.CancelledError:
+                    raise
+                except (OSError, aiohttp.ClientConnectionError) as e:
+                    # Connection failure: the next updates would fail too
+                    RETRIES.inc(stage=Stage.STATUS_UPDATE, site=self.site.name)
+                    self.logger.log(LogLevel.WARNING, f'Sem ligação para atualizar o pedido n {order.id}, '
+                                    f'{len(self.journal)} atualizações em espera: {str(e)}',
+                                    order_id=order.id, site=self.site.name)
+                    return None
+                except Exception as e:
+                    ok = False
+                    self.logger.log(LogLevel.ERROR,
+                                    f'Atualização de status de impressão do pedido n {order.id} falhou : {str(e)}',
+                                    order_id=order.id, site=self.site.name)
+                if ok:
+                    self.journal.acknowledged(order.id)
+                    self.latency.acknowledged(order)
+                    sent += 1
+                else:
+                    RETRIES.inc(stage=Stage.STATUS_UPDATE, site=self.site.name)
+                    self.journal.refused(order.id)
+        return sent
+
+    async def retry_print_async(self, address: str, order: OrderDto, reprint: bool = False) -> bool:
+        """
+        Render an order once and send its receipt and kitchen station tickets concurrently.
+        The order only counts as printed once every ticket is out.
+
+        Returns:
+            bool: True if printed, False after max attempts (critical error)
+        """
+        try:
+            data = self.run_stage(Stage.RENDER, lambda: render_order(order, reprint), order_id=order.id)
+            tickets = self.run_stage(Stage.RENDER, lambda: render_station_tickets(order, self.site, reprint),
+                                     order_id=order.id, succeeded=lambda result: True)
+        except Exception as e:
+            self.error_occurred(ErrorType.ORDER_PROCESSING.value,
+                                f'Erro ao gerar o talão do pedido n {order.id} : {str(e)}')
+            return False
+
+        # After a failed attempt, only the receipt and tickets not sent yet (see part_sent)
+        stations = [station for station, ticket in tickets.items() if not self.part_sent(order.id, station, ticket)]
+        results = await asyncio.gather(
+            self.send_receipt_once(address, data, order),
+            *(self.send_with_retries(self.site.station_url(station), tickets[station], order, station)
+              for station in stations))
+        if all(results):
+            self.forget_parts(order.id)
+            self.receipts.add(order.id, data)
+            self.latency.printed(order)
+            self.events.publish(EventType.ORDER_PRINTED, site=self.site.name, order_id=order.id)
+            return True
+
+        if self.stop_event.is_set():
+            return False  # Stopped while waiting for the printer, the order was not printed
+
+        failed = [name for name, ok in zip(["principal"] + stations, results) if not ok]
+        self.error_occurred(ErrorType.ORDER_PROCESSING.value,
+                            f'Falha após {MAX_ATTEMPTS} tentativas de imprimir o pedido n {order.id} ({", ".join(failed)})')
+        return False
+
+    async def send_receipt_once(self, address: str, data: bytes, order: OrderDto) -> bool:
+        """Send the receipt, unless an earlier attempt to print the order already did."""
+        return self.part_sent(order.id, None, data) or await self.send_with_retries(address, data, order)
+
+    async def send_with_retries(self, address: str, data: bytes, order: OrderDto, station: str = None) -> bool:
+        """
+        Send rendered bytes to one printer, reconnecting up to MAX_ATTEMPTS times. The receipt
+        printer first waits while printing is paused, and attempts failed while paused are not counted.
+
+        Args:
+            address (str): Sink URL of the printer
+            data (bytes): Rendered receipt or ticket
+            order (OrderDto): Order being printed
+            station (str): Kitchen station name, None for the receipt printer
+
+        Returns:
+            bool: True if sent, False after max attempts
+        """
+        printer = self.get_printer(address)
+        label = f'{station} ticket' if station else 'print'
+        attempt = 0
+        while attempt < MAX_ATTEMPTS:
+            if station is None and not await self.wait_printer_ready_async():
+                return False  # Stop requested while paused
+            try:
+                async def send():
+                    async with printer.lock:
+                        if not printer.connected and not await printer.connect():
+                            return False
+                        await printer.send(data)
+                        return True
+
+                sent = await self.run_stage_async(Stage.PRINTER_SEND, send, order_id=order.id, attempt=attempt+1,
+                                                  printer=address)
+                if station is None:
+                    self.set_printer_online(sent)
+                if sent:
+                    self.record_print(address, data, order.id, station)
+                    self.mark_part_sent(order.id, station, data)
+                    return True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.log(LogLevel.ERROR, f'Erro inesperado ao imprimir o pedido {order.id} : {str(e)}',
+                                order_id=order.id, attempt=attempt+1, site=self.site.name)
+
+            RETRIES.inc(stage=Stage.PRINTER_SEND, site=self.site.name)
+            self.logger.log(LogLevel.WARNING, f'Retrying {label} {order.id} (attempt {attempt+1}/{MAX_ATTEMPTS})',
+                            order_id=order.id, attempt=attempt+1, site=self.site.name)
+            if station is not None or not self.printer_paused:
+                attempt += 1  # Attempts failed on paper out or cover open wait for the printer instead
+            if attempt < MAX_ATTEMPTS:
+                await asyncio.sleep(RETRY_DELAY)
+        return False
@@ -0,0 +1,201 @@
+"""
+Controller serving several sites (restaurant backends and printers) from a single process.
+
+Every site keeps its own ScriptController (state, printer connection, stop event), but their
+processing cycles run on one shared thread pool, using the shared HTTP session, logger and metrics.
+A critical error only stops the site where it happened, the other sites keep printing.
+"""
+
+import heapq
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from models.site import Site
+from models.logger import Logger
+from models.log_level import LogLevel
+from models.error_type import ErrorType
+from app.settings import SITE_WORKERS
+from controllers.script import ScriptController
+from models.event_type import EventType
+from services.profiler import SamplingProfiler
+from services.events import EventBus, attach_metrics, attach_logger
+
+
+class MultiSiteController:
+    """
+    Schedules the processing cycles of many sites on a shared worker pool.
+
+    Exposes the same start/stop/status API as ScriptController, so the tray menu works unchanged.
+
+    Attributes:
+        controllers (dict): ScriptController per site name.
+        events (EventBus): Bus shared by every site; the scheduler's own transitions have no site.
+        running (bool): True while the scheduler is running.
+    """
+
+    def __init__(self, sites: list[Site], max_workers: int = SITE_WORKERS):
+        """
+        Initialize one controller per site and the shared resources.
+
+        Args:
+            sites (list[Site]): Sites to serve
+            max_workers (int): Size of the worker pool shared by every site
+        """
+        self.logger = Logger()            # Shared by every site, entries are tagged with the site name
+        self.events = EventBus(self.logger)
+        attach_metrics(self.events)
+        attach_logger(self.events, self.logger)
+        self.controllers = {site.name: ScriptController(site, self.logger, events=self.events) for site in sites}
+        self.max_workers = max(1, min(max_workers, len(sites)))
+        self.profiler = SamplingProfiler(self.logger)
+        self._running = False
+        self.executor = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.schedule = []                # Heap of (due time, site name)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @running.setter
+    def running(self, value: bool):
+        if value != self._running:
+            self._running = value
+            self.events.publish(EventType.STATE_CHANGED, running=value)
+
+    @property
+    def status_message(self) -> str:
+        """One status line per site."""
+        lines = []
+        for name, controller in self.controllers.items():
+            state = "ON" if controller.running else "OFF"
+            lines.append(f"{name} ({state}): {controller.status_message}")
+        return "\n".join(lines)
+
+    def start_script(self):
+        """Start every site and the scheduler thread if not already running."""
+        with self.lock:
+            if self.running:
+                return
+            self.stop_event.clear()
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="Site")
+            self.thread = threading.Thread(target=self.scheduler_loop, name="MultiSiteScheduler")
+            self.running = True
+            for name in self.controllers:
+                self.start_site(name)
+            self.thread.start()
+
+    def stop_script(self):
+        """Stop the scheduler and every site, waiting for the cycles in progress."""
+        with self.lock:
+            if not self.running:
+                return
+            self.stop_event.set()
+            for controller in self.controllers.values():
+                controller.stop_event.set()
+            with self.condition:
+                self.schedule.clear()
+                self.condition.notify_all()
+            self.thread.join(timeout=5)
+            self.executor.shutdown(wait=True)
+            for controller in self.controllers.values():
+                controller.cleanup_resources()
+                controller.stop_alert_sound()
+            self.running = False
+
+    def start_site(self, name: str):
+        """
+        (Re)start a single site, e.g. after it stopped on a critical error.
+
+        Args:
+            name (str): Site name
+        """
+        controller = self.controllers[name]
+        if controller.running and not controller.stop_event.is_set():
+            return
+        controller.stop_alert_sound()
+        controller.stop_event.clear()
+        controller.running = True
+        self.schedule_site(name, 0)
+
+    def stop_alert_sound(self):
+        """Stop the alert sound of every site."""
+        for controller in self.controllers.values():
+            controller.stop_alert_sound()
+
+    def reprint(self, order_id: int, printer: str = None, site: str = None) -> bool:
+        """
+        Reprint a recent receipt on the printer of the site that printed it.
+
+        Args:
+            order_id (int): Order to reprint
+            printer (str): Kitchen station of that site whose printer to use, the site printer by default
+            site (str): Site name, searched among every site when omitted
+
+        Returns:
+            bool: True if reprinted
+
+        Raises:
+            KeyError: If `printer` is not a kitchen station of the site
+        """
+        if site is None:
+            controllers = self.controllers.values()
+        else:
+            controllers = [self.controllers[site]] if site in self.controllers else []
+        for controller in controllers:
+            if order_id in controller.receipts:
+                return controller.reprint(order_id, printer)
+        return False
+
+    def recent_receipts(self) -> list[dict]:
+        """List the receipts of every site that can be reprinted, most recent first."""
+        entries = [entry for controller in self.controllers.values() for entry in controller.recent_receipts()]
+        return sorted(entries, key=lambda entry: entry["stored"], reverse=True)
+
+    def stations(self) -> list[str]:
+        """Kitchen stations of every site."""
+        return sorted({station for controller in self.controllers.values() for station in controller.stations()})
+
+    def schedule_site(self, name: str, delay: float):
+        with self.condition:
+            heapq.heappush(self.schedule, (time.monotonic() + delay, name))
+            self.condition.notify()
+
+    def scheduler_loop(self):
+        """Submit each site's cycle to the shared pool when it is due."""
+        while not self.stop_event.is_set():
+            with self.condition:
+                while not self.stop_event.is_set() and (not self.schedule or self.schedule[0][0] > time.monotonic()):
+                    timeout = self.schedule[0][0] - time.monotonic() if self.schedule else None
+                    self.condition.wait(timeout)
+                if self.stop_event.is_set():
+                    return
+                _, name = heapq.heappop(self.schedule)
+            self.executor.submit(self.run_site_cycle, name)
+
+    def run_site_cycle(self, name: str):
+        """
+        Run one cycle of a site and reschedule it, unless the site was stopped by an error.
+
+        Args:
+            name (str): Site name
+        """
+        controller = self.controllers[name]
+        try:
+            delay = controller.run_cycle()
+        except Exception as e:
+            controller.error_occurred(ErrorType.UNEXPECTED.value, f"Erro Inesperado: {str(e)}")
+            delay = 0
+
+        if controller.stop_event.is_set():
+            # Failure isolation: only this site stops, the others keep their schedule
+            controller.cleanup_resources()
+            if not self.stop_event.is_set():
+                self.logger.log(LogLevel.WARNING, f'Site {name} parado após erro crítico.', site=name)
+            return
+
+        self.schedule_site(name, delay)
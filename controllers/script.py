@@ -3,45 +3,229 @@ Main controller class for managing order processing automation script.
 Handles system checks, printer management, order processing, and error handling with retry logic.
 """
 
+import os
 import time
 import threading
-import winsound
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from utils.checks import check_url
 from models.logger import Logger
 from models.log_level import LogLevel
+from models.stage import Stage
+from models.event_type import EventType
 from models.error_type import ErrorType
-from models.order import Order, OrderDto
-from app.settings import CHECK_SERVER_HEALTH, CHECK_INTERNET_URL, MAX_ATTEMPTS, RETRY_DELAY
-from services.printer import connect_printer, print_order
+from models.order import OrderDto
+from models.site import Site
+from models.printer_status import PrinterStatus
+from app.settings import (CHECK_INTERNET_URL, MAX_ATTEMPTS, RETRY_DELAY, POLL_INTERVAL, CHECK_RETRY_DELAY,
+                          RECEIPTS_DIR, OFFLINE_DIR, PRINTER_STATUS_INTERVAL)
+from services.printer import connect_printer, render_order, send_order, send_ticket
+from services.sinks import create_sink
+from services.stations import get_station_pool, render_station_tickets
 from services.auth import get_auth_tokens
-from services.order_services import fetch_orders, dummy_fetch_orders, update_order_status
+from services.journal import OrderJournal
+from services.dedup import PrintedIndex, order_digest
+from services.order_services import OrderSource, LOCAL_TOKEN, get_order_source, parse_orders
+from services.latency import OrderLatencyTracker
+from services.scheduler import PrintScheduler
+from services.profiler import SamplingProfiler
+from services.alerts import SoundAlert, get_sound_alert
+from services.receipts import RecentReceipts
+from services.events import EventBus, attach_metrics, attach_logger
+from services.recorder import get_recorder
+from services.metrics import STAGE_DURATION, STAGE_FAILURES, RETRIES, QUEUE_DEPTH, DUPLICATE_ORDERS
+
+MAX_PARTIAL_ORDERS = 100  # Orders whose already sent receipt and tickets are remembered (see ScriptController.part_sent)
 
 
 class ScriptController:
     """Main controller class for managing script execution and coordination between components."""
     
-    def __init__(self):
-        """Initialize script control variables and resources."""
-        self.running = False              # Flag to track script running state
+    def __init__(self, site: Site = None, logger: Logger = None, sound: SoundAlert = None, events: EventBus = None,
+                 source: OrderSource = None):
+        """
+        Initialize script control variables and resources.
+        
+        Args:
+            site (Site): Site served by this controller. Defaults to the site of the .env settings
+            logger (Logger): Logger to use, shared between controllers in multi-site mode
+            sound (SoundAlert): Alert backend played on critical errors. Defaults to SOUND_ALERT
+            events (EventBus): Bus to publish on, shared between controllers in multi-site mode.
+                               By default a new bus feeding the metrics and the log
+            source (OrderSource): Where orders are fetched from and acknowledged. Defaults to ORDER_SOURCE
+        """
+        self.site = site or Site.from_settings()  # Backend, credentials and printer of this site
+        self.source = source or get_order_source()  # Orders API, or synthetic orders for soak tests
+        self.logger = logger or Logger()  # Logger instance for system logging
+        if events is None:
+            events = EventBus(self.logger)
+            attach_metrics(events)
+            attach_logger(events, self.logger)
+        self.events = events              # State, error, printed order and printer events
+        self._running = False             # Flag to track script running state, see `running`
+        self.printer_online = None        # Last known printer state, None until first checked
+        self.printer_status = None        # Last state read by the printer monitor (PrinterStatus)
+        self.printer_ready = threading.Event()  # Cleared while printing is paused (paper out, cover open)
+        self.printer_ready.set()
+        self.monitor_thread = None        # Printer monitor thread, see monitor_printer
         self.thread = None                # Worker thread reference
         self.stop_event = threading.Event()  # Event flag for graceful shutdown
         self.status_message = "A correr sem problemas aparentes."  # Current status message
-        self.logger = Logger()            # Logger instance for system logging
         self.lock = threading.Lock()       # Thread synchronization lock
-        self.printer = None               # Printer connection reference
+        self.printer = None               # Printer sink (see services.sinks), open while connected
+        self.printer_lock = threading.RLock()  # Serialises the processing loop and reprints on the printer
+        # Last printed receipts, for reprints
+        self.receipts = RecentReceipts(directory=os.path.join(RECEIPTS_DIR, self.site.name) if RECEIPTS_DIR else None)
+        self.latency = OrderLatencyTracker(self.logger, self.site.name)  # End-to-end order latency (created -> fetch/print/ack)
+        self.profiler = SamplingProfiler(self.logger)    # On-demand profiling, idle until started
+        self.scheduler = PrintScheduler()                # Orders waiting to print, most urgent first
+        # Fetched orders and pending acknowledgements, kept to print and acknowledge without network
+        self.journal = OrderJournal(os.path.join(OFFLINE_DIR, self.site.name) if OFFLINE_DIR else None, RETRY_DELAY)
+        # Printed orders and their contents, so an order listed again before its update is applied is not printed twice
+        self.printed_orders = PrintedIndex(os.path.join(OFFLINE_DIR, self.site.name) if OFFLINE_DIR else None)
+        self.network_online = None        # Last result of the internet and server checks, None until first checked
+        self.ack_pool = None              # Single worker sending the acknowledgements in order, see start_ack_flush
+        self.ack_flush = None             # Future of the acknowledgements being sent by the ack worker
+        self.ack_wakeup = threading.Event()  # Wakes the ack worker while it waits to retry refused updates
+        # Receipt and tickets already sent of the orders not fully printed, so a new attempt only sends the rest
+        self.sent_parts = OrderedDict()   # order id -> {station (None for the receipt): hash of the bytes sent}
+        self.sent_parts_lock = threading.Lock()
 
         # Sound alert control
+        self.sound = sound or get_sound_alert()
         self.sound_stop_event = threading.Event()
         self.sound_thread = None
         
 
+    @property
+    def running(self) -> bool:
+        """True while the script is running. Changes are published as STATE_CHANGED events."""
+        return self._running
+
+    @running.setter
+    def running(self, value: bool):
+        if value != self._running:
+            self._running = value
+            self.events.publish(EventType.STATE_CHANGED, site=self.site.name, running=value)
+
+    def set_printer_online(self, online: bool):
+        """Record the printer state, publishing a PRINTER_STATE event when it changes."""
+        if online != self.printer_online:
+            self.printer_online = online
+            self.events.publish(EventType.PRINTER_STATE, site=self.site.name, online=online)
+
+    @property
+    def printer_paused(self) -> bool:
+        """True while printing waits for paper or for the cover to be closed."""
+        return not self.printer_ready.is_set()
+
+    def set_printer_status(self, status: PrinterStatus):
+        """
+        Record the state read by the printer monitor. Paper out and cover open pause printing
+        (orders stay queued) until the printer is ready again; PRINTER_PAUSED events are published
+        on both transitions.
+        """
+        if status == self.printer_status:
+            return
+        self.printer_status = status
+        if status.paused == self.printer_paused:
+            return
+        with self.lock:
+            if status.paused:
+                self.printer_ready.clear()
+            else:
+                self.printer_ready.set()
+            self.refresh_status_message()
+        self.events.publish(EventType.PRINTER_PAUSED, site=self.site.name, paused=status.paused, status=status.value)
+
+    def set_network_online(self, online: bool):
+        """
+        Record the result of the internet and server checks, publishing a NETWORK_STATE event when
+        it changes. Without network the orders already fetched keep printing (see run_offline_cycle).
+        """
+        if online == self.network_online:
+            return
+        with self.lock:
+            self.network_online = online
+            self.refresh_status_message()
+        self.events.publish(EventType.NETWORK_STATE, site=self.site.name, online=online,
+                            pending_acks=len(self.journal))
+
+    def refresh_status_message(self):
+        """Status line of the printer and network state (called with the lock held). Critical errors are kept."""
+        if self.status_message.startswith("ERROR"):
+            return
+        if self.printer_paused:
+            self.status_message = f'Impressão em pausa: {self.printer_status.value}. Os pedidos ficam em espera.'
+        elif self.network_online is False:
+            self.status_message = "Sem ligação à internet ou ao servidor: a imprimir os pedidos já recebidos."
+        else:
+            self.status_message = "A correr sem problemas aparentes."
+
+    def start_printer_monitor(self):
+        """Start the printer monitor thread (see PRINTER_STATUS_INTERVAL) if not already running."""
+        if not PRINTER_STATUS_INTERVAL or (self.monitor_thread and self.monitor_thread.is_alive()):
+            return
+        self.set_printer_status(self.read_printer_status())  # Known before the first system checks
+        self.monitor_thread = threading.Thread(target=self.monitor_printer, name=f"PrinterMonitor-{self.site.name}",
+                                               daemon=True)
+        self.monitor_thread.start()
+
+    def monitor_printer(self):
+        """Read the printer state every PRINTER_STATUS_INTERVAL seconds until a stop is requested."""
+        while not self.stop_event.wait(PRINTER_STATUS_INTERVAL):
+            try:
+                self.set_printer_status(self.read_printer_status())
+            except Exception as e:
+                self.logger.log(LogLevel.ERROR, f'Erro no monitor da impressora: {str(e)}', site=self.site.name)
+
+    def read_printer_status(self) -> PrinterStatus:
+        """
+        Read the real-time state of the site printer, on the connection used to print (opened if
+        needed). Skipped while a job holds the printer, keeping the last state.
+        
+        Returns:
+            PrinterStatus: Current state, OFFLINE if the printer cannot be reached
+        """
+        if not self.printer_lock.acquire(timeout=PRINTER_STATUS_INTERVAL):
+            return self.printer_status or PrinterStatus.READY
+        try:
+            if self.printer is None:
+                self.printer = create_sink(self.site.printer_url)
+                self.printer.open()
+            status = self.printer.status()
+        except Exception:
+            status = PrinterStatus.OFFLINE
+        finally:
+            if status == PrinterStatus.OFFLINE and self.printer is not None:
+                # Reconnected by check_printer_connection, with its retries and errors
+                try:
+                    self.printer.close()
+                except Exception:
+                    pass
+                self.printer = None
+            self.printer_lock.release()
+        return status
+
+    def wait_printer_ready(self) -> bool:
+        """
+        Block while printing is paused, resuming as soon as the monitor sees the printer ready.
+        
+        Returns:
+            bool: True when the printer is ready, False if a stop was requested while waiting
+        """
+        while not self.printer_ready.wait(0.1):
+            if self.stop_event.is_set():
+                return False
+        return not self.stop_event.is_set()
+
     def start_script(self):
         """Start the main processing thread if not already running."""
         if not self.running:
             with self.lock:  # Thread-safe start
                 self.stop_event.clear()
-                self.thread = threading.Thread(target=self.main_loop)
+                self.thread = threading.Thread(target=self.main_loop, name="ScriptController")
                 self.thread.start()
                 self.running = True
 
@@ -65,7 +249,7 @@ class ScriptController:
         
         # Start new alert thread
         self.sound_stop_event.clear()
-        self.sound_thread = threading.Thread(target=self.play_alert_sound)
+        self.sound_thread = threading.Thread(target=self.play_alert_sound, name="AlertSound")
         self.sound_thread.start()
 
     def stop_alert_sound(self):
@@ -76,11 +260,11 @@ class ScriptController:
         self.sound_thread = None
     
     def play_alert_sound(self):
-        """Continuous alert sound until stopped (Windows beep example)."""
+        """Continuous alert sound until stopped."""
         while not self.sound_stop_event.is_set():
             try:
-                # Windows system beep (1000Hz for 500ms)
-                winsound.Beep(1000, 500)
+                # 1000Hz for 500ms (Windows beep, terminal bell or silent, see SOUND_ALERT)
+                self.sound.beep(1000, 500)
                 # Add interval between beeps
                 time.sleep(0.5)
             except Exception as e:
@@ -97,55 +281,107 @@ class ScriptController:
         """
         with self.lock:
             self.status_message = f'ERROR: {message}. Reinicie o programa.'
-            self.logger.log(LogLevel.ERROR, log_message)
-            self.stop_event.set()  # Trigger shutdown
+            self.events.publish(EventType.ERROR, site=self.site.name, message=self.status_message,
+                                log_message=log_message)
+            self.stop_event.set()  # Trigger shutdown (of this site only)
             self.start_alert_sound()
 
     def main_loop(self):
-        """Main processing loop handling system checks, authentication, and order processing."""
+        """Main processing loop running processing cycles until a stop is requested."""
         try:
             while not self.stop_event.is_set():
-                # System health checks
-                if not self.perform_system_checks():
-                    time.sleep(10)  # Wait before retrying checks
-                    continue
-
-                # API authentication
-                auth_status, token, auth_error = get_auth_tokens()
-                if not auth_status:
-                    self.error_occurred(ErrorType.AUTHENTICATION.value, auth_error)
-                    continue  # Will exit if stop_event is set
-
-                # Order processing with retry logic
-                try:
-                    # orders = dummy_fetch_orders()  # For testing without API
-                    orders = fetch_orders(token)
-                    print(orders)
-                    if orders and not self.process_orders_with_retry(orders, token):
-                        continue
-                except Exception as e:
-                    self.error_occurred(ErrorType.ORDER_PROCESSING.value, f'Erro pedidos: {str(e)}')
-                    continue
-
-                time.sleep(20)  # Normal interval between processing cycles
+                delay = self.run_cycle()
+                if delay and not self.stop_event.is_set():
+                    time.sleep(delay)
 
         except Exception as e:
             self.error_occurred(ErrorType.UNEXPECTED.value, f"Erro Inesperado: {str(e)}")
         finally:
             self.cleanup_resources()
 
+    def run_cycle(self) -> float:
+        """
+        Run one processing cycle: system checks, authentication, and order processing.
+        Sources without network (OrderSource.remote False) skip the internet, server and
+        authentication stages.
+        
+        Returns:
+            float: Seconds to wait before the next cycle (the stop_event is set on critical errors)
+        """
+        self.start_printer_monitor()  # Also (re)started here for the multi-site scheduler
+
+        # Local printer check, the only system check stopping the script
+        if not self.run_stage(Stage.HEALTH_CHECK, self.perform_system_checks):
+            return CHECK_RETRY_DELAY  # Wait before retrying checks
+
+        if self.source.remote:
+            # Internet and server checks: without them the orders already fetched keep printing
+            if not self.run_stage(Stage.HEALTH_CHECK, self.check_network):
+                return self.run_offline_cycle()
+
+            # API authentication
+            auth_status, token, auth_error = self.run_stage(Stage.AUTH, lambda: get_auth_tokens(self.site),
+                                                            succeeded=lambda result: result[0])
+            if not auth_status:
+                if not self.check_network():
+                    return self.run_offline_cycle()  # Connection lost since the checks
+                self.error_occurred(ErrorType.AUTHENTICATION.value, auth_error)
+                return 0  # Will exit if stop_event is set
+        else:
+            token = LOCAL_TOKEN  # Local source (synthetic orders): no network checks nor authentication
+
+        # Acknowledgements queued while offline, sent in the background while fetching
+        self.start_ack_flush(token)
+
+        try:
+            data = self.request_pending_orders(token)
+        except Exception as e:
+            self.logger.log(LogLevel.WARNING, f'Erro ao pedir os pedidos, a imprimir os já recebidos: {str(e)}',
+                            site=self.site.name)
+            return self.run_offline_cycle()
+
+        # Order processing with retry logic
+        try:
+            orders = self.parse_pending_orders(data)
+            if orders and not self.process_orders_with_retry(orders, token):
+                return 0
+        except Exception as e:
+            self.error_occurred(ErrorType.ORDER_PROCESSING.value, f'Erro pedidos: {str(e)}')
+            return 0
+
+        return POLL_INTERVAL  # Normal interval between processing cycles
+
+    def run_offline_cycle(self) -> float:
+        """
+        Print the orders fetched before the internet or the server became unreachable. Their
+        acknowledgements wait in the journal outbox and are sent once the connection returns.
+        
+        Returns:
+            float: Seconds to wait before the next cycle (the stop_event is set on critical errors)
+        """
+        self.set_network_online(False)
+        try:
+            orders = self.parse_pending_orders(self.journal.pending())
+            if orders and not self.process_orders_with_retry(orders, None):
+                return 0
+        except Exception as e:
+            self.error_occurred(ErrorType.ORDER_PROCESSING.value, f'Erro pedidos: {str(e)}')
+            return 0
+        return min(POLL_INTERVAL, CHECK_RETRY_DELAY)
+
     def perform_system_checks(self) -> bool:
         """
-        Execute all system prerequisite checks.
+        Execute the local prerequisite checks (the printer). Internet and server are checked by
+        `check_network`, whose failure does not stop printing.
         
         Returns:
             bool: True if all checks pass, False otherwise
         """
         checks = [
             # (check_function, error_message, log_message)
-            (lambda: check_url(CHECK_INTERNET_URL), ErrorType.INTERNET_CONNECTION.value, "Sem conexão à internet."),
-            (self.check_printer_connection, ErrorType.PRINTER_CONNECTION.value, "Sem conexão à impressora"),
-            (lambda: check_url(CHECK_SERVER_HEALTH), ErrorType.SERVER_CONNECTION.value, "Sem conexão com o servidor")
+            # A paused printer is reachable, orders wait for it (see set_printer_status)
+            (lambda: self.printer_paused or self.check_printer_connection(), ErrorType.PRINTER_CONNECTION.value,
+             "Sem conexão à impressora"),
         ]
 
         for check_fn, err_msg, log_msg in checks:
@@ -153,81 +389,498 @@ class ScriptController:
                 return False
         return True
 
+    def check_network(self) -> bool:
+        """
+        Check the internet connection and the site server, recording the result (see set_network_online).
+        
+        Returns:
+            bool: True if both are reachable
+        """
+        try:
+            online = check_url(CHECK_INTERNET_URL) and check_url(self.site.health_url)
+        except Exception:
+            online = False
+        self.set_network_online(online)
+        return online
+
+    def fetch_pending_orders(self, token: str) -> list[OrderDto]:
+        """
+        Fetch and parse the orders waiting to be printed.
+        
+        Args:
+            token (str): Authentication token
+            
+        Returns:
+            list[OrderDto]: Orders returned by the API, except the ones already printed
+        """
+        return self.parse_pending_orders(self.request_pending_orders(token))
+
+    def request_pending_orders(self, token: str) -> list[dict]:
+        """
+        Fetch the orders waiting to be printed and keep them in the journal.
+        
+        Args:
+            token (str): Authentication token
+            
+        Returns:
+            list[dict]: Raw orders to print (the printed ones still listed are left out)
+        """
+        data = self.run_stage(Stage.FETCH, lambda: self.source.request_orders(token, self.site),
+                              succeeded=lambda result: True)
+        return self.journal.sync(data)
+
+    def parse_pending_orders(self, data: list[dict]) -> list[OrderDto]:
+        """
+        Parse raw orders, recording their fetch latency.
+        
+        Args:
+            data (list[dict]): Raw orders, from the API or the journal
+            
+        Returns:
+            list[OrderDto]: Parsed orders
+        """
+        orders = self.run_stage(Stage.PARSE, lambda: parse_orders(data),
+                                succeeded=lambda result: True)
+        for order in orders:
+            self.latency.fetched(order)
+        return orders
+
     def process_orders_with_retry(self, orders: list[OrderDto], token: str) -> bool:
         """
         Process order list with retry logic for both printing and status updates.
+        Orders are printed by priority (see PrintScheduler) and, while a long backlog drains,
+        the API is polled again every POLL_INTERVAL so newly arrived urgent orders jump ahead.
+        
+        Every printed order goes to the journal outbox and its status update is sent in the
+        background by the ack worker, in the order of printing, so the network never holds the
+        printer. Updates that fail stay queued and are sent again later (see send_acks).
+        Orders already printed are only acknowledged again (see check_printed).
         
         Args:
             orders (list[Order]): List of orders to process
-            token (str): Authentication token
+            token (str): Authentication token, None while offline (updates are only queued)
             
         Returns:
             bool: True if all orders processed successfully, False if critical error occurred
         """
-        for order in orders:
-            if self.stop_event.is_set():
-                return False  # Early exit requested
+        self.scheduler.sync(orders)
+        last_fetch = time.monotonic()
 
-            # Print order with retry attempts
-            if not self.retry_print_operation(order):
-                return False
+        try:
+            while len(self.scheduler):
+                # Orders stay queued while printing is paused (paper out, cover open)
+                if not self.wait_printer_ready():
+                    return False  # Early exit requested
+                order = self.scheduler.pop()
+                QUEUE_DEPTH.set(len(self.scheduler) + 1, site=self.site.name)
 
-            # Update order status with retry attempts
-            if not self.retry_status_update(order, token):
-                return False
+                # Print order with retry attempts, unless it was printed with the same contents
+                digest, reprint = self.check_printed(order)
+                if digest is not None:
+                    if not self.retry_print_operation(order, reprint):
+                        return False
+                    self.printed_orders.add(order.id, digest)
 
-        return True
+                # Queue the status update, sent in the background
+                self.journal.printed(order)
+                if token is None:
+                    continue
+                self.start_ack_flush(token)
+
+                if len(self.scheduler) and time.monotonic() - last_fetch >= POLL_INTERVAL:
+                    last_fetch = time.monotonic()
+                    try:
+                        self.scheduler.sync(self.fetch_pending_orders(token))
+                    except Exception as e:
+                        self.logger.log(LogLevel.WARNING, f'Erro ao atualizar pedidos durante a impressão: {str(e)}',
+                                        site=self.site.name)
+
+            QUEUE_DEPTH.set(0, site=self.site.name)
+            return True
+        finally:
+            if token is not None:
+                self.start_ack_flush(token)  # Also on early exit, for the orders already printed
 
-    def retry_print_operation(self, order: OrderDto) -> bool:
+    def check_printed(self, order: OrderDto) -> tuple:
         """
-        Attempt order printing with reconnection retries.
+        Look an order up in the index of printed orders (see services.dedup). An order the API
+        lists again before applying its status update is not printed twice, unless its contents
+        changed: then it is printed again with the reprint banner.
+        
+        Args:
+            order (OrderDto): Order about to be printed
+            
+        Returns:
+            tuple: (content hash, reprint), with hash None if the order must not be printed
+        """
+        digest = order_digest(order)
+        printed = self.printed_orders.get(order.id)
+        if printed is None:
+            return digest, False
+        if printed == digest:
+            DUPLICATE_ORDERS.inc(site=self.site.name, outcome="skipped")
+            self.logger.log(LogLevel.INFO, f'Pedido n {order.id} já impresso, não é impresso de novo.',
+                            order_id=order.id, site=self.site.name)
+            return None, False
+        DUPLICATE_ORDERS.inc(site=self.site.name, outcome="reprinted")
+        self.logger.log(LogLevel.WARNING, f'Pedido n {order.id} alterado depois de impresso, a reimprimir.',
+                        order_id=order.id, site=self.site.name)
+        return digest, True
+
+    def ack_worker(self) -> ThreadPoolExecutor:
+        """
+        Single thread running the status updates, so they are sent in the order of printing.
+        
+        Returns:
+            ThreadPoolExecutor: The worker, created on first use
+        """
+        if self.ack_pool is None:
+            self.ack_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"Ack-{self.site.name}")
+        return self.ack_pool
+
+    def start_ack_flush(self, token: str):
+        """
+        Send the queued status updates on the ack worker (see send_acks). If it is already
+        sending them it is woken up to pick the new ones. Never waits for the worker, so a
+        stalled request never holds the print loop.
+        
+        Args:
+            token (str): Authentication token
+        """
+        if self.ack_flush is None or self.ack_flush.done():
+            self.ack_wakeup.clear()
+            self.ack_flush = self.ack_worker().submit(self.send_acks, token)
+        else:
+            self.ack_wakeup.set()
+
+    def send_acks(self, token: str):
+        """
+        Send the queued status updates, retrying the refused ones up to MAX_ATTEMPTS times
+        (see OrderJournal.refused). Updates that still fail, or that wait for the connection,
+        stay queued for the next flush.
+        
+        Args:
+            token (str): Authentication token
+        """
+        while self.flush_acks(token) is not None and not self.stop_event.is_set():
+            delay = self.journal.next_retry(MAX_ATTEMPTS)
+            if delay is None:
+                break
+            self.ack_wakeup.wait(delay)  # Or less, if orders are printed meanwhile
+            self.ack_wakeup.clear()
+
+    def flush_acks(self, token: str) -> int:
+        """
+        Send the queued status updates whose time has come, oldest first.
+        
+        Args:
+            token (str): Authentication token
+            
+        Returns:
+            int: Number of updates sent, None if the connection failed (the rest wait for the next flush)
+        """
+        sent = 0
+        while orders := self.journal.due():
+            for order in orders:
+                try:
+                    ok = self.run_stage(Stage.STATUS_UPDATE,
+                                        lambda: self.source.update_order_status(order, token, self.site),
+                                        order_id=order.id)
+                except OSError as e:
+                    # Connection failure: the next updates would fail too
+                    RETRIES.inc(stage=Stage.STATUS_UPDATE, site=self.site.name)
+                    self.logger.log(LogLevel.WARNING, f'Sem ligação para atualizar o pedido n {order.id}, '
+                                    f'{len(self.journal)} atualizações em espera: {str(e)}',
+                                    order_id=order.id, site=self.site.name)
+                    return None
+                except Exception as e:
+                    ok = False
+                    self.logger.log(LogLevel.ERROR,
+                                    f'Atualização de status de impressão do pedido n {order.id} falhou : {str(e)}',
+                                    order_id=order.id, site=self.site.name)
+                if ok:
+                    self.journal.acknowledged(order.id)
+                    self.latency.acknowledged(order)
+                    sent += 1
+                else:
+                    RETRIES.inc(stage=Stage.STATUS_UPDATE, site=self.site.name)
+                    self.journal.refused(order.id)
+        return sent
+
+    def retry_print_operation(self, order: OrderDto, reprint: bool = False) -> bool:
+        """
+        Print the full receipt and the kitchen station tickets of an order.
+        Every ticket is rendered once and the same bytes are sent on every attempt; station
+        tickets are sent in parallel with the receipt and the order only counts as printed
+        (and is acknowledged) once all of them are out. When the order is printed again after
+        a failure, the receipt and tickets already sent are skipped (see part_sent).
         
         Args:
             order (Order): Order to print
+            reprint (bool): The order was printed before with other contents (reprint banner)
             
         Returns:
             bool: True if printed successfully, False if failed after max attempts
         """
-        for attempt in range(MAX_ATTEMPTS):
+        try:
+            data = self.run_stage(Stage.RENDER, lambda: render_order(order, reprint), order_id=order.id)
+            tickets = self.run_stage(Stage.RENDER, lambda: render_station_tickets(order, self.site, reprint),
+                                     order_id=order.id, succeeded=lambda result: True)
+        except Exception as e:
+            self.error_occurred(ErrorType.ORDER_PROCESSING.value,
+                                f'Erro ao gerar o talão do pedido n {order.id} : {str(e)}')
+            return False
+
+        pool = get_station_pool()
+        pending = [pool.submit(self.retry_station_ticket, order, station, ticket)
+                   for station, ticket in tickets.items() if not self.part_sent(order.id, station, ticket)]
+
+        printed = self.part_sent(order.id, None, data) or self.retry_receipt_print(order, data)
+        if printed:
+            self.mark_part_sent(order.id, None, data)
+        failed_stations = [future.result() for future in pending]  # station name, or None if printed
+        failed_stations = [station for station in failed_stations if station is not None]
+        if printed and not failed_stations:
+            self.forget_parts(order.id)
+            self.receipts.add(order.id, data)
+            self.latency.printed(order)
+            self.events.publish(EventType.ORDER_PRINTED, site=self.site.name, order_id=order.id)
+            return True
+
+        if self.stop_event.is_set():
+            return False  # Stopped while waiting for the printer, the order was not printed
+
+        # Critical failure after all attempts
+        targets = ", ".join(failed_stations if printed else ["principal"] + failed_stations)
+        self.error_occurred(ErrorType.ORDER_PROCESSING.value,
+                           f'Falha após {MAX_ATTEMPTS} tentativas de imprimir o pedido n {order.id} ({targets})')
+        return False
+
+    def retry_receipt_print(self, order: OrderDto, data: bytes) -> bool:
+        """
+        Send the rendered receipt to the site printer, with reconnection retries. Waits while
+        printing is paused (paper out, cover open); attempts failed while paused are not counted.
+        
+        Args:
+            order (Order): Order being printed
+            data (bytes): Rendered receipt
+            
+        Returns:
+            bool: True if printed successfully, False if failed after max attempts
+        """
+        attempt = 0
+        while attempt < MAX_ATTEMPTS:
+            if not self.wait_printer_ready():
+                return False  # Stop requested while paused
             try:
                 # Verify printer connection and attempt print
-                if self.check_printer_connection() and print_order(order, self.printer, self.logger):
+                if self.run_stage(Stage.PRINTER_SEND, lambda: self.send_receipt(order.id, data),
+                                  order_id=order.id, attempt=attempt+1):
                     return True
 
                 # Retry logic
+                RETRIES.inc(stage=Stage.PRINTER_SEND, site=self.site.name)
                 self.logger.log(LogLevel.WARNING, 
-                              f'Retrying print {order.id} (attempt {attempt+1}/{MAX_ATTEMPTS})')
+                              f'Retrying print {order.id} (attempt {attempt+1}/{MAX_ATTEMPTS})',
+                              order_id=order.id, attempt=attempt+1, site=self.site.name)
                 time.sleep(RETRY_DELAY)
                 self.printer = None  # Force printer reconnection on next attempt
             except Exception as e:
                 self.logger.log(LogLevel.ERROR, 
-                               f'Erro inesperado ao imprimir o pedido {order.id} : {str(e)}')
-
-        # Critical failure after all attempts
-        self.error_occurred(ErrorType.ORDER_PROCESSING.value, 
-                           f'Falha após {MAX_ATTEMPTS} tentativas de imprimir o pedido n {order.id}')
+                               f'Erro inesperado ao imprimir o pedido {order.id} : {str(e)}',
+                               order_id=order.id, attempt=attempt+1, site=self.site.name)
+            if not self.printer_paused:
+                attempt += 1  # Attempts failed on paper out or cover open wait for the printer instead
         return False
 
-    def retry_status_update(self, order: Order, token: str) -> bool:
+    def send_receipt(self, order_id: int, data: bytes) -> bool:
         """
-        Attempt order status update with retries.
+        Send rendered bytes to the site printer, connecting first if needed.
         
         Args:
-            order (Order): Order to update
-            token (str): Authentication token
+            order_id (int): Order being printed, for logging
+            data (bytes): Rendered receipt
             
         Returns:
-            bool: True if update successful, False after max attempts
+            bool: True if sent
+        """
+        with self.printer_lock:
+            sent = self.check_printer_connection() and send_order(order_id, data, self.printer, self.logger)
+        if sent:
+            self.record_print(self.site.printer_url, data, order_id)
+        return sent
+
+    def record_print(self, printer: str, data: bytes, order_id: int, station: str = None):
         """
+        Append bytes sent to a printer to the recording, when RECORD_FILE is set.
+        
+        Args:
+            printer (str): Sink URL of the printer
+            data (bytes): Bytes sent
+            order_id (int): Order printed
+            station (str): Kitchen station name, None for the receipt printer
+        """
+        recorder = get_recorder()
+        if recorder:
+            recorder.record_print(printer, data, order_id, station)
+
+    def reprint(self, order_id: int, printer: str = None) -> bool:
+        """
+        Print again one of the last receipts (see RECENT_RECEIPTS and RECEIPTS_TTL), without contacting the API.
+        
+        Args:
+            order_id (int): Order to reprint
+            printer (str): Kitchen station whose printer to use, the site printer by default
+            
+        Returns:
+            bool: True if reprinted, False if the receipt is not stored or the printer failed
+            
+        Raises:
+            KeyError: If `printer` is not a kitchen station of the site
+        """
+        url = self.site.station_url(printer) if printer else self.site.printer_url
+        data = self.receipts.get(order_id)
+        if data is None:
+            return False
+        self.logger.log(LogLevel.INFO, f'Reimpressão do pedido n {order_id}', order_id=order_id, site=self.site.name,
+                        printer=url)
+        if printer is None:
+            return self.send_receipt(order_id, data)
+
+        try:
+            sent = send_ticket(url, data)
+        except Exception as e:
+            self.logger.log(LogLevel.ERROR, f'Erro na reimpressão do pedido n {order_id} : {str(e)}',
+                            order_id=order_id, site=self.site.name)
+            return False
+        if sent:
+            self.record_print(url, data, order_id, printer)
+        return sent
+
+    def recent_receipts(self) -> list[dict]:
+        """
+        List the receipts that can be reprinted, most recent first.
+        
+        Returns:
+            list[dict]: {"order_id", "stored", "site"} of every receipt
+        """
+        return [dict(entry, site=self.site.name) for entry in self.receipts.entries()]
+
+    def stations(self) -> list[str]:
+        """Kitchen stations a receipt can be reprinted on, besides the site printer."""
+        return sorted(self.site.station_printers)
+
+    def retry_station_ticket(self, order: OrderDto, station: str, data: bytes) -> str:
+        """
+        Send a kitchen ticket to its station printer, with retries (runs in the station pool).
+        
+        Args:
+            order (Order): Order being printed
+            station (str): Kitchen station name
+            data (bytes): Rendered ticket
+            
+        Returns:
+            str: None if printed, the station name if it failed after max attempts
+        """
+        url = self.site.station_url(station)
         for attempt in range(MAX_ATTEMPTS):
+            if self.stop_event.is_set():
+                break
             try:
-                if update_order_status(order, token):
-                    return True
-                time.sleep(RETRY_DELAY)
+                if self.run_stage(Stage.PRINTER_SEND, lambda: send_ticket(url, data),
+                                  order_id=order.id, attempt=attempt+1, printer=url):
+                    self.record_print(url, data, order.id, station)
+                    self.mark_part_sent(order.id, station, data)
+                    return None
             except Exception as e:
                 self.logger.log(LogLevel.ERROR,
-                              f'Atualização de status de impressão do pedido n {order.id} falhou : {str(e)}')
-        return False  # Non-critical failure, continues processing other orders
+                               f'Erro ao imprimir o talão {station} do pedido {order.id} : {str(e)}',
+                               order_id=order.id, attempt=attempt+1, site=self.site.name)
+
+            RETRIES.inc(stage=Stage.PRINTER_SEND, site=self.site.name)
+            self.logger.log(LogLevel.WARNING,
+                          f'Retrying {station} ticket {order.id} (attempt {attempt+1}/{MAX_ATTEMPTS})',
+                          order_id=order.id, attempt=attempt+1, site=self.site.name)
+            if attempt + 1 < MAX_ATTEMPTS:
+                time.sleep(RETRY_DELAY)
+        return station
+
+    def part_sent(self, order_id: int, station: str, data: bytes) -> bool:
+        """
+        True if these bytes were already sent for the order by an earlier, failed attempt to print it.
+        
+        Args:
+            order_id (int): Order being printed
+            station (str): Kitchen station name, None for the receipt
+            data (bytes): Rendered receipt or ticket (a changed order is sent again)
+        """
+        with self.sent_parts_lock:
+            return self.sent_parts.get(order_id, {}).get(station) == hash(data)
+
+    def mark_part_sent(self, order_id: int, station: str, data: bytes):
+        """Remember a receipt or ticket sent, until the whole order is printed (see forget_parts)."""
+        with self.sent_parts_lock:
+            self.sent_parts.setdefault(order_id, {})[station] = hash(data)
+            self.sent_parts.move_to_end(order_id)
+            while len(self.sent_parts) > MAX_PARTIAL_ORDERS:
+                self.sent_parts.popitem(last=False)
+
+    def forget_parts(self, order_id: int):
+        with self.sent_parts_lock:
+            self.sent_parts.pop(order_id, None)
+
+    def run_stage(self, stage: Stage, func: callable, order_id: int = None, attempt: int = None,
+                  succeeded: callable = bool, printer: str = None):
+        """
+        Run one pipeline stage, timing it and recording its duration and outcome (metrics and structured log).
+        
+        Args:
+            stage (Stage): Stage being executed
+            func (callable): Function without arguments that runs the stage
+            order_id (int): Order being processed, if any
+            attempt (int): Attempt number (starting at 1), if the stage is retried
+            succeeded (callable): Maps the function result to its success status
+            printer (str): Printer involved, defaults to the site printer
+            
+        Returns:
+            The function result. Exceptions are recorded and re-raised.
+        """
+        start = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            self.record_stage(stage, time.perf_counter() - start, False, order_id, attempt, error=e, printer=printer)
+            raise
+
+        self.record_stage(stage, time.perf_counter() - start, succeeded(result), order_id, attempt, printer=printer)
+        return result
+
+    def record_stage(self, stage: Stage, elapsed: float, ok: bool, order_id: int = None, attempt: int = None,
+                     error: Exception = None, printer: str = None):
+        """
+        Record the duration and outcome of a pipeline stage in the metrics and the structured log.
+        
+        Args:
+            stage (Stage): Stage executed
+            elapsed (float): Duration in seconds
+            ok (bool): True if the stage succeeded
+            order_id (int): Order being processed, if any
+            attempt (int): Attempt number (starting at 1), if the stage is retried
+            error (Exception): Exception raised by the stage, if any
+            printer (str): Printer involved, defaults to the site printer
+        """
+        printer = printer or self.site.printer_url
+        STAGE_DURATION.observe(elapsed, stage=stage, site=self.site.name)
+        if error is not None:
+            STAGE_FAILURES.inc(stage=stage, error=type(error).__name__, site=self.site.name)
+            self.logger.event(LogLevel.ERROR, stage, "error", order_id, attempt, elapsed * 1000,
+                              printer, error=error, site=self.site.name)
+            return
+
+        if not ok:
+            STAGE_FAILURES.inc(stage=stage, error="failed", site=self.site.name)
+        self.logger.event(LogLevel.INFO if ok else LogLevel.WARNING, stage, "ok" if ok else "failed",
+                          order_id, attempt, elapsed * 1000, printer, site=self.site.name)
 
     def check_printer_connection(self) -> bool:
         """
@@ -237,18 +890,22 @@ class ScriptController:
             bool: True if valid connection exists
         """
         try:
-            # Check existing connection validity
-            if self.printer and self.validate_printer_connection():
-                return True
-            
-            # Establish new connection if needed
-            status, new_printer = connect_printer(self.logger)
-            if status:
-                self.printer = new_printer
-                return True
-            return False
+            with self.printer_lock:
+                # Check existing connection validity
+                if self.printer and self.validate_printer_connection():
+                    self.set_printer_online(True)
+                    return True
+
+                # Establish new connection if needed
+                status, new_printer = connect_printer(self.logger, self.site)
+                self.set_printer_online(status)
+                if status:
+                    self.printer = new_printer
+                    return True
+                return False
             
         except Exception as e:
+            self.set_printer_online(False)
             self.logger.log(LogLevel.ERROR, f'Conexão com impressora falhou: {str(e)}')
             return False
 
@@ -261,8 +918,7 @@ class ScriptController:
         """
         try:
             # Simple test command to verify connection
-            self.printer.text("")
-            return True
+            return self.printer.check()
         except Exception as e:
             self.logger.log(LogLevel.WARNING, 
                            "Teste de atividade da impressora falhou, talvez esteja desconectada...")
@@ -300,5 +956,9 @@ class ScriptController:
             self.logger.log(LogLevel.INFO, f'Cleanup error: {str(e)}')
         finally:
             self.printer = None
+            if self.ack_pool is not None:
+                self.ack_wakeup.set()  # Do not wait for the next retry
+                self.ack_pool.shutdown(wait=False)
+                self.ack_pool = None
             self.running = False
             self.stop_event.set()  # Ensure event flag is reset
\ No newline at end of file
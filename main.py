@@ -1,11 +1,14 @@
 import sys
-import time
-import pystray
+import signal
 import threading
-from PIL import Image, ImageDraw
-from app.settings import BASE_URL, CHECK_SERVER_HEALTH
+from app.settings import (BASE_URL, CHECK_SERVER_HEALTH, METRICS_PORT, METRICS_HOST, PROFILE_SECONDS, PROFILE_WINDOW,
+                          SITES_FILE, ENGINE, HEADLESS, CONTROL_PORT, CONTROL_HOST)
 
-from controllers.script import ScriptController
+from models.site import Site
+from models.event_type import EventType
+
+# Only the engine in use is imported (see build_controller), the tray dependencies (pystray, PIL)
+# only by run_tray and the HTTP servers only when enabled, which keeps startup and restarts fast
 
 def on_exit(icon, item):
     """Handle application shutdown procedure"""
@@ -23,6 +26,52 @@ def on_status(icon, item):
     status = "ON" if controller.running else "OFF"
     icon.notify(f"{status}\nMensagem: {controller.status_message}")
 
+def on_profile(icon, item):
+    """Profile the running script for PROFILE_WINDOW seconds"""
+    if controller.profiler.start(PROFILE_WINDOW):
+        icon.notify(f"A recolher perfil de desempenho durante {PROFILE_WINDOW}s.")
+    else:
+        icon.notify("Já existe um perfil de desempenho em curso.")
+
+def reprint_action(order_id, printer=None):
+    """Menu action reprinting a stored receipt, in the background so the menu doesn't freeze
+    Args:
+        order_id (int): Order to reprint
+        printer (str): Kitchen station, the site printer when None
+    """
+    def reprint(icon):
+        try:
+            reprinted = controller.reprint(order_id, printer)
+        except KeyError:
+            reprinted = False
+        if reprinted:
+            icon.notify(f"Pedido n {order_id} reimpresso.")
+        else:
+            icon.notify(f"Não foi possível reimprimir o pedido n {order_id}.")
+
+    def action(icon, item):
+        threading.Thread(target=reprint, args=(icon,), daemon=True).start()
+    return action
+
+def reprint_menu_items():
+    """Items of the "Reimprimir Pedido" submenu, rebuilt every time the menu opens:
+    the last REPRINT_MENU_SIZE receipts, each with a choice of printer when there are kitchen stations"""
+    import pystray
+
+    entries = controller.recent_receipts()[:REPRINT_MENU_SIZE]
+    if not entries:
+        yield pystray.MenuItem("Sem talões recentes", None, enabled=False)
+    stations = controller.stations()
+    for entry in entries:
+        order_id = entry["order_id"]
+        label = f"Pedido n {order_id} ({entry['stored'][11:16]})"
+        if not stations:
+            yield pystray.MenuItem(label, reprint_action(order_id))
+            continue
+        yield pystray.MenuItem(label, pystray.Menu(
+            pystray.MenuItem("Impressora principal", reprint_action(order_id)),
+            *(pystray.MenuItem(station, reprint_action(order_id, station)) for station in stations)))
+
 def create_image(color):
     """Generate tray icon image with colored square
     Args:
@@ -30,47 +79,107 @@ def create_image(color):
     Returns:
         Image: 64x64 RGB image with centered colored square
     """
+    from PIL import Image, ImageDraw
+
     image = Image.new('RGB', (64, 64), 'white')  # Create white background
     dc = ImageDraw.Draw(image)
     dc.rectangle((16, 16, 48, 48), fill=color)  # Draw centered square
     return image
 
-def update_icon(icon):
-    """Continuous icon color update based on script state
-    Runs in dedicated thread for real-time updates"""
-    while True:
-        # Determine color based on script state
+REPRINT_MENU_SIZE = 10  # Receipts listed in the "Reimprimir Pedido" submenu
+
+icon_images = {}  # Pre-rendered icon per color
+icon_color = None  # Color currently shown
+icon_lock = threading.Lock()
+
+def get_icon_image(color):
+    """Return the icon image of a color, drawing it only the first time"""
+    if color not in icon_images:
+        icon_images[color] = create_image(color)
+    return icon_images[color]
+
+def update_icon(icon, event=None):
+    """Show the icon color of the script state, redrawing only when it changed
+    Called on every STATE_CHANGED event of the controller"""
+    global icon_color
+    with icon_lock:
         color = 'green' if controller.running else 'red'
-        icon.icon = create_image(color)
-        time.sleep(1)  # Update interval
+        if color != icon_color:
+            icon.icon = get_icon_image(color)
+            icon_color = color
 
 def stop_alert(icon):
     controller.stop_alert_sound()
 
 def setup_icon(icon):
-    """Initialize tray icon visibility and start update thread"""
+    """Initialize tray icon visibility and follow the script state through the event bus"""
     icon.visible = True
-    # Start daemon thread for icon updates (auto-kill on main exit)
-    threading.Thread(target=update_icon, args=(icon,), daemon=True).start()
+    controller.events.subscribe(lambda event: update_icon(icon, event), EventType.STATE_CHANGED)
+    update_icon(icon)  # State reached before the subscription
 
-if __name__ == "__main__":
+def build_controller():
+    """Build the controller of the configured mode, importing only that engine"""
+    if SITES_FILE:
+        # Multi-site mode: every site of the file is served by this process
+        from controllers.multi_site import MultiSiteController
+        return MultiSiteController(Site.load_file(SITES_FILE))
 
     print(BASE_URL, CHECK_SERVER_HEALTH)
-    controller = ScriptController()
+    if ENGINE == "async":
+        from controllers.async_script import AsyncScriptController
+        return AsyncScriptController()
+    from controllers.script import ScriptController
+    return ScriptController()
+
+def run_tray():
+    """Run the tray icon (blocks until "Sair")"""
+    import pystray
 
     # Configure system tray icon
     icon = pystray.Icon(
         name="my_script",
         title="Rodizio Impressora",  # Hover text
-        icon=create_image('gray'),  # Initial neutral state
+        icon=get_icon_image('gray'),  # Initial neutral state
         menu=pystray.Menu(
             pystray.MenuItem("Mostrar Status", on_status),
             pystray.MenuItem("Reiniciar Impressão", on_restart),
             pystray.MenuItem("Parar Alerta", stop_alert),
+            pystray.MenuItem("Reimprimir Pedido", pystray.Menu(reprint_menu_items)),
+            pystray.MenuItem("Perfil de Desempenho", on_profile),
             pystray.MenuItem("Sair", on_exit)
         )
     )
 
-    # Start automation script and tray interface
+    icon.run(setup=setup_icon)  # Start tray icon with setup callback
+
+def run_headless():
+    """Run without GUI until SIGINT/SIGTERM, controlled through the local HTTP API"""
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    stop.wait()
+    controller.stop_script()
+
+if __name__ == "__main__":
+    headless = HEADLESS or "--headless" in sys.argv
+
+    controller = build_controller()
+
+    # Optional Prometheus-style endpoint for remote scraping
+    if METRICS_PORT:
+        from services.metrics_server import start_metrics_server
+        start_metrics_server(int(METRICS_PORT), METRICS_HOST)
+
+    # Local control API, always on in headless mode
+    if CONTROL_PORT or headless:
+        from services.control_server import start_control_server
+        start_control_server(controller, int(CONTROL_PORT or 8765), CONTROL_HOST)
+
+    # Start automation script and the tray interface (or wait for a signal when headless)
     controller.start_script()
-    icon.run(setup=setup_icon)  # Start tray icon with setup callback
\ No newline at end of file
+    if PROFILE_SECONDS:
+        controller.profiler.start(PROFILE_SECONDS)
+    if headless:
+        run_headless()
+    else:
+        run_tray()
\ No newline at end of file
@@ -0,0 +1,23 @@
+from enum import Enum
+
+class EventType(Enum):
+    """
+    An enumeration for the events published by the controllers on their EventBus.
+
+    Attributes:
+        STATE_CHANGED (str): The script started or stopped (data: running).
+        ERROR (str): A critical error stopped the script (data: message, log_message).
+        ORDER_PRINTED (str): An order and all its kitchen tickets were printed (data: order_id).
+        PRINTER_STATE (str): The site printer went online or offline (data: online).
+        PRINTER_PAUSED (str): Printing paused or resumed after a paper out or cover open (data: paused, status).
+        NETWORK_STATE (str): Internet and server became unreachable or reachable again (data: online, pending_acks).
+    """
+    STATE_CHANGED = 'state_changed'
+    ERROR = 'error'
+    ORDER_PRINTED = 'order_printed'
+    PRINTER_STATE = 'printer_state'
+    PRINTER_PAUSED = 'printer_paused'
+    NETWORK_STATE = 'network_state'
+
+    def __str__(self):
+        return self.value
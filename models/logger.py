@@ -1,25 +1,32 @@
 import os
+import json
 from datetime import datetime
-from app.settings import LOG_FILE
+from app.settings import LOG_FILE, LOG_FORMAT
 
 class Logger:
     """
     Provides logging capabilities to write messages to a text file for debugging and error tracking.
 
+    When LOG_FORMAT is "json" every entry is written as a single JSON line, so the file can be
+    analysed with `utils.log_query` instead of being scraped with regular expressions.
+
     Attributes:
         filename (str): The path to the log file where entries are recorded.
+        structured (bool): True if entries are written as JSON lines.
     """
-    
-    def __init__(self, filename: str = LOG_FILE):
+
+    def __init__(self, filename: str = LOG_FILE, log_format: str = LOG_FORMAT):
         """
         Initializes the Logger instance.
 
         Args:
             filename (str): The log file path. Defaults to the LOG_FILE defined in settings.
+            log_format (str): "text" or "json". Defaults to the LOG_FORMAT defined in settings.
         """
         self.filename = filename
+        self.structured = log_format == "json"
         self.initialize_log_file()
-        
+
     def initialize_log_file(self):
         """
         Creates the log file with a header if it doesn't already exist.
@@ -30,17 +37,70 @@ class Logger:
                 f.write("========== LOGGING STARTED ==========\n")
                 f.write(f"Created: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write("====================================\n\n")
-    
-    def log(self, log_type: str, message: str):
+
+    def log(self, log_type: str, message: str, **fields):
         """
         Appends a log entry to the log file with the current timestamp.
 
         Args:
             log_type (str): The type of log (e.g., formatted using LogLevel, such as "[ERROR]").
             message (str): The log message to be recorded.
+            **fields: Extra correlation fields (e.g. order_id, attempt), only written in JSON mode.
         """
+        if self.structured:
+            self.write_json({"level": getattr(log_type, "name", str(log_type)), "message": message, **fields})
+            return
+
         timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
         log_entry = f"{log_type} {timestamp} {message}\n"
 
         with open(self.filename, "a", encoding="UTF-8") as f:
             f.write(log_entry)
+
+    def event(self, log_type, stage, outcome: str, order_id: int = None, attempt: int = None,
+              duration_ms: float = None, printer: str = None, error: Exception = None, message: str = "",
+              site: str = None):
+        """
+        Records the outcome of one stage of the processing pipeline.
+
+        Events are only written in JSON mode, the text log keeps its usual messages.
+
+        Args:
+            log_type (LogLevel): Level of the event.
+            stage (Stage): Pipeline stage the event belongs to.
+            outcome (str): "ok", "failed" (returned a failure) or "error" (raised an exception).
+            order_id (int): Order the event refers to, if any.
+            attempt (int): Attempt number (starting at 1), if the stage is retried.
+            duration_ms (float): How long the stage took in milliseconds.
+            printer (str): Printer the stage talked to, if any.
+            error (Exception): Exception raised by the stage, if any.
+            message (str): Free text details.
+            site (str): Site the event belongs to (multi-site mode).
+        """
+        if not self.structured:
+            return
+
+        self.write_json({
+            "level": getattr(log_type, "name", str(log_type)),
+            "site": site,
+            "stage": str(stage),
+            "outcome": outcome,
+            "order_id": order_id,
+            "attempt": attempt,
+            "duration_ms": round(duration_ms, 3) if duration_ms is not None else None,
+            "printer": printer,
+            "error": type(error).__name__ if error is not None else None,
+            "message": message or (str(error) if error is not None else "")
+        })
+
+    def write_json(self, entry: dict):
+        """
+        Appends a JSON line with the current timestamp to the log file.
+
+        Args:
+            entry (dict): The fields to record.
+        """
+        line = json.dumps({"ts": datetime.now().isoformat(timespec="milliseconds"), **entry}, ensure_ascii=False)
+
+        with open(self.filename, "a", encoding="UTF-8") as f:
+            f.write(line + "\n")
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from models.order_product import OrderProduct, OrderProductDto
 from models.customer import Customer
 
@@ -68,6 +68,8 @@ class OrderDto(BaseModel):
     total_price: float
     printed: bool
 
+    _domain: Optional[tuple] = PrivateAttr(default=None)  # (customer, order) built by manipulate_orderDto
+
     def manipulate_orderDto(self) -> tuple:
         """
         Converts the OrderDto instance into corresponding Customer and Order objects.
@@ -77,11 +79,18 @@ class OrderDto(BaseModel):
         Order's customer attribute. The resulting tuple (customer, order) is returned for further processing
         in the application.
 
+        The objects are built on the first call and reused afterwards: an order is converted by the
+        scheduler on every fetch, by the receipt renderer and by the kitchen ticket split. Fetched
+        orders are never modified, an updated order arrives as a new OrderDto.
+
         Returns:
             tuple: A tuple containing:
                 - Customer: The instantiated Customer object with populated attributes.
                 - Order: The instantiated Order object with the associated Customer and populated attributes.
         """
+        if self._domain is not None:
+            return self._domain
+
         customer = Customer(
             name=self.customer,
             email=self.email,
@@ -104,4 +113,5 @@ class OrderDto(BaseModel):
             delivery_time=self.delivery_time
         )
 
-        return (customer, order)
\ No newline at end of file
+        self._domain = (customer, order)
+        return self._domain
\ No newline at end of file
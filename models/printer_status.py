@@ -0,0 +1,45 @@
+from enum import Enum
+
+# ESC/POS real-time status requests (DLE EOT n): offline cause and paper roll sensor
+RT_STATUS_OFFLINE_CAUSE = b'\x10\x04\x02'
+RT_STATUS_PAPER = b'\x10\x04\x04'
+RT_MASK_COVER_OPEN = 0x04      # Offline cause: cover is open
+RT_MASK_PAPER_STOP = 0x20      # Offline cause: printing stopped by paper end
+RT_MASK_PAPER_END = 0x60       # Paper roll sensor: no paper
+
+
+class PrinterStatus(Enum):
+    """
+    An enumeration for the real-time states of the site printer, read by the printer monitor.
+
+    Attributes:
+        READY (str): The printer can print.
+        PAPER_OUT (str): The paper roll ended, printing is paused until it is replaced.
+        COVER_OPEN (str): The cover is open, printing is paused until it is closed.
+        OFFLINE (str): The printer cannot be reached.
+    """
+    READY = 'Pronta'
+    PAPER_OUT = 'Sem papel'
+    COVER_OPEN = 'Tampa aberta'
+    OFFLINE = 'Desligada'
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def paused(self) -> bool:
+        """True if orders must wait for someone to fix the printer, instead of failing."""
+        return self in (PrinterStatus.PAPER_OUT, PrinterStatus.COVER_OPEN)
+
+    @classmethod
+    def from_response(cls, offline_cause: bytes, paper: bytes) -> "PrinterStatus":
+        """
+        Maps the answers to RT_STATUS_OFFLINE_CAUSE and RT_STATUS_PAPER to a state.
+        A printer not answering a request is assumed ready for it.
+        """
+        if offline_cause and offline_cause[0] & RT_MASK_COVER_OPEN:
+            return cls.COVER_OPEN
+        if (offline_cause and offline_cause[0] & RT_MASK_PAPER_STOP) or \
+                (paper and paper[0] & RT_MASK_PAPER_END == RT_MASK_PAPER_END):
+            return cls.PAPER_OUT
+        return cls.READY
@@ -0,0 +1,117 @@
+import json
+from typing import Optional
+from pydantic import BaseModel
+
+from app.settings import (SITE_NAME, BASE_URL, USERNAME, PASSWORD, PRINTER_IP, PRINTER_PORT, PRINTER_SINK,
+                          STATION_PRINTERS, CATEGORY_STATIONS)
+
+
+def parse_mapping(text: str) -> dict:
+    """Parses "key=value,key=value" settings into a dict, ignoring empty entries."""
+    pairs = (item.split("=", 1) for item in text.split(",") if "=" in item)
+    return {key.strip(): value.strip() for key, value in pairs}
+
+
+class Site(BaseModel):
+    """
+    Represents one restaurant served by the script: its backend, credentials and printer.
+
+    A single-site installation uses `Site.from_settings()` (the values of the .env file),
+    a multi-site installation loads several sites from a JSON file with `Site.load_file`.
+
+    Attributes:
+        name (str): Unique site name, used in logs and metrics.
+        base_url (str): Base URL of the backend API (ending with '/').
+        username (str): API username.
+        password (str): API password.
+        printer_ip (str): IP address of the network printer.
+        printer_port (int): TCP port of the network printer.
+        printer_sink (str): Sink URL of the printer (see services.sinks), replaces printer_ip/printer_port.
+        station_printers (dict): Kitchen station name -> printer address ("ip", "ip:port" or a sink URL).
+        category_stations (dict): Product category -> kitchen station name.
+    """
+    name: str
+    base_url: Optional[str] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+    printer_ip: Optional[str] = None
+    printer_port: int = 9100
+    printer_sink: Optional[str] = None
+    station_printers: dict[str, str] = {}
+    category_stations: dict[str, str] = {}
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def auth_url(self) -> str:
+        return f'{self.base_url}auth/'
+
+    @property
+    def orders_url(self) -> str:
+        return f'{self.base_url}order/print-orders/'
+
+    @property
+    def update_order_url(self) -> str:
+        return f'{self.base_url}order/print-orders-status/' # add order.id
+
+    @property
+    def health_url(self) -> str:
+        return f'{self.base_url}app/health-check/'
+
+    @property
+    def printer_url(self) -> str:
+        """Sink URL of the site printer."""
+        return self.printer_sink or f'network://{self.printer_ip}:{self.printer_port}'
+
+    def station_for(self, category: str) -> Optional[str]:
+        """Returns the kitchen station of a product category (case-insensitive), or None."""
+        wanted = category.strip().casefold()
+        for name, station in self.category_stations.items():
+            if name.strip().casefold() == wanted and station in self.station_printers:
+                return station
+        return None
+
+    def station_url(self, station: str) -> str:
+        """Returns the sink URL of a kitchen station printer ("ip" and "ip:port" are network printers)."""
+        address = self.station_printers[station]
+        if "://" in address:
+            return address
+        host, _, port = address.partition(":")
+        return f'network://{host}:{port or 9100}'
+
+
+    @classmethod
+    def from_settings(cls) -> "Site":
+        """Builds the site described by the .env settings."""
+        return cls(
+            name=SITE_NAME,
+            base_url=BASE_URL,
+            username=USERNAME,
+            password=PASSWORD,
+            printer_ip=PRINTER_IP,
+            printer_port=int(PRINTER_PORT or 9100),
+            printer_sink=PRINTER_SINK,
+            station_printers=parse_mapping(STATION_PRINTERS),
+            category_stations=parse_mapping(CATEGORY_STATIONS)
+        )
+
+    @classmethod
+    def load_file(cls, filename: str) -> list["Site"]:
+        """
+        Loads the sites of a multi-site configuration file.
+
+        The file is a JSON list of objects with the Site attributes, e.g.
+        [{"name": "porto", "base_url": "https://.../api/", "username": "...", "password": "...",
+          "printer_ip": "192.168.1.20"}]
+
+        Raises:
+            ValueError: If the file is empty or two sites share the same name.
+        """
+        with open(filename, "r", encoding="UTF-8") as f:
+            sites = [cls(**data) for data in json.load(f)]
+
+        names = [site.name for site in sites]
+        if not sites or len(set(names)) != len(names):
+            raise ValueError(f"{filename} tem de definir pelo menos um site, com nomes únicos.")
+        return sites
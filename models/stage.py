@@ -0,0 +1,25 @@
+from enum import Enum
+
+class Stage(Enum):
+    """
+    An enumeration for the stages an order goes through, used to correlate logs and metrics.
+
+    Attributes:
+        HEALTH_CHECK (str): Internet, printer and server availability checks.
+        AUTH (str): Authentication against the API.
+        FETCH (str): HTTP request for the orders to print.
+        PARSE (str): Validation of the fetched orders into OrderDto objects.
+        RENDER (str): Building the ESC/POS bytes of a receipt.
+        PRINTER_SEND (str): Sending the receipt bytes to the printer.
+        STATUS_UPDATE (str): Marking an order as printed in the API.
+    """
+    HEALTH_CHECK = 'health_check'
+    AUTH = 'auth'
+    FETCH = 'fetch'
+    PARSE = 'parse'
+    RENDER = 'render'
+    PRINTER_SEND = 'printer_send'
+    STATUS_UPDATE = 'status_update'
+
+    def __str__(self):
+        return self.value
@@ -0,0 +1,71 @@
+"""
+Sound alerts played while a critical error is waiting for the operator.
+
+`ScriptController` only depends on the `SoundAlert` interface; the backend is chosen with the
+SOUND_ALERT setting, so the engine runs on Linux print servers without `winsound`.
+"""
+
+import sys
+import time
+from abc import ABC, abstractmethod
+
+from app.settings import SOUND_ALERT
+
+
+class SoundAlert(ABC):
+    """
+    Interface of the alert backends: `beep` plays one tone and blocks for its duration.
+    """
+
+    @abstractmethod
+    def beep(self, frequency: int, duration_ms: int):
+        pass
+
+
+class WinsoundAlert(SoundAlert):
+    """Windows system beep."""
+
+    def __init__(self):
+        import winsound  # Windows only, imported on first use
+        self.winsound = winsound
+
+    def beep(self, frequency: int, duration_ms: int):
+        self.winsound.Beep(frequency, duration_ms)
+
+
+class BellAlert(SoundAlert):
+    """Terminal bell on stdout (headless servers, attached consoles and journald ignore it harmlessly)."""
+
+    def beep(self, frequency: int, duration_ms: int):
+        sys.stdout.write("\a")
+        sys.stdout.flush()
+        time.sleep(duration_ms / 1000)
+
+
+class SilentAlert(SoundAlert):
+    """No sound, the alert loop keeps its pace so stopping it behaves the same."""
+
+    def beep(self, frequency: int, duration_ms: int):
+        time.sleep(duration_ms / 1000)
+
+
+def get_sound_alert(name: str = SOUND_ALERT) -> SoundAlert:
+    """
+    Builds the configured alert backend.
+
+    Args:
+        name (str): "auto" (winsound when available, otherwise silent), "winsound", "bell" or "none".
+
+    Returns:
+        SoundAlert: The alert backend.
+    """
+    if name == "bell":
+        return BellAlert()
+    if name == "none":
+        return SilentAlert()
+    try:
+        return WinsoundAlert()
+    except ImportError:
+        if name == "winsound":
+            raise
+        return SilentAlert()
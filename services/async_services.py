@@ -0,0 +1,277 @@
+"""
+Asynchronous counterparts of the auth, order and printer services, used by AsyncScriptController.
+
+HTTP requests go through an `aiohttp.ClientSession` and network printers are driven through an
+asyncio stream on their TCP port (9100 by default), other sinks from a worker thread (AsyncSink),
+so no call blocks the event loop.
+"""
+
+import asyncio
+
+from app.settings import MAX_ATTEMPTS, RETRY_DELAY
+from models.site import Site
+from models.stage import Stage
+from models.printer_status import PrinterStatus, RT_STATUS_OFFLINE_CAUSE, RT_STATUS_PAPER
+from services.metrics import RETRIES
+
+# ESC/POS real-time status request (DLE EOT 1) and the "offline" bit of its answer
+RT_STATUS_ONLINE = b'\x10\x04\x01'
+RT_MASK_ONLINE = 0x08
+
+
+async def get_auth_tokens_async(session, site: Site) -> tuple:
+    """
+    Retrieves an access token from the site's authorization endpoint.
+
+    Same behaviour and return value as `services.auth.get_auth_tokens`.
+
+    Args:
+        session (aiohttp.ClientSession): HTTP session.
+        site (Site): Site to authenticate against.
+
+    Returns:
+        tuple: (success_status, access_token, error_message)
+    """
+    import aiohttp
+
+    if not site.username and not site.password:
+        return (False, "", "Faltam as credênciais do usuário.")
+
+    json = {
+        "username" : site.username,
+        "password" : site.password
+    }
+
+    for attempt in range(1, MAX_ATTEMPTS):
+        try:
+            async with session.post(site.auth_url, json=json) as response:
+                if response.status == 200:
+                    access_token = (await response.json(content_type=None)).get('access')
+                    if access_token:
+                        return (True, access_token, "")
+                    return (False, "", "Falta o token de acesso na responsta.")
+
+                if response.status == 401:
+                    return (False, "", "Credênciais de Autenticação Inválidas.")
+
+                if response.status >= 500:
+                    RETRIES.inc(stage=Stage.AUTH, site=site.name)
+                    await asyncio.sleep(RETRY_DELAY)
+                    continue
+
+                return (False, "", f"Resposta Inesperada: {response.status} {await response.text()}")
+
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            RETRIES.inc(stage=Stage.AUTH, site=site.name)
+            await asyncio.sleep(RETRY_DELAY)
+        except Exception as e:
+            return (False, "", f'erro inesperado: {str(e)}')
+
+    return (False, "", "Problema com autenticação no servidor.")
+
+
+async def request_orders_async(session, access_token: str, site: Site) -> list[dict]:
+    """
+    Requests the orders to print and returns the decoded JSON payload.
+
+    Raises:
+        Exception: If the HTTP response status code is not 200.
+    """
+    headers = {"Authorization" : f'Bearer {access_token}'}
+
+    async with session.get(site.orders_url, headers=headers) as response:
+        if response.status != 200:
+            raise Exception(f"Falha ou reunir pedidos : {response.status} - {await response.text()}")
+        return await response.json(content_type=None)
+
+
+async def update_order_status_async(session, order_id: int, access_token: str, site: Site) -> bool:
+    """
+    Marks an order as printed.
+
+    Raises:
+        Exception: If the HTTP response status code is not 200.
+    """
+    url = site.update_order_url + f'{order_id}/'
+    headers = {"Authorization" : f"Bearer {access_token}"}
+
+    async with session.put(url, headers=headers) as response:
+        if response.status != 200:
+            raise Exception(f'Falha ao marcar pedido n {order_id} como imprimido : {response.status} - {await response.text()}')
+    return True
+
+
+async def check_url_async(session, url: str) -> bool:
+    """
+    Checks if a URL answers with HTTP 200, trying up to MAX_ATTEMPTS times.
+    """
+    import aiohttp
+
+    try:
+        for _ in range(MAX_ATTEMPTS):
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return True
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return False
+    return False
+
+
+class AsyncPrinter:
+    """
+    Network printer driven through an asyncio stream.
+
+    Attributes:
+        host (str): Printer IP address.
+        port (int): Printer TCP port.
+        timeout (float): Seconds allowed for connecting, status queries and writes.
+    """
+
+    def __init__(self, host: str, port: int = 9100, timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()        # Serialises the jobs of tasks sharing this printer
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self) -> bool:
+        """
+        Opens the connection (if needed) and checks the printer is online.
+
+        Returns:
+            bool: True if the printer answered as online.
+        """
+        try:
+            if not self.connected:
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout)
+            return await self.is_online()
+        except (OSError, asyncio.TimeoutError):
+            await self.close()
+            return False
+
+    async def query(self, request: bytes) -> bytes:
+        """Sends a real-time status request and returns the answer."""
+        self.writer.write(request)
+        await asyncio.wait_for(self.writer.drain(), self.timeout)
+        return await asyncio.wait_for(self.reader.read(16), self.timeout)
+
+    async def is_online(self) -> bool:
+        status = await self.query(RT_STATUS_ONLINE)
+        return len(status) > 0 and not (status[0] & RT_MASK_ONLINE)
+
+    async def status(self) -> PrinterStatus:
+        """
+        Real-time state of the printer (paper, cover), from an open connection.
+
+        Raises:
+            OSError: If the printer does not answer, in which case the connection is closed.
+        """
+        try:
+            return PrinterStatus.from_response(await self.query(RT_STATUS_OFFLINE_CAUSE),
+                                               await self.query(RT_STATUS_PAPER))
+        except (OSError, asyncio.TimeoutError) as e:
+            await self.close()
+            raise OSError(f"Sem resposta de {self.host}:{self.port}: {str(e)}") from e
+
+    async def send(self, data: bytes):
+        """
+        Sends rendered ESC/POS bytes.
+
+        Raises:
+            OSError: If the connection fails, in which case it is closed.
+        """
+        try:
+            self.writer.write(data)
+            await asyncio.wait_for(self.writer.drain(), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            await self.close()
+            raise OSError(f"Falha ao enviar para {self.host}:{self.port}: {str(e)}") from e
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+
+class AsyncSink:
+    """
+    Blocking sink (USB, serial, file, spool, memory, see services.sinks) with the interface of
+    AsyncPrinter. Sinks doing I/O are driven from a worker thread, so the event loop never blocks.
+
+    Attributes:
+        sink (Sink): The wrapped sink.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.opened = False
+        self.lock = asyncio.Lock()        # Serialises the jobs of tasks sharing this printer
+
+    @property
+    def connected(self) -> bool:
+        return self.opened
+
+    async def call(self, func: callable, *args):
+        if self.sink.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def connect(self) -> bool:
+        """
+        Opens the sink (if needed) and checks the printer is online.
+
+        Returns:
+            bool: True if the printer is online.
+        """
+        try:
+            if not self.opened:
+                await self.call(self.sink.open)
+                self.opened = True
+            return await self.call(self.sink.is_online)
+        except Exception:
+            await self.close()
+            return False
+
+    async def status(self) -> PrinterStatus:
+        """
+        Real-time state of the printer (paper, cover), from an open sink.
+
+        Raises:
+            OSError: If it cannot be read, in which case the sink is closed.
+        """
+        try:
+            return await self.call(self.sink.status)
+        except Exception as e:
+            await self.close()
+            raise OSError(f"Sem resposta de {self.sink}: {str(e)}") from e
+
+    async def send(self, data: bytes):
+        """
+        Sends rendered ESC/POS bytes.
+
+        Raises:
+            OSError: If the write fails, in which case the sink is closed.
+        """
+        try:
+            await self.call(self.sink.write, data)
+        except Exception as e:
+            await self.close()
+            raise OSError(f"Falha ao enviar para {self.sink}: {str(e)}") from e
+
+    async def close(self):
+        if self.opened:
+            self.opened = False
+            try:
+                await self.call(self.sink.close)
+            except Exception:
+                pass
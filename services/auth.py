@@ -1,17 +1,22 @@
 import time
-import requests
 
+from app.settings import MAX_ATTEMPTS, RETRY_DELAY, REQUEST_TIMEOUT
+from models.site import Site
+from models.stage import Stage
+from services.http import get_session
+from services.metrics import RETRIES
 
-from app.settings import USERNAME, PASSWORD, MAX_ATTEMPTS, AUTH_URL, RETRY_DELAY
-
-def get_auth_tokens() -> tuple:
+def get_auth_tokens(site: Site = None) -> tuple:
     """
     Retrieves authentication tokens from the authorization server.
 
-    This function attempts to authenticate using predefined USERNAME and PASSWORD credentials,
+    This function attempts to authenticate using the site's USERNAME and PASSWORD credentials,
     and obtains an access token from an authorization endpoint. It will try to send the authentication
     request up to MAX_ATTEMPTS times if needed, handling common HTTP errors and exceptions.
 
+    Args:
+        site (Site): Site to authenticate against. Defaults to the site of the .env settings.
+
     Returns:
         tuple: A tuple containing:
             - success_status (bool): True if the token was successfully retrieved, otherwise False.
@@ -27,25 +32,26 @@ def get_auth_tokens() -> tuple:
       - Waits for a specified RETRY_DELAY between retries for server errors or exceptions.
       - Returns a failure tuple if an unexpected error occurs or if all attempts are exhausted.
     """
-    if not USERNAME and not PASSWORD:
+    from requests.exceptions import RequestException  # imported on first use, see services.http
+
+    site = site or Site.from_settings()
+    if not site.username and not site.password:
         return (False, "", "Faltam as credênciais do usuário.")
     
     json = {
-        "username" : USERNAME,
-        "password" : PASSWORD
+        "username" : site.username,
+        "password" : site.password
     }
 
     for attempt in range(1, MAX_ATTEMPTS):
         try:
-            response = requests.post(
-                AUTH_URL,
+            response = get_session().post(
+                site.auth_url,
                 json=json,
                 headers={"Content-Type": "application/json"},
-                timeout=10
+                timeout=REQUEST_TIMEOUT
             )
 
-            print(json, AUTH_URL)
-
             if response.status_code == 200:
                 access_token = response.json().get('access')
                 if access_token:
@@ -57,12 +63,14 @@ def get_auth_tokens() -> tuple:
                 return (False, "", f"Credênciais de Autenticação Inválidas.")
             
             if response.status_code >= 500:
+                RETRIES.inc(stage=Stage.AUTH, site=site.name)
                 time.sleep(RETRY_DELAY)
                 continue
 
             return (False, "", f"Resposta Inesperada: {response.status_code} {response.text}")
 
-        except requests.exceptions.RequestException as e:
+        except RequestException as e:
+            RETRIES.inc(stage=Stage.AUTH, site=site.name)
             time.sleep(RETRY_DELAY)
         except Exception as e:
             return (False, "", f'erro inesperado: {str(e)}')
@@ -0,0 +1,102 @@
+"""
+Local HTTP control API, the headless replacement of the tray menu.
+
+    GET  /status             {"running": bool, "status": str}
+    GET  /health             200 while running, 503 otherwise (for systemd/docker health checks)
+    GET  /metrics            same output as the metrics endpoint
+    GET  /receipts           {"receipts": [{"order_id", "stored", "site"}], "printers": [kitchen stations]}
+    POST /start              start the script
+    POST /stop               stop the script
+    POST /restart            stop and start the script ("Reiniciar Impressão")
+    POST /alert/stop         stop the alert sound ("Parar Alerta")
+    POST /reprint/<order_id> reprint one of the last receipts, on a kitchen station printer with
+                             ?printer=<station>
+
+The API has no authentication and binds to localhost by default (CONTROL_HOST).
+"""
+
+import json
+import threading
+from urllib.parse import parse_qs
+from http.server import ThreadingHTTPServer
+
+from services.metrics import REGISTRY
+from services.metrics_server import MetricsHandler
+
+
+class ControlHandler(MetricsHandler):
+    """Serves the control API of `controller` (ScriptController or MultiSiteController)."""
+    controller = None
+
+    def send_json(self, code: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            super().do_GET()
+        elif path == "/status":
+            self.send_json(200, {"running": self.controller.running, "status": self.controller.status_message})
+        elif path == "/health":
+            running = self.controller.running
+            self.send_json(200 if running else 503, {"running": running})
+        elif path == "/receipts":
+            self.send_json(200, {"receipts": self.controller.recent_receipts(), "printers": self.controller.stations()})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        controller = self.controller
+
+        if path == "/start":
+            controller.start_script()
+        elif path == "/stop":
+            controller.stop_script()
+        elif path == "/restart":
+            controller.stop_script()
+            controller.start_script()
+        elif path == "/alert/stop":
+            controller.stop_alert_sound()
+        elif path.startswith("/reprint/"):
+            printer = parse_qs(self.path.partition("?")[2]).get("printer", [None])[0]
+            try:
+                order_id = int(path.rsplit("/", 1)[1])
+                reprinted = controller.reprint(order_id, printer)
+            except (ValueError, KeyError):
+                self.send_error(400)
+                return
+            if not reprinted:
+                self.send_json(404, {"reprinted": False, "order_id": order_id})
+                return
+            self.send_json(200, {"reprinted": True, "order_id": order_id})
+            return
+        else:
+            self.send_error(404)
+            return
+
+        self.send_json(200, {"running": controller.running, "status": controller.status_message})
+
+
+def start_control_server(controller, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Starts the control API in a daemon thread.
+
+    Args:
+        controller: ScriptController, AsyncScriptController or MultiSiteController to control.
+        port (int): TCP port to listen on.
+        host (str): Interface to bind, localhost by default.
+
+    Returns:
+        ThreadingHTTPServer: The running server, call `shutdown()` to stop it.
+    """
+    handler = type("BoundControlHandler", (ControlHandler,), {"controller": controller, "registry": REGISTRY})
+    server = ThreadingHTTPServer((host, int(port)), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,148 @@
+"""
+Index of the orders already printed, so an order listed again by the API is not printed twice.
+
+The API can take a while to apply a status update, and a fetch in the meantime lists again an
+order that was just printed (and acknowledged). Every printed order is indexed by its id with a
+hash of its contents: an order listed again with the same contents is skipped, one whose
+contents changed is printed again with a reprint banner.
+
+Entries expire after DEDUP_TTL seconds and at most DEDUP_CAPACITY are kept. With a directory
+(OFFLINE_DIR/<site>) the index is also appended to a JSON Lines file, so it survives restarts:
+
+    <directory>/printed.jsonl    {"id": 12, "hash": "<sha256>", "t": 1700000000.12}
+
+The file is rewritten without the superseded and expired lines on start and once more than
+`capacity` lines were appended, so it never holds more than twice the entries kept in memory.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from models.order import OrderDto
+from app.settings import DEDUP_TTL, DEDUP_CAPACITY
+
+VOLATILE_FIELDS = {"printed"}  # Changed by our own status update, not by the customer
+FILE_NAME = "printed.jsonl"
+
+
+def order_digest(order: OrderDto) -> str:
+    """
+    Hash of the contents of an order: the same for every fetch of an unchanged order.
+
+    Args:
+        order (OrderDto): The order to hash
+
+    Returns:
+        str: Hexadecimal SHA-256 of the order fields (except VOLATILE_FIELDS), keys sorted
+    """
+    content = json.dumps(order.model_dump(mode="json", exclude=VOLATILE_FIELDS), sort_keys=True,
+                         ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(content.encode("UTF-8")).hexdigest()
+
+
+class PrintedIndex:
+    """
+    Bounded, time-expiring index of printed orders: order id -> (content hash, time printed).
+
+    Lookups and additions are O(1) (amortised over the expired entries they drop).
+
+    Attributes:
+        directory (str): Directory of the index file, None to keep it in memory only (also when
+                         the directory cannot be written).
+        ttl (float): Seconds an order is remembered after it was printed.
+        capacity (int): Maximum number of orders remembered, the oldest dropped first.
+    """
+
+    def __init__(self, directory: str = None, ttl: float = DEDUP_TTL, capacity: int = DEDUP_CAPACITY):
+        self.directory = directory
+        self.ttl = ttl
+        self.capacity = capacity
+        self.index = OrderedDict()  # order id -> (hash, time printed), oldest first
+        self.appended = 0           # Lines appended to the file since it was last rewritten
+        self.lock = threading.Lock()
+        if directory:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError:
+                self.directory = None  # Unwritable: kept in memory only, printing must not depend on it
+                return
+            self.load()
+
+    def __len__(self) -> int:
+        with self.lock:
+            self.prune()
+            return len(self.index)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, FILE_NAME)
+
+    def load(self):
+        """Reads the index left by a previous run and rewrites its file without the stale lines."""
+        entries = {}
+        try:
+            with open(self.path, encoding="UTF-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        entries[entry["id"]] = (entry["hash"], entry["t"])
+                    except (ValueError, KeyError, TypeError):
+                        pass  # Partial line of a crash
+        except OSError:
+            pass  # First run
+        with self.lock:
+            for order_id, entry in sorted(entries.items(), key=lambda item: item[1][1]):
+                self.index[order_id] = entry
+            self.prune()
+            try:
+                self.compact()
+            except OSError:
+                self.directory = None  # Unwritable (read-only, full): kept in memory only from now on
+
+    def compact(self):
+        """Rewrites the file with the entries kept (called with the lock held)."""
+        # Written under a temporary name and renamed, so a crash never loses the index
+        with open(self.path + ".tmp", "w", encoding="UTF-8") as f:
+            for order_id, (digest, moment) in self.index.items():
+                f.write(json.dumps({"id": order_id, "hash": digest, "t": moment}) + "\n")
+        os.replace(self.path + ".tmp", self.path)
+        self.appended = 0
+
+    def prune(self):
+        """Drops the entries over capacity or expired (called with the lock held)."""
+        expired = time.time() - self.ttl
+        while self.index:
+            _, (_, moment) = next(iter(self.index.items()))
+            if len(self.index) <= self.capacity and moment >= expired:
+                break
+            self.index.popitem(last=False)
+
+    def get(self, order_id: int) -> str:
+        """Returns the content hash the order had when it was printed, or None if it was not printed."""
+        with self.lock:
+            self.prune()
+            entry = self.index.get(order_id)
+            return entry[0] if entry is not None else None
+
+    def add(self, order_id: int, digest: str):
+        """Records a printed order with the hash of the contents printed."""
+        with self.lock:
+            moment = time.time()
+            self.index[order_id] = (digest, moment)
+            self.index.move_to_end(order_id)
+            self.prune()
+            if not self.directory:
+                return
+            try:
+                if self.appended >= self.capacity:
+                    self.compact()
+                else:
+                    with open(self.path, "a", encoding="UTF-8") as f:
+                        f.write(json.dumps({"id": order_id, "hash": digest, "t": moment}) + "\n")
+                    self.appended += 1
+            except OSError:
+                pass  # Still remembered in memory until the next restart
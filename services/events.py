@@ -0,0 +1,141 @@
+"""
+In-process event bus of the controllers.
+
+Controllers publish state transitions, critical errors, printed orders and printer state changes;
+the metrics, the log and the tray icon subscribe to them instead of polling the controller.
+Callbacks run synchronously in the publishing thread, so they must be quick and must not wait
+on the controller lock.
+"""
+
+import time
+import threading
+
+from models.event_type import EventType
+from models.log_level import LogLevel
+from models.logger import Logger
+from services.metrics import SCRIPT_RUNNING, PRINTER_ONLINE, PRINTER_PAUSED, NETWORK_ONLINE, ORDERS_PRINTED
+
+
+class Event:
+    """
+    One published event.
+
+    Attributes:
+        type (EventType): Kind of event.
+        site (str): Name of the site that published it, None for process-wide events.
+        data (dict): Event details, see EventType.
+        ts (float): Unix time of publication.
+    """
+    __slots__ = ("type", "site", "data", "ts")
+
+    def __init__(self, event_type: EventType, site: str = None, data: dict = None):
+        self.type = event_type
+        self.site = site
+        self.data = data or {}
+        self.ts = time.time()
+
+    def __repr__(self):
+        return f'Event({self.type}, site={self.site}, {self.data})'
+
+
+class EventBus:
+    """
+    Publish/subscribe hub. Subscriptions are copied on write, so publishing takes no lock.
+
+    Attributes:
+        logger (Logger): Logs the exceptions raised by subscribers, which never reach the publisher.
+    """
+
+    def __init__(self, logger: Logger = None):
+        self.logger = logger
+        self.subscribers = ()             # (callback, event types or None for every type)
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback: callable, *event_types: EventType) -> callable:
+        """
+        Registers a callback for the given event types (every type when none is given).
+
+        Args:
+            callback (callable): Called with the Event.
+            *event_types (EventType): Types to receive.
+
+        Returns:
+            callable: Function without arguments that cancels the subscription.
+        """
+        subscription = (callback, frozenset(event_types) or None)
+        with self.lock:
+            self.subscribers = self.subscribers + (subscription,)
+
+        def unsubscribe():
+            with self.lock:
+                self.subscribers = tuple(s for s in self.subscribers if s is not subscription)
+        return unsubscribe
+
+    def publish(self, event_type: EventType, site: str = None, **data):
+        """
+        Delivers an event to its subscribers, in subscription order.
+
+        Args:
+            event_type (EventType): Kind of event.
+            site (str): Name of the publishing site.
+            **data: Event details.
+        """
+        event = Event(event_type, site, data)
+        for callback, event_types in self.subscribers:
+            if event_types is not None and event_type not in event_types:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                if self.logger:
+                    self.logger.log(LogLevel.ERROR, f'Erro no subscritor do evento {event_type}: {str(e)}', site=site)
+
+
+def attach_metrics(bus: EventBus):
+    """Keeps the running, printer, network and printed orders metrics up to date from the bus."""
+    def on_event(event: Event):
+        if event.site is None:
+            return
+        if event.type == EventType.STATE_CHANGED:
+            SCRIPT_RUNNING.set(1 if event.data["running"] else 0, site=event.site)
+        elif event.type == EventType.PRINTER_STATE:
+            PRINTER_ONLINE.set(1 if event.data["online"] else 0, site=event.site)
+        elif event.type == EventType.PRINTER_PAUSED:
+            PRINTER_PAUSED.set(1 if event.data["paused"] else 0, site=event.site)
+        elif event.type == EventType.NETWORK_STATE:
+            NETWORK_ONLINE.set(1 if event.data["online"] else 0, site=event.site)
+        elif event.type == EventType.ORDER_PRINTED:
+            ORDERS_PRINTED.inc(site=event.site)
+
+    bus.subscribe(on_event, EventType.STATE_CHANGED, EventType.PRINTER_STATE, EventType.PRINTER_PAUSED,
+                  EventType.NETWORK_STATE, EventType.ORDER_PRINTED)
+
+
+def attach_logger(bus: EventBus, logger: Logger):
+    """Logs critical errors, start/stop transitions, printer and network state changes from the bus."""
+    def on_event(event: Event):
+        if event.type == EventType.ERROR:
+            logger.log(LogLevel.ERROR, event.data["log_message"], site=event.site)
+        elif event.type == EventType.STATE_CHANGED:
+            logger.log(LogLevel.INFO, "Script iniciado." if event.data["running"] else "Script parado.",
+                       site=event.site)
+        elif event.type == EventType.PRINTER_STATE:
+            if event.data["online"]:
+                logger.log(LogLevel.INFO, "Impressora online.", site=event.site)
+            else:
+                logger.log(LogLevel.WARNING, "Impressora offline.", site=event.site)
+        elif event.type == EventType.PRINTER_PAUSED:
+            if event.data["paused"]:
+                logger.log(LogLevel.WARNING, f'Impressão em pausa: {event.data["status"]}.', site=event.site)
+            else:
+                logger.log(LogLevel.INFO, "Impressão retomada.", site=event.site)
+        elif event.type == EventType.NETWORK_STATE:
+            if event.data["online"]:
+                logger.log(LogLevel.INFO, f'Ligação à internet e ao servidor disponível, {event.data["pending_acks"]} atualizações em espera.',
+                           site=event.site)
+            else:
+                logger.log(LogLevel.WARNING, "Sem ligação à internet ou ao servidor, a imprimir os pedidos já recebidos.",
+                           site=event.site)
+
+    bus.subscribe(on_event, EventType.ERROR, EventType.STATE_CHANGED, EventType.PRINTER_STATE,
+                  EventType.PRINTER_PAUSED, EventType.NETWORK_STATE)
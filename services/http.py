@@ -0,0 +1,39 @@
+import threading
+from typing import TYPE_CHECKING
+
+from app.settings import HTTP_POOL_SIZE
+
+if TYPE_CHECKING:
+    import requests  # Annotations only, imported on the first request (see get_session)
+
+_session = None
+_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """
+    Returns the HTTP session shared by every service (and every site in multi-site mode).
+
+    Reusing one session keeps TCP/TLS connections alive between polling cycles instead of
+    opening a new connection for each request. With RECORD_FILE set every response is also
+    recorded (see services.recorder). `requests` is imported here, on the first
+    request, so it does not weigh on startup.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+
+                from services.recorder import get_recorder
+                recorder = get_recorder()
+                if recorder:
+                    session.hooks["response"].append(recorder.requests_hook)
+                _session = session
+    return _session
@@ -0,0 +1,161 @@
+"""
+Local journal of the orders between their fetch and their acknowledgement, so printing does not
+depend on the network.
+
+Fetched orders are kept in the inbox until printed; printed orders move to the outbox until the
+API accepts their status update. With a directory (OFFLINE_DIR/<site>) both are files, one per
+order, so orders fetched before an outage or a restart are still printed and their
+acknowledgements are still sent once the connection returns:
+
+    <directory>/inbox/<order id>.json     raw order as returned by the API
+    <directory>/outbox/<order id>.json    printed, acknowledgement pending
+"""
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+from models.order import OrderDto
+
+MAX_BACKOFF = 300  # Maximum seconds between attempts of an acknowledgement refused by the API
+
+
+class OrderJournal:
+    """
+    Inbox and outbox of the orders of one site.
+
+    An order listed by the API and already in the outbox was printed and is never printed again;
+    it is only listed because its acknowledgement has not reached the API yet.
+
+    Attributes:
+        directory (str): Directory of the journal files, None to keep them in memory.
+        retry_delay (float): Seconds before the first new attempt of a refused acknowledgement,
+                             doubled on every further refusal (up to MAX_BACKOFF).
+    """
+
+    def __init__(self, directory: str = None, retry_delay: float = 2):
+        self.directory = directory
+        self.retry_delay = retry_delay
+        self.inbox = {}                # order id -> raw order, fetched and not printed
+        self.outbox = OrderedDict()    # order id -> OrderDto, printed and not acknowledged, oldest first
+        self.refusals = {}             # order id -> (refusals, monotonic time of the next attempt)
+        self.lock = threading.Lock()
+        if directory:
+            for kind in ("inbox", "outbox"):
+                os.makedirs(os.path.join(directory, kind), exist_ok=True)
+            self.load()
+
+    def path(self, kind: str, order_id: int) -> str:
+        return os.path.join(self.directory, kind, f"{order_id}.json")
+
+    def load(self):
+        """Reads the orders left by a previous run (outbox in printing order)."""
+        for kind in ("inbox", "outbox"):
+            stored = []
+            folder = os.path.join(self.directory, kind)
+            for name in os.listdir(folder):
+                order_id, extension = os.path.splitext(name)
+                if extension != ".json" or not order_id.isdigit():
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    with open(path, encoding="UTF-8") as f:
+                        stored.append((os.path.getmtime(path), json.load(f)))
+                except (OSError, ValueError):
+                    pass  # Partial file of a crash, the order is listed again by the API
+            with self.lock:
+                for _, raw in sorted(stored, key=lambda entry: entry[0]):
+                    if kind == "inbox":
+                        self.inbox[raw["id"]] = raw
+                    else:
+                        self.outbox[raw["id"]] = OrderDto(**raw)
+
+    def write(self, kind: str, order_id: int, raw: dict):
+        # Written under a temporary name and renamed, so a crash never leaves a partial order
+        path = self.path(kind, order_id)
+        with open(path + ".tmp", "w", encoding="UTF-8") as f:
+            json.dump(raw, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def remove(self, kind: str, order_id: int):
+        try:
+            os.remove(self.path(kind, order_id))
+        except OSError:
+            pass
+
+    def sync(self, data: list[dict]) -> list[dict]:
+        """
+        Replaces the inbox with the orders just fetched, leaving out the printed ones.
+
+        Args:
+            data (list[dict]): Raw orders returned by the API
+
+        Returns:
+            list[dict]: The orders to print
+        """
+        with self.lock:
+            fetched = {raw["id"]: raw for raw in data if raw.get("id") not in self.outbox}
+            if self.directory:
+                for order_id in self.inbox.keys() - fetched.keys():
+                    self.remove("inbox", order_id)  # Acknowledged or cancelled elsewhere
+                for order_id, raw in fetched.items():
+                    if self.inbox.get(order_id) != raw:
+                        self.write("inbox", order_id, raw)
+            self.inbox = fetched
+            return list(fetched.values())
+
+    def pending(self) -> list[dict]:
+        """Returns the fetched orders not printed yet (printed while the network is down)."""
+        with self.lock:
+            return list(self.inbox.values())
+
+    def printed(self, order: OrderDto):
+        """Moves a printed order to the outbox, where it waits for its acknowledgement."""
+        with self.lock:
+            raw = self.inbox.pop(order.id, None)
+            self.outbox[order.id] = order
+            if not self.directory:
+                return
+            try:
+                os.replace(self.path("inbox", order.id), self.path("outbox", order.id))
+            except OSError:
+                self.write("outbox", order.id, raw if raw is not None else order.model_dump(mode="json"))
+
+    def acknowledged(self, order_id: int):
+        """Forgets an order whose acknowledgement reached the API."""
+        with self.lock:
+            self.outbox.pop(order_id, None)
+            self.refusals.pop(order_id, None)
+            if self.directory:
+                self.remove("outbox", order_id)
+
+    def refused(self, order_id: int):
+        """Delays the next attempt of an acknowledgement the API refused (exponential backoff)."""
+        with self.lock:
+            count = self.refusals.get(order_id, (0, 0))[0] + 1
+            delay = min(self.retry_delay * 2 ** (count - 1), MAX_BACKOFF)
+            self.refusals[order_id] = (count, time.monotonic() + delay)
+
+    def next_retry(self, limit: int) -> float:
+        """
+        Returns the seconds until the next attempt of an acknowledgement refused fewer than `limit`
+        times, or None if there is none.
+        """
+        now = time.monotonic()
+        with self.lock:
+            waits = [max(0, moment - now) for order_id, (count, moment) in self.refusals.items()
+                     if count < limit and order_id in self.outbox]
+        return min(waits) if waits else None
+
+    def due(self) -> list[OrderDto]:
+        """Returns the printed orders whose acknowledgement can be sent now, oldest first."""
+        now = time.monotonic()
+        with self.lock:
+            return [order for order_id, order in self.outbox.items()
+                    if self.refusals.get(order_id, (0, 0))[1] <= now]
+
+    def __len__(self) -> int:
+        """Number of acknowledgements waiting to be sent."""
+        return len(self.outbox)
@@ -0,0 +1,142 @@
+"""
+End-to-end order latency tracking, measured from the order's `created` timestamp.
+
+For every order the tracker records how long it took to be fetched, printed and acknowledged
+(marked as printed in the API). Percentiles are kept in fixed-size sketches, so memory does not
+grow with the number of orders, and orders printed too close to their `delivery_time` are flagged.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from models.order import OrderDto
+from models.logger import Logger
+from models.log_level import LogLevel
+from app.settings import LATENCY_WINDOW, LATE_PRINT_MARGIN, SITE_NAME
+from utils.quantiles import QuantileSketch
+from services.metrics import Histogram, Gauge, Counter
+
+PHASES = ("fetch", "print", "ack")
+
+ORDER_LATENCY = Histogram("printer_order_latency_seconds", "Tempo desde a criação do pedido até cada fase.",
+                          ("site", "phase"), buckets=(5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200))
+ORDER_LATENCY_QUANTILE = Gauge("printer_order_latency_quantile_seconds",
+                               "Percentis da janela atual do tempo desde a criação do pedido.", ("site", "phase", "quantile"))
+LATE_PRINTS = Counter("printer_late_prints_total", "Pedidos impressos perto demais da hora de entrega.", ("site",))
+
+
+def seconds_since(moment: datetime) -> float:
+    """Seconds elapsed since `moment`, using the same timezone awareness as `moment`."""
+    return (datetime.now(moment.tzinfo) - moment).total_seconds()
+
+
+class RollingQuantiles:
+    """
+    Quantile sketches for the current time window and for the whole uptime.
+
+    When the window expires the current sketch is replaced by an empty one, so the "window"
+    percentiles follow recent behaviour while memory stays constant.
+
+    Attributes:
+        window (float): Window length in seconds.
+        current (QuantileSketch): Observations of the current window.
+        total (QuantileSketch): Observations since start.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self.started = time.monotonic()
+        self.current = QuantileSketch()
+        self.total = QuantileSketch()
+
+    def add(self, x: float):
+        if time.monotonic() - self.started >= self.window:
+            self.started = time.monotonic()
+            self.current = QuantileSketch()
+        self.current.add(x)
+        self.total.add(x)
+
+    def summary(self) -> dict:
+        return {"window": self.current.summary(), "total": self.total.summary()}
+
+
+class OrderLatencyTracker:
+    """
+    Records, per order, the time from `created` to fetch, print and acknowledgement.
+
+    Attributes:
+        logger (Logger): Logger used to report late prints.
+        site (str): Site name, used as metrics label.
+        late_margin (float): Minimum seconds between printing and `delivery_time`, below it the print is late.
+        phases (dict): RollingQuantiles per phase ("fetch", "print", "ack").
+        late_orders (int): Number of orders printed too close to their delivery time.
+    """
+
+    def __init__(self, logger: Logger, site: str = SITE_NAME, window: float = LATENCY_WINDOW,
+                 late_margin: float = LATE_PRINT_MARGIN, max_seen: int = 1000):
+        self.logger = logger
+        self.site = site
+        self.late_margin = late_margin
+        self.phases = {phase: RollingQuantiles(window) for phase in PHASES}
+        self.late_orders = 0
+        self.lock = threading.Lock()
+        # Orders already recorded as fetched, so re-fetches (e.g. failed acknowledgement) are not counted twice
+        self.seen = OrderedDict()
+        self.max_seen = max_seen
+
+    def record(self, phase: str, order: OrderDto) -> float:
+        """
+        Records the latency of one phase of an order.
+
+        Returns:
+            float: Seconds since the order was created.
+        """
+        latency = seconds_since(order.created)
+        with self.lock:
+            rolling = self.phases[phase]
+            rolling.add(latency)
+            window = rolling.current
+        ORDER_LATENCY.observe(latency, site=self.site, phase=phase)
+        for q in window.quantiles:
+            ORDER_LATENCY_QUANTILE.set(window.quantile(q), site=self.site, phase=phase, quantile=q)
+        return latency
+
+    def fetched(self, order: OrderDto):
+        """Records the fetch latency, only the first time the order is seen."""
+        with self.lock:
+            if order.id in self.seen:
+                return
+            self.seen[order.id] = True
+            if len(self.seen) > self.max_seen:
+                self.seen.popitem(last=False)
+        self.record("fetch", order)
+
+    def printed(self, order: OrderDto):
+        """Records the print latency and flags the order if it was printed too close to its delivery time."""
+        self.record("print", order)
+
+        margin = -seconds_since(order.delivery_time)
+        if margin < self.late_margin:
+            with self.lock:
+                self.late_orders += 1
+            LATE_PRINTS.inc(site=self.site)
+            self.logger.log(LogLevel.WARNING,
+                            f'Pedido n {order.id} impresso a {margin / 60:.1f} minutos da hora de entrega',
+                            order_id=order.id, site=self.site, delivery_margin_s=round(margin, 1))
+
+    def acknowledged(self, order: OrderDto):
+        """Records the acknowledgement latency and forgets the order."""
+        self.record("ack", order)
+        with self.lock:
+            self.seen.pop(order.id, None)
+
+    def summary(self) -> dict:
+        """
+        Returns the window and total p50/p95/p99 of every phase, in seconds, plus the late prints count.
+        """
+        with self.lock:
+            data = {phase: rolling.summary() for phase, rolling in self.phases.items()}
+            data["late_orders"] = self.late_orders
+        return data
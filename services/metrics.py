@@ -0,0 +1,182 @@
+"""
+In-process metrics (counters, gauges and histograms) exposed in the Prometheus text format.
+
+Metrics are kept in memory by a registry and rendered on demand by `services.metrics_server`.
+Every metric supports labels, given as keyword arguments when updating it.
+"""
+
+import math
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Registry:
+    """
+    Holds every registered metric and renders them in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Returns every metric in the Prometheus text format (version 0.0.4).
+        """
+        with self.lock:
+            metrics = list(self.metrics)
+        return "".join(metric.render() for metric in metrics)
+
+
+REGISTRY = Registry()
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{k}="{escape_label(v)}"' for k, v in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Base class of all metrics.
+
+    Attributes:
+        name (str): Metric name, as seen by Prometheus.
+        documentation (str): Help text.
+        labelnames (tuple): Names of the labels the metric accepts.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} espera as labels {self.labelnames}, recebeu {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> str:
+        return f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+
+    def render(self) -> str:
+        with self.lock:
+            items = list(self.values.items())
+        lines = [self.header()]
+        for key, value in items:
+            lines.append(f"{self.name}{format_labels(dict(zip(self.labelnames, key)))} {format_value(value)}\n")
+        return "".join(lines)
+
+
+class Counter(Metric):
+    """A monotonically increasing count (e.g. retries, failures)."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self.key(labels), 0)
+
+
+class Gauge(Metric):
+    """A value that can go up and down (e.g. queue depth, printer state)."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self.values.get(self.key(labels), 0)
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values (e.g. stage durations in seconds) over fixed buckets.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the buckets, +Inf is always added.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS, registry: Registry = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            data = self.values.get(key)
+            if data is None:
+                data = self.values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data["counts"][i] += 1
+                    break
+            data["sum"] += value
+            data["count"] += 1
+
+    def render(self) -> str:
+        with self.lock:
+            items = [(key, {"counts": list(d["counts"]), "sum": d["sum"], "count": d["count"]})
+                     for key, d in self.values.items()]
+        lines = [self.header()]
+        for key, data in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, data["counts"]):
+                cumulative += count
+                bucket_labels = format_labels({**labels, "le": format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}\n")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(data['sum'])}\n")
+            lines.append(f"{self.name}_count{format_labels(labels)} {data['count']}\n")
+        return "".join(lines)
+
+
+# Metrics collected by the controller and services, labelled by site
+STAGE_DURATION = Histogram("printer_stage_duration_seconds", "Duração de cada etapa do processamento.", ("site", "stage"))
+STAGE_FAILURES = Counter("printer_stage_failures_total", "Etapas que falharam, por classe de erro.", ("site", "stage", "error"))
+RETRIES = Counter("printer_retries_total", "Novas tentativas, por etapa.", ("site", "stage"))
+QUEUE_DEPTH = Gauge("printer_queue_depth", "Pedidos por imprimir no lote atual.", ("site",))
+PRINTER_ONLINE = Gauge("printer_online", "Estado da impressora (1 ligada, 0 desligada).", ("site",))
+PRINTER_PAUSED = Gauge("printer_paused", "Impressão em pausa por falta de papel ou tampa aberta (1 em pausa).", ("site",))
+NETWORK_ONLINE = Gauge("printer_network_online", "Ligação à internet e ao servidor (1 ligada, 0 sem ligação).", ("site",))
+SCRIPT_RUNNING = Gauge("printer_script_running", "Estado do script (1 a correr, 0 parado).", ("site",))
+ORDERS_PRINTED = Counter("printer_orders_printed_total", "Pedidos impressos com sucesso.", ("site",))
+DUPLICATE_ORDERS = Counter("printer_duplicate_orders_total", "Pedidos listados de novo depois de impressos: ignorados (skipped) ou reimpressos por terem sido alterados (reprinted).", ("site", "outcome"))
@@ -0,0 +1,44 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.metrics import REGISTRY, Registry
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry in the Prometheus text format on GET /metrics."""
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent, keep them out of stderr
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Starts the /metrics HTTP endpoint in a daemon thread.
+
+    Args:
+        port (int): TCP port to listen on.
+        host (str): Interface to bind, all interfaces by default so the box can be scraped remotely.
+        registry (Registry): Registry to expose.
+
+    Returns:
+        ThreadingHTTPServer: The running server, call `shutdown()` to stop it.
+    """
+    handler = type("BoundMetricsHandler", (MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, int(port)), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
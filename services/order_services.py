@@ -1,26 +1,48 @@
-import requests
+from abc import ABC, abstractmethod
 from datetime import datetime
 
 from models.order import OrderDto, Order
 from models.product import Product
 from models.order_product import OrderProduct, OrderProductDto
-from app.settings import ORDERS_URL, UPDATE_ORDER_URL
+from models.site import Site
+from app.settings import ORDER_SOURCE, REQUEST_TIMEOUT
+from services.http import get_session
 
-def fetch_orders(access_token : str) -> list[OrderDto]:
+def fetch_orders(access_token : str, site : Site = None) -> list[OrderDto]:
     """
     Retrieves orders from the remote service.
 
-    This function makes an HTTP GET request to the orders endpoint using the provided access key.
-    It builds the necessary headers for authorization and content type, then processes the response.
-    If the response indicates a failure (status code other than 200), an exception is raised. Otherwise,
-    the JSON response is parsed and used to create a list of OrderDto objects.
+    This function makes an HTTP GET request to the orders endpoint using the provided access key
+    (see `request_orders`) and parses the JSON response into a list of OrderDto objects
+    (see `parse_orders`).
 
     Args:
         access_token (str): The bearer token used to authorize the request to the orders service.
+        site (Site): Site to fetch from. Defaults to the site of the .env settings.
 
     Returns:
         List[OrderDto]: A list of OrderDto objects representing the orders retrieved from the service.
 
+    Raises:
+        Exception: If the HTTP response status code is not 200, indicating a failure to fetch orders.
+    """
+    return parse_orders(request_orders(access_token, site))
+
+
+def request_orders(access_token : str, site : Site = None) -> list[dict]:
+    """
+    Sends the HTTP GET request for the orders to print and returns the decoded JSON payload.
+
+    It builds the necessary headers for authorization and content type, then processes the response.
+    If the response indicates a failure (status code other than 200), an exception is raised.
+
+    Args:
+        access_token (str): The bearer token used to authorize the request to the orders service.
+        site (Site): Site to fetch from. Defaults to the site of the .env settings.
+
+    Returns:
+        list[dict]: The raw order data returned by the service.
+
     Raises:
         Exception: If the HTTP response status code is not 200, indicating a failure to fetch orders.
     """
@@ -29,21 +51,29 @@ def fetch_orders(access_token : str) -> list[OrderDto]:
         "Content-Type" : "application/json"
     }
 
-    response = requests.get(ORDERS_URL, headers=headers)
+    site = site or Site.from_settings()
+    response = get_session().get(site.orders_url, headers=headers, timeout=REQUEST_TIMEOUT)
 
     if response.status_code != 200:
         raise Exception(f"Falha ou reunir pedidos : {response.status_code} - {response.text}")
     
-    data = response.json()
-    orders = [OrderDto(**order_data) for order_data in data]
+    return response.json()
 
-    for order in orders:
-        print(order)
 
-    return orders
+def parse_orders(data : list[dict]) -> list[OrderDto]:
+    """
+    Validates the raw order data returned by the service into OrderDto objects.
+
+    Args:
+        data (list[dict]): The decoded JSON payload of the orders endpoint.
+
+    Returns:
+        List[OrderDto]: A list of OrderDto objects.
+    """
+    return [OrderDto(**order_data) for order_data in data]
 
 
-def update_order_status(order : Order, access_token : str) -> bool:
+def update_order_status(order : Order, access_token : str, site : Site = None) -> bool:
     """
     Updates the status of an order to 'printed'.
 
@@ -56,6 +86,7 @@ def update_order_status(order : Order, access_token : str) -> bool:
     Args:
         order (Order): The Order object whose status is to be updated.
         access_token (str): The access token used for authorization.
+        site (Site): Site the order belongs to. Defaults to the site of the .env settings.
 
     Returns:
         bool: True if the order status is updated successfully.
@@ -63,14 +94,15 @@ def update_order_status(order : Order, access_token : str) -> bool:
     Raises:
         Exception: If the HTTP response status code is not 200, indicating a failure to update.
     """
-    url = UPDATE_ORDER_URL + f'{order.id}/'
+    site = site or Site.from_settings()
+    url = site.update_order_url + f'{order.id}/'
 
     headers = {
         "Authorization" : f"Bearer {access_token}",
         "Content-Type" : "application/json"
     }
 
-    response = requests.put(url, headers=headers)
+    response = get_session().put(url, headers=headers, timeout=REQUEST_TIMEOUT)
     if response.status_code != 200:
         raise Exception(f'Falha ao marcar pedido n {order.id} como imprimido : {response.status_code} - {response.text}')
     
@@ -121,4 +153,65 @@ def dummy_fetch_orders() -> list[OrderDto]:
 
     orders.append(dummy_order_dto)
 
-    return orders
\ No newline at end of file
+    return orders
+
+LOCAL_TOKEN = "local"  # Access token passed to the sources that do not authenticate (OrderSource.remote False)
+
+
+class OrderSource(ABC):
+    """
+    Where a controller gets the orders to print from, and where it acknowledges them.
+
+    The default is the site API (`ApiOrderSource`); `services.synthetic.SyntheticOrderSource`
+    generates orders locally for load and soak tests. The async variants are used by
+    AsyncScriptController and default to the blocking methods, for sources without I/O.
+
+    Attributes:
+        remote (bool): True if the source needs the network and the site credentials. For local
+                       sources the controllers skip the internet and server checks and the
+                       authentication, and pass LOCAL_TOKEN as the access token.
+    """
+    remote = True
+
+    @abstractmethod
+    def request_orders(self, access_token : str, site : Site) -> list[dict]:
+        """Returns the raw data of the orders waiting to be printed."""
+
+    @abstractmethod
+    def update_order_status(self, order : OrderDto, access_token : str, site : Site) -> bool:
+        """Marks an order as printed, raising an exception on failure."""
+
+    async def request_orders_async(self, session, access_token : str, site : Site) -> list[dict]:
+        return self.request_orders(access_token, site)
+
+    async def update_order_status_async(self, session, order : OrderDto, access_token : str, site : Site) -> bool:
+        return self.update_order_status(order, access_token, site)
+
+
+class ApiOrderSource(OrderSource):
+    """The orders endpoints of the site API."""
+
+    def request_orders(self, access_token : str, site : Site) -> list[dict]:
+        return request_orders(access_token, site)
+
+    def update_order_status(self, order : OrderDto, access_token : str, site : Site) -> bool:
+        return update_order_status(order, access_token, site)
+
+    async def request_orders_async(self, session, access_token : str, site : Site) -> list[dict]:
+        from services.async_services import request_orders_async
+        return await request_orders_async(session, access_token, site)
+
+    async def update_order_status_async(self, session, order : OrderDto, access_token : str, site : Site) -> bool:
+        from services.async_services import update_order_status_async
+        return await update_order_status_async(session, order.id, access_token, site)
+
+
+def get_order_source(name : str = None) -> OrderSource:
+    """
+    Builds the order source selected by ORDER_SOURCE: "api" (default) or "synthetic".
+    """
+    name = name or ORDER_SOURCE
+    if name == "synthetic":
+        from services.synthetic import SyntheticOrderSource
+        return SyntheticOrderSource()
+    return ApiOrderSource()
@@ -1,40 +1,47 @@
 import time
-from escpos.printer import Network
 
 from models.order import OrderDto
 from models.logger import Logger
 from models.log_level import LogLevel
-from app.settings import MAX_ATTEMPTS, PRINTER_IP, RETRY_DELAY
+from models.site import Site
+from app.settings import MAX_ATTEMPTS, RETRY_DELAY
+from services.sinks import Sink, create_sink
 from utils.strings import wrapper, calculated_space_between
 
-def connect_printer(logger: Logger) -> tuple:
+REPRINT_BANNER = "REIMPRESSÃO"  # Title of the receipts and tickets of an order printed again because it changed
+
+# python-escpos loads its printer capability database on import (a few hundred ms), so it is
+# imported by the functions below (and by services.sinks) on first use instead of at startup
+
+def connect_printer(logger: Logger, site: Site = None) -> tuple:
     """
-    Attempts to connect to a network printer and configure it for text printing.
+    Attempts to open the site printer sink (network, USB, serial, file, spool or memory, see services.sinks).
 
     The function tries to establish a connection with the printer up to a maximum number of
     attempts defined by MAX_ATTEMPTS. On each attempt, it:
-      - Instantiates a Network printer object using the PRINTER_IP.
-      - Sets the printer's character encoding to 'CP858' (this may be adjusted based on the printer).
+      - Builds the sink of the site's printer URL (by default its IP and port).
       - Opens the connection to the printer.
-      - Checks if the printer is online, and if so, sends an empty text to verify connectivity,
-        then returns a tuple (True, printer).
+      - Checks if the printer is online, and if so returns a tuple (True, sink).
 
     If the printer is not online, the connection is closed and the function waits for 2 seconds
     before retrying. In case of any exception during connection, the error is logged with the Logger.
     If the connection fails after all attempts, the function returns (False, None).
 
+    Args:
+        logger (Logger): An instance of the Logger class used to log errors.
+        site (Site): Site whose printer to connect to. Defaults to the site of the .env settings.
+
     Returns:
         tuple: A tuple where the first element is a boolean indicating whether the connection
-               was successful, and the second element is the printer object (or None if unsuccessful).
+               was successful, and the second element is the sink (or None if unsuccessful).
     """
+    site = site or Site.from_settings()
     for attempt in range(MAX_ATTEMPTS):
         try:
-            printer = Network(PRINTER_IP)
-            printer.charcode('CP858') # change to other charset if your printer allows
+            printer = create_sink(site.printer_url)
             printer.open()
             
             if printer.is_online():
-                printer.text("")
                 return (True, printer)
             printer.close()
         
@@ -44,114 +51,247 @@ def connect_printer(logger: Logger) -> tuple:
     return (False, None)
 
 
-def print_order(order_dto : OrderDto, printer : Network, logger : Logger) -> bool:
+def print_order(order_dto : OrderDto, printer : Sink, logger : Logger) -> bool:
     """
     Prints an order receipt to an 80mm printer with formatted customer and order details.
 
-    This function formats and sends order details to a network-connected printer. It uses the provided
-    `order` and `customer` objects to build a formatted receipt, which includes order information,
-    customer details, and a list of ordered products. The text is wrapped using the `wrapper` function to
-    fit within the printer's width constraints. Printer settings like alignment and bold formatting are
-    applied to enhance the printed output. If any errors occur during printing, the error is logged,
-    and the printer connection is closed.
+    The receipt is first rendered to ESC/POS bytes with `render_order` and then sent to the
+    printer in a single write with `send_order`.
 
     Args:
-        order (Order): The order instance containing details such as order ID, delivery information,
-                       order products, and total price.
-        customer (Customer): The customer instance with details such as name, email, NIF, address,
-                             and phone number.
-        printer (Network.Printer): An instance of the printer, expected to have the method `set` and
-                                   other printing methods like `text` and `cut`.
+        order_dto (OrderDto): The order to print.
+        printer (Sink): The open printer sink.
         logger (Logger): An instance of the Logger class used to log errors.
 
     Returns:
         bool: True if the order was printed successfully, False if any errors occurred or if the printer
               is not properly connected.
     """
-
     if not printer:
         logger.log(LogLevel.ERROR, f"Sem impressora conectada.")
         return False
-    
+
     try:
-        customer, order = order_dto.manipulate_orderDto()
-        # A dictionary with formatted order and customer details.
-        data = {
-            "fast_info" : f'{order.order_fast_info()}',
-            "title" : f"Pedido n.{str(order.id)} Rodízio Ementa Digital",
-
-            "order_type" : f"Tipo do Pedido: {order.order_type()}",
-            "delivery_date_time" : f"Data e Hora da Entrega: {order.formated_date()} {order.formated_time()}",
-            
-            "customer_title" : f"Informações do Cliente",
-            "locality" : f"Localidade de Entrega: {customer.locality_name if customer.locality_name is not None else ''}",
-            "indication" : f"Ponto de Referência: {customer.indication if customer.indication is not None else ''}",
-            "nif" : f"NIF: {customer.nif}",
-            "full_address" : f"Morada: {customer.full_address}",
-            "customer" : f"Cliente: {customer.name}",
-            "email" : f"Email: {customer.email}",
-            "phone_number" : f"Tel.: {customer.phone_number}",
-
-            "product_order_title" : f"Produtos do Pedido:",
-            "total" : f"TOTAL: {order.total_price} EUR"
-        }
-
-        # Fast Order info
-        printer.set(align="center", bold=True, custom_size=True, width=3, height=3)
-        printer.text(wrapper(data["fast_info"]))
-        printer.set(normal_textsize=True)
-
-        # Print Order most critical data info
-        printer.set(align="center", bold=True)
-        printer.text(wrapper(data["title"]))
-        printer.set(align="left", bold=False)
-        printer.text(wrapper(data["order_type"]))
-        printer.set(align="left", bold=True)
-        printer.text(wrapper(data["delivery_date_time"]))
-        printer.set(align="left", bold=False)
-        printer.text(wrapper(data["nif"]))
-        printer.text(wrapper(data["locality"]))
-        printer.text(wrapper(data["full_address"]))
-        printer.text(wrapper(data["indication"]))
-        printer.text("\n")
-
-        # Print Customer only info
-        printer.set(align="center", bold=True)
-        printer.text(wrapper(data["customer_title"]))
-        printer.set(align="left", bold=False)
-        printer.text(wrapper(data["customer"]))
-        printer.text(wrapper(data["email"]))
-        printer.text(wrapper(data["phone_number"]))
-        printer.text("\n")
-
-        # Print the product details of the order
-        printer.set(align="center", bold=True)
-        printer.text(wrapper(data["product_order_title"]))
-        printer.set(align="left", bold=False)
-
-        # Iterate through each ordered product and print its details.
-        for instance in order.order_products:
-            
-            qnt_and_product = f'{instance.quantity}x {instance.product.product_name}'
+        data = render_order(order_dto)
+    except AttributeError as e:
+        logger.log(LogLevel.ERROR, f"Erro ao imprimir o pedido nº{order_dto.id} : {str(e)}", order_id=order_dto.id)
+        return False
 
-            # Format a line that shows the quantity and price with appropriate spacing.
-            quantity_price_line = calculated_space_between(f'{qnt_and_product}', instance.price_str())
-            printer.text(quantity_price_line + '\n')
+    return send_order(order_dto.id, data, printer, logger)
 
-            if instance.note.strip() != "":
-                printer.text(wrapper(f'Nota do Pedido: {instance.note}'))
-                printer.text("\n")
-        
-        printer.text("\n")
-        printer.set(align="center", bold=True, custom_size=True, width=2, height=2)
-        printer.text(data["total"])
-        printer.set(align="left", bold=False, custom_size=False)
 
-        printer.cut()
-        return True            
+def send_order(order_id : int, data : bytes, printer : Sink, logger : Logger) -> bool:
+    """
+    Sends an already rendered receipt to the printer.
+
+    Args:
+        order_id (int): Id of the order, used for logging.
+        data (bytes): The ESC/POS bytes returned by `render_order`.
+        printer (Sink): The open printer sink.
+        logger (Logger): An instance of the Logger class used to log errors.
+
+    Returns:
+        bool: True if the bytes were sent, False if there is no printer or the connection failed
+              (in which case the connection is closed).
+    """
+    if not printer:
+        logger.log(LogLevel.ERROR, f"Sem impressora conectada.")
+        return False
+
+    try:
+        printer.write(data)
+        return True
 
     except (AttributeError, OSError) as e:
-        logger.log(LogLevel.ERROR, f"Erro ao imprimir o pedido nº{order.id} : {str(e)}")
+        logger.log(LogLevel.ERROR, f"Erro ao imprimir o pedido nº{order_id} : {str(e)}", order_id=order_id)
         printer.close()
         return False
+
+
+def print_reprint_banner(printer):
+    """Prints REPRINT_BANNER, inverted, on top of a receipt or ticket of an order printed before."""
+    printer.set(align="center", bold=True, invert=True, custom_size=True, width=2, height=2)
+    printer.text(wrapper(REPRINT_BANNER))
+    printer.set(align="center", bold=False, invert=False, normal_textsize=True)
+    printer.text(wrapper("Pedido alterado depois de impresso"))
+    printer.text("\n")
+
+
+def render_order(order_dto : OrderDto, reprint : bool = False) -> bytes:
+    """
+    Renders an order receipt for an 80mm printer into ESC/POS bytes.
+
+    This function uses the provided `order_dto` to build a formatted receipt, which includes order
+    information, customer details, and a list of ordered products. The text is wrapped using the
+    `wrapper` function to fit within the printer's width constraints. Printer settings like alignment
+    and bold formatting are applied to enhance the printed output.
+
+    The commands are recorded by an in-memory `Dummy` printer using the same character table as the
+    real printer, so nothing touches the network while the receipt is being built.
+
+    Args:
+        order_dto (OrderDto): The order instance containing details such as order ID, delivery information,
+                              customer details, order products, and total price.
+        reprint (bool): Starts the receipt with REPRINT_BANNER, for an order printed before whose
+                        contents changed (see services.dedup).
+
+    Returns:
+        bytes: The ESC/POS commands of the receipt, ending with a paper cut.
+    """
+    from escpos.printer import Dummy
+
+    printer = Dummy()
+    printer.charcode('CP858') # change to other charset if your printer allows
+
+    customer, order = order_dto.manipulate_orderDto()
+    # A dictionary with formatted order and customer details.
+    data = {
+        "fast_info" : f'{order.order_fast_info()}',
+        "title" : f"Pedido n.{str(order.id)} Rodízio Ementa Digital",
+
+        "order_type" : f"Tipo do Pedido: {order.order_type()}",
+        "delivery_date_time" : f"Data e Hora da Entrega: {order.formated_date()} {order.formated_time()}",
+        
+        "customer_title" : f"Informações do Cliente",
+        "locality" : f"Localidade de Entrega: {customer.locality_name if customer.locality_name is not None else ''}",
+        "indication" : f"Ponto de Referência: {customer.indication if customer.indication is not None else ''}",
+        "nif" : f"NIF: {customer.nif}",
+        "full_address" : f"Morada: {customer.full_address}",
+        "customer" : f"Cliente: {customer.name}",
+        "email" : f"Email: {customer.email}",
+        "phone_number" : f"Tel.: {customer.phone_number}",
+
+        "product_order_title" : f"Produtos do Pedido:",
+        "total" : f"TOTAL: {order.total_price} EUR"
+    }
+
+    if reprint:
+        print_reprint_banner(printer)
+
+    # Fast Order info
+    printer.set(align="center", bold=True, custom_size=True, width=3, height=3)
+    printer.text(wrapper(data["fast_info"]))
+    printer.set(normal_textsize=True)
+
+    # Print Order most critical data info
+    printer.set(align="center", bold=True)
+    printer.text(wrapper(data["title"]))
+    printer.set(align="left", bold=False)
+    printer.text(wrapper(data["order_type"]))
+    printer.set(align="left", bold=True)
+    printer.text(wrapper(data["delivery_date_time"]))
+    printer.set(align="left", bold=False)
+    printer.text(wrapper(data["nif"]))
+    printer.text(wrapper(data["locality"]))
+    printer.text(wrapper(data["full_address"]))
+    printer.text(wrapper(data["indication"]))
+    printer.text("\n")
+
+    # Print Customer only info
+    printer.set(align="center", bold=True)
+    printer.text(wrapper(data["customer_title"]))
+    printer.set(align="left", bold=False)
+    printer.text(wrapper(data["customer"]))
+    printer.text(wrapper(data["email"]))
+    printer.text(wrapper(data["phone_number"]))
+    printer.text("\n")
+
+    # Print the product details of the order
+    printer.set(align="center", bold=True)
+    printer.text(wrapper(data["product_order_title"]))
+    printer.set(align="left", bold=False)
+
+    # Iterate through each ordered product and print its details.
+    for instance in order.order_products:
+        
+        qnt_and_product = f'{instance.quantity}x {instance.product.product_name}'
+
+        # Format a line that shows the quantity and price with appropriate spacing.
+        quantity_price_line = calculated_space_between(f'{qnt_and_product}', instance.price_str())
+        printer.text(quantity_price_line + '\n')
+
+        if instance.note.strip() != "":
+            printer.text(wrapper(f'Nota do Pedido: {instance.note}'))
+            printer.text("\n")
     
+    printer.text("\n")
+    printer.set(align="center", bold=True, custom_size=True, width=2, height=2)
+    printer.text(data["total"])
+    printer.set(align="left", bold=False, custom_size=False)
+
+    printer.cut()
+    return printer.output
+
+
+def render_station_ticket(order_dto : OrderDto, station : str, order_products : list, reprint : bool = False) -> bytes:
+    """
+    Renders a kitchen ticket: only the products prepared at one station, without prices or customer details.
+
+    Args:
+        order_dto (OrderDto): The order the products belong to.
+        station (str): Name of the kitchen station, printed as the ticket title.
+        order_products (list[OrderProduct]): The products of the order routed to this station.
+        reprint (bool): Starts the ticket with REPRINT_BANNER, as the receipt.
+
+    Returns:
+        bytes: The ESC/POS commands of the ticket, ending with a paper cut.
+    """
+    from escpos.printer import Dummy
+
+    printer = Dummy()
+    printer.charcode('CP858') # same charset as render_order
+
+    _, order = order_dto.manipulate_orderDto()
+
+    if reprint:
+        print_reprint_banner(printer)
+
+    printer.set(align="center", bold=True, custom_size=True, width=3, height=3)
+    printer.text(wrapper(order.order_fast_info()))
+    printer.set(normal_textsize=True)
+
+    printer.set(align="center", bold=True)
+    printer.text(wrapper(f"Pedido n.{str(order.id)} - {station.upper()}"))
+    printer.set(align="left", bold=False)
+    printer.text(wrapper(f"Tipo do Pedido: {order.order_type()}"))
+    printer.text("\n")
+
+    printer.set(align="left", bold=True, custom_size=True, width=1, height=2)
+    for instance in order_products:
+        printer.text(wrapper(f'{instance.quantity}x {instance.product.product_name}'))
+        printer.set(bold=False, normal_textsize=True)
+        if instance.product.product_accompaniment.strip() != "":
+            printer.text(wrapper(f'  {instance.product.product_accompaniment}'))
+        if instance.note.strip() != "":
+            printer.text(wrapper(f'Nota do Pedido: {instance.note}'))
+        printer.set(align="left", bold=True, custom_size=True, width=1, height=2)
+
+    printer.set(align="left", bold=False, normal_textsize=True)
+    printer.cut()
+    return printer.output
+
+
+def send_ticket(url : str, data : bytes, timeout : float = 10) -> bool:
+    """
+    Sends rendered bytes to a printer over its own short-lived connection (used for kitchen stations).
+
+    Args:
+        url (str): Sink URL of the printer (see services.sinks).
+        data (bytes): The ESC/POS bytes to print.
+        timeout (float): Seconds allowed for connecting and writing.
+
+    Returns:
+        bool: True if the printer was online and the bytes were sent, False if it is offline.
+
+    Raises:
+        Exception: If the printer cannot be reached or the connection drops.
+    """
+    printer = create_sink(url, timeout)
+    printer.open()
+    try:
+        if not printer.is_online():
+            return False
+        printer.write(data)
+        return True
+    finally:
+        printer.close()
@@ -0,0 +1,132 @@
+"""
+On-demand sampling profiler for the running service.
+
+While active, a background thread samples the stack of every other thread (the controller's
+main loop, alert sound, tray...) at a fixed interval. When the window ends two files are written
+next to the log file:
+  - profile-<timestamp>.collapsed: folded stacks ("thread;frame;frame count"), ready for
+    flamegraph.pl, speedscope or inferno.
+  - profile-<timestamp>.txt: the functions with most samples (self and inclusive time).
+
+Nothing is installed while the profiler is off, so there is no overhead outside the window.
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from datetime import datetime
+
+from models.logger import Logger
+from models.log_level import LogLevel
+from app.settings import LOG_FILE, PROFILE_INTERVAL
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread for a limited window and writes the results to disk.
+
+    Attributes:
+        logger (Logger): Logger used to report where the results were written.
+        interval (float): Seconds between samples.
+        output_dir (str): Directory of the result files, the log file's directory by default.
+        last_output (tuple): Paths (collapsed, stats) of the last written profile, or None.
+    """
+
+    def __init__(self, logger: Logger, interval: float = PROFILE_INTERVAL, output_dir: str = None):
+        self.logger = logger
+        self.interval = interval
+        self.output_dir = output_dir or os.path.dirname(os.path.abspath(LOG_FILE))
+        self.last_output = None
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, duration: float) -> bool:
+        """
+        Starts sampling for `duration` seconds in a daemon thread.
+
+        Returns:
+            bool: False if a profile is already running.
+        """
+        with self.lock:
+            if self.running:
+                return False
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, args=(duration,), name="SamplingProfiler", daemon=True)
+            self.thread.start()
+            return True
+
+    def stop(self):
+        """Ends the current window early, the results collected so far are still written."""
+        self.stop_event.set()
+        if self.running:
+            self.thread.join()
+
+    def run(self, duration: float):
+        stacks = Counter()
+        samples = 0
+        own_id = threading.get_ident()
+        started = time.perf_counter()
+
+        while not self.stop_event.is_set() and time.perf_counter() - started < duration:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)))
+                stacks[tuple(reversed(labels))] += 1
+            samples += 1
+            self.stop_event.wait(self.interval)
+
+        try:
+            self.last_output = self.write(stacks, samples, time.perf_counter() - started)
+            self.logger.log(LogLevel.INFO, f'Perfil de desempenho guardado em {self.last_output[0]}')
+        except OSError as e:
+            self.logger.log(LogLevel.ERROR, f'Erro ao guardar o perfil de desempenho: {str(e)}')
+
+    def write(self, stacks: Counter, samples: int, elapsed: float) -> tuple:
+        """
+        Writes the collapsed stacks and the stats summary.
+
+        Returns:
+            tuple: Paths of the collapsed stacks file and of the stats file.
+        """
+        base = os.path.join(self.output_dir, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        collapsed_path, stats_path = base + ".collapsed", base + ".txt"
+
+        with open(collapsed_path, "w", encoding="UTF-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+        own, inclusive = Counter(), Counter()
+        for stack, count in stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack[1:]):
+                inclusive[label] += count
+        total = sum(stacks.values()) or 1
+
+        with open(stats_path, "w", encoding="UTF-8") as f:
+            f.write(f"Duração: {elapsed:.1f}s, {samples} amostras a cada {self.interval * 1000:.0f}ms, "
+                    f"{total} stacks\n\n")
+            for title, counter in (("Tempo próprio", own), ("Tempo inclusivo", inclusive)):
+                f.write(f"{title}:\n")
+                for label, count in counter.most_common(40):
+                    f.write(f"{count:8d} {100 * count / total:6.2f}%  {label}\n")
+                f.write("\n")
+
+        return (collapsed_path, stats_path)
@@ -0,0 +1,129 @@
+"""
+Store of the last rendered receipts, used to reprint an order without fetching it again.
+
+Receipts are kept on disk (one file per order under RECEIPTS_DIR/<site>), so they survive
+restarts, and expire after RECEIPTS_TTL seconds. Without a directory they are kept in memory.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from app.settings import RECENT_RECEIPTS, RECEIPTS_TTL
+
+
+class RecentReceipts:
+    """
+    Bounded, time-expiring store of rendered receipts (ESC/POS bytes) keyed by order id.
+
+    The oldest receipt is dropped when more than `capacity` are stored, and every receipt is
+    dropped `ttl` seconds after it was stored. Only the index (order id -> time stored) is held
+    in memory when a directory is used.
+
+    Attributes:
+        capacity (int): Maximum number of receipts kept.
+        ttl (float): Seconds a receipt is kept.
+        directory (str): Directory of the receipt files, None to keep them in memory.
+    """
+
+    def __init__(self, capacity: int = RECENT_RECEIPTS, ttl: float = RECEIPTS_TTL, directory: str = None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.directory = directory
+        self.index = OrderedDict()  # order id -> time stored, oldest first
+        self.receipts = {}          # order id -> bytes, without directory
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.load()
+
+    def __len__(self) -> int:
+        with self.lock:
+            self.prune()
+            return len(self.index)
+
+    def __contains__(self, order_id: int) -> bool:
+        with self.lock:
+            self.prune()
+            return order_id in self.index
+
+    def path(self, order_id: int) -> str:
+        return os.path.join(self.directory, f"{order_id}.bin")
+
+    def load(self):
+        """Indexes the receipts left in the directory by a previous run."""
+        stored = []
+        for name in os.listdir(self.directory):
+            order_id, extension = os.path.splitext(name)
+            if extension == ".bin" and order_id.isdigit():
+                try:
+                    stored.append((os.path.getmtime(os.path.join(self.directory, name)), int(order_id)))
+                except OSError:
+                    pass
+        with self.lock:
+            for moment, order_id in sorted(stored):
+                self.index[order_id] = moment
+            self.prune()
+
+    def prune(self):
+        """Drops the receipts over capacity or expired (called with the lock held)."""
+        expired = time.time() - self.ttl
+        while self.index:
+            order_id, moment = next(iter(self.index.items()))
+            if len(self.index) <= self.capacity and moment >= expired:
+                break
+            self.drop(order_id)
+
+    def drop(self, order_id: int):
+        self.index.pop(order_id, None)
+        if not self.directory:
+            self.receipts.pop(order_id, None)
+            return
+        try:
+            os.remove(self.path(order_id))
+        except OSError:
+            pass
+
+    def add(self, order_id: int, data: bytes):
+        with self.lock:
+            if self.directory:
+                # Written under a temporary name and renamed, so a crash never leaves a partial receipt
+                path = self.path(order_id)
+                with open(path + ".tmp", "wb") as f:
+                    f.write(data)
+                os.replace(path + ".tmp", path)
+            else:
+                self.receipts[order_id] = data
+            self.index[order_id] = time.time()
+            self.index.move_to_end(order_id)
+            self.prune()
+
+    def get(self, order_id: int) -> bytes:
+        """Returns the receipt of an order, or None if it is not stored (or expired)."""
+        with self.lock:
+            self.prune()
+            if order_id not in self.index:
+                return None
+            if not self.directory:
+                return self.receipts[order_id]
+            try:
+                with open(self.path(order_id), "rb") as f:
+                    return f.read()
+            except OSError:
+                self.index.pop(order_id, None)  # Removed from outside
+                return None
+
+    def ids(self) -> list:
+        """Returns the stored order ids, most recent first."""
+        with self.lock:
+            self.prune()
+            return list(reversed(self.index))
+
+    def entries(self) -> list[dict]:
+        """Returns the order id and time stored of every receipt, most recent first."""
+        with self.lock:
+            self.prune()
+            return [{"order_id": order_id, "stored": datetime.fromtimestamp(moment).isoformat(timespec="seconds")}
+                    for order_id, moment in reversed(self.index.items())]
@@ -0,0 +1,154 @@
+"""
+Capture of the HTTP exchanges and printer byte streams of a running controller.
+
+With RECORD_FILE set, every response received through the shared HTTP sessions (auth, orders,
+status updates, health checks) and every byte stream sent to a printer is appended to a gzip
+compressed JSON Lines file, one record per line with its wall clock time:
+
+    {"t": 1700000000.12, "type": "http", "method": "GET", "url": "...", "status": 200, "elapsed": 0.21, "body": "..."}
+    {"t": 1700000000.35, "type": "print", "printer": "network://192.168.1.20:9100", "order_id": 12, "station": null, "data": "<base64>"}
+
+Each process appends a new gzip member, so a file can hold several sessions and is read as one
+stream (`read_recording`). Request bodies and headers (credentials, bearer token) are not
+recorded and access tokens in responses are replaced. `benchmarks/replay.py` feeds a recording
+back to the controller.
+"""
+
+import gzip
+import json
+import time
+import atexit
+import base64
+import threading
+
+from app.settings import RECORD_FILE
+
+TOKEN_KEYS = ("access", "refresh")  # Response keys holding credentials, never recorded
+REDACTED = "replay"
+
+_recorder = None
+_lock = threading.Lock()
+
+
+def redact(body: str) -> str:
+    """Replaces the access/refresh tokens of a JSON object response."""
+    if not body or not body.lstrip().startswith("{"):
+        return body
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if not any(key in data for key in TOKEN_KEYS):
+        return body
+    return json.dumps({key: REDACTED if key in TOKEN_KEYS else value for key, value in data.items()},
+                      ensure_ascii=False)
+
+
+class Recorder:
+    """
+    Append-only recording file, safe to use from several threads.
+
+    Lines are buffered by gzip and flushed at most every `flush_interval` seconds (and on close),
+    so a crash loses at most that much and a truncated file stays readable up to the last flush.
+
+    Attributes:
+        path (str): Recording file (.jsonl.gz).
+        flush_interval (float): Maximum seconds between flushes.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.file = gzip.open(path, "at", encoding="UTF-8")
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(line)
+            if time.monotonic() - self.last_flush >= self.flush_interval:
+                self.file.flush()
+                self.last_flush = time.monotonic()
+
+    def record_http(self, method: str, url: str, status: int, body: str, elapsed: float = None):
+        """Records one HTTP response (`body` None when it was not read)."""
+        self.write({"t": time.time(), "type": "http", "method": method, "url": url, "status": status,
+                    "elapsed": elapsed, "body": redact(body)})
+
+    def record_print(self, printer: str, data: bytes, order_id: int = None, station: str = None):
+        """Records the bytes sent to a printer (`printer`: its sink URL)."""
+        self.write({"t": time.time(), "type": "print", "printer": printer,
+                    "order_id": order_id, "station": station, "data": base64.b64encode(data).decode("ascii")})
+
+    def requests_hook(self, response, *args, **kwargs):
+        """`requests` response hook (see services.http.get_session)."""
+        self.record_http(response.request.method, response.url, response.status_code, response.text,
+                         response.elapsed.total_seconds())
+
+    def aiohttp_response_class(self):
+        """
+        Returns an `aiohttp.ClientResponse` subclass recording every response, to pass as
+        `response_class` to the `aiohttp.ClientSession` (see AsyncScriptController).
+        """
+        import aiohttp
+
+        recorder = self
+
+        class RecordingResponse(aiohttp.ClientResponse):
+            recorded = False
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.started = time.monotonic()
+
+            async def read(self) -> bytes:
+                body = await super().read()
+                self.record(body.decode("UTF-8", errors="replace"))
+                return body
+
+            def release(self):
+                self.record(None)  # Closed without reading the body
+                return super().release()
+
+            def record(self, body: str):
+                if not self.recorded:
+                    self.recorded = True
+                    recorder.record_http(self.method, str(self.url), self.status, body,
+                                         time.monotonic() - self.started)
+
+        return RecordingResponse
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+def get_recorder() -> Recorder:
+    """
+    Returns the recorder of RECORD_FILE, shared by the whole process, or None when recording is off.
+    """
+    global _recorder
+    if _recorder is None and RECORD_FILE:
+        with _lock:
+            if _recorder is None:
+                _recorder = Recorder(RECORD_FILE)
+                atexit.register(_recorder.close)
+    return _recorder
+
+
+def read_recording(path: str):
+    """
+    Yields the records of a recording file in order, without loading it in memory.
+    A file cut short by a crash is read up to its last complete line.
+    """
+    with gzip.open(path, "rt", encoding="UTF-8") as f:
+        try:
+            for line in f:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+        except EOFError:
+            return
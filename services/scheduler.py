@@ -0,0 +1,161 @@
+"""
+Priority scheduling of print jobs.
+
+Orders are ranked by how soon they are due (`delivery_time`), pickups being moved forward by
+PICKUP_PRIORITY_ADVANCE seconds, and by how long they have been waiting (aging), so an urgent
+pickup is not stuck behind a backlog of deliveries scheduled for the evening.
+"""
+
+import heapq
+import time
+import itertools
+import threading
+from collections import deque
+
+from models.order import OrderDto
+from app.settings import PICKUP_PRIORITY_ADVANCE, PRIORITY_AGING, PRIORITY_MAX_WAIT
+
+PICKUP = "Recolha no Restaurante"
+
+
+class PrintScheduler:
+    """
+    Priority queue of orders waiting to be printed.
+
+    The key of an order is `delivery_time - pickup advance - aging * time waited`. Since every
+    queued order ages at the same rate, `now` can be left out and the key becomes
+    `delivery_time - pickup advance + aging * time queued`, computed once when the order is
+    queued, which keeps push, update and pop at O(log n). Updated or removed orders are
+    invalidated in place and skipped when they reach the top of the heap; a re-prioritised order
+    keeps its arrival sequence and its place in the arrival queue.
+
+    As a hard guarantee against starvation, an order waiting for more than `max_wait` seconds
+    is served first regardless of its key.
+
+    Attributes:
+        pickup_advance (float): Seconds a pickup is moved forward relative to a delivery.
+        aging (float): Seconds of priority gained per second waited.
+        max_wait (float): Seconds after which an order is served first.
+    """
+
+    def __init__(self, pickup_advance: float = PICKUP_PRIORITY_ADVANCE, aging: float = PRIORITY_AGING,
+                 max_wait: float = PRIORITY_MAX_WAIT):
+        self.pickup_advance = pickup_advance
+        self.aging = aging
+        self.max_wait = max_wait
+        self.heap = []                    # [(key, arrival sequence), push sequence, order, valid] entries
+        self.fifo = deque()               # (order id, time first queued), in arrival order
+        self.entries = {}                 # Order id -> current entry
+        self.enqueued = {}                # Order id -> monotonic time it was first queued
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self.entries
+
+    def priority(self, order: OrderDto, enqueued_at: float) -> float:
+        """
+        Returns the key of an order, lower is printed first.
+
+        Args:
+            order (OrderDto): The order.
+            enqueued_at (float): Monotonic time the order was first queued.
+        """
+        _, domain_order = order.manipulate_orderDto()
+        key = order.delivery_time.timestamp() + self.aging * enqueued_at  # Queued earlier, lower key
+        if domain_order.order_type() == PICKUP:
+            key -= self.pickup_advance
+        return key
+
+    def push(self, order: OrderDto):
+        """
+        Queues an order, or re-prioritises it if it is already queued (its waiting time is kept).
+        """
+        with self.lock:
+            self._push(order)
+
+    def _push(self, order: OrderDto):
+        if order.id not in self.enqueued:
+            self.enqueued[order.id] = time.monotonic()
+            self.fifo.append((order.id, self.enqueued[order.id]))
+        enqueued_at = self.enqueued[order.id]
+        old = self.entries.get(order.id)
+        if old is not None:
+            old[3] = False
+        # Ties are broken by arrival (kept when re-prioritised), then by push, never by the orders
+        arrival = old[0][1] if old is not None else next(self.sequence)
+        entry = [(self.priority(order, enqueued_at), arrival), next(self.sequence), order, True]
+        self.entries[order.id] = entry
+        heapq.heappush(self.heap, entry)
+
+    def queued(self, fifo_entry: tuple) -> bool:
+        # False for an order removed since (or removed and queued again, with a later time)
+        order_id, enqueued_at = fifo_entry
+        return self.enqueued.get(order_id) == enqueued_at
+
+    def remove(self, order_id: int):
+        """Removes an order from the queue, if queued."""
+        with self.lock:
+            self._remove(order_id)
+
+    def _remove(self, order_id: int):
+        entry = self.entries.pop(order_id, None)
+        self.enqueued.pop(order_id, None)
+        if entry is not None:
+            entry[3] = False
+
+    def sync(self, orders: list[OrderDto]):
+        """
+        Makes the queue match the latest fetch: new orders are queued, known ones re-prioritised
+        and orders the API no longer returns are dropped.
+        """
+        with self.lock:
+            current = {order.id for order in orders}
+            for order_id in [order_id for order_id in self.entries if order_id not in current]:
+                self._remove(order_id)
+            for order in orders:
+                self._push(order)
+
+    def pop(self) -> OrderDto:
+        """
+        Removes and returns the order to print next, or None if the queue is empty.
+        """
+        with self.lock:
+            # Starvation guard: the oldest order first, if it waited too long
+            while self.fifo and not self.queued(self.fifo[0]):
+                self.fifo.popleft()
+            if self.fifo and time.monotonic() - self.fifo[0][1] > self.max_wait:
+                entry = self.entries[self.fifo.popleft()[0]]
+            else:
+                entry = None
+                while self.heap:
+                    candidate = heapq.heappop(self.heap)
+                    if candidate[3]:
+                        entry = candidate
+                        break
+            if entry is None:
+                return None
+
+            order = entry[2]
+            self._remove(order.id)
+            self.compact()
+            return order
+
+    def drain(self):
+        """Yields every queued order in priority order, removing them from the queue."""
+        while True:
+            order = self.pop()
+            if order is None:
+                return
+            yield order
+
+    def compact(self):
+        # Rebuild the containers when invalidated entries dominate, keeping memory bounded
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self.heap = [entry for entry in self.heap if entry[3]]
+            heapq.heapify(self.heap)
+        if len(self.fifo) > 2 * len(self.entries) + 64:
+            self.fifo = deque(entry for entry in self.fifo if self.queued(entry))
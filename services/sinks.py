@@ -0,0 +1,259 @@
+"""
+Output sinks: where rendered ESC/POS bytes are sent.
+
+Every printer (the site printer and the kitchen stations) is described by a sink URL:
+
+    network://192.168.1.20:9100        TCP printer (port 9100 by default)
+    usb://0x04b8:0x0202                USB printer, by vendor and product id
+    serial:///dev/ttyUSB0?baudrate=19200   serial printer (serial://COM3 on Windows)
+    file:///dev/usb/lp0                device or file the bytes are appended to
+    spool:///var/spool/receipts        directory receiving one .bin file per receipt
+    memory://                          kept in memory only (dry runs, benchmarks)
+
+With DRY_RUN=1 every sink is replaced by a memory sink, so production traffic goes through the
+whole pipeline except the paper. The escpos printer classes are imported on first use
+(see services.printer).
+"""
+
+import os
+import time
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from urllib.parse import urlsplit, parse_qsl
+
+from app.settings import DRY_RUN
+from models.printer_status import PrinterStatus, RT_STATUS_OFFLINE_CAUSE, RT_STATUS_PAPER
+
+_memory_sinks = {}
+_memory_lock = threading.Lock()
+
+
+class Sink(ABC):
+    """
+    Destination of rendered receipts and tickets.
+
+    Attributes:
+        url (str): Sink URL, also used as the printer name in logs and recordings.
+        blocking (bool): False if the sink does no I/O (the async engine then calls it directly).
+    """
+    blocking = True
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def __str__(self):
+        return self.url
+
+    def open(self):
+        """Opens the connection or device, raising an exception on failure."""
+
+    def is_online(self) -> bool:
+        """True if the printer is ready to print."""
+        return True
+
+    def check(self) -> bool:
+        """Cheap liveness test of an open connection, raising an exception if it is broken."""
+        return True
+
+    def status(self) -> PrinterStatus:
+        """Real-time state of the printer (paper, cover), raising an exception if it cannot be read."""
+        return PrinterStatus.READY if self.is_online() else PrinterStatus.OFFLINE
+
+    @abstractmethod
+    def write(self, data: bytes):
+        """Sends the bytes, raising OSError on failure."""
+
+    def close(self):
+        """Closes the connection or device, if open."""
+
+
+class EscposSink(Sink):
+    """Sink backed by a python-escpos printer class (`device`, created by `create`)."""
+
+    def __init__(self, url: str):
+        super().__init__(url)
+        self.device = None
+
+    @abstractmethod
+    def create(self):
+        """Returns the (unopened) escpos printer of the sink."""
+
+    def open(self):
+        self.device = self.create()
+        self.device.open()
+
+    def is_online(self) -> bool:
+        return self.device.is_online()
+
+    def check(self) -> bool:
+        self.device.text("")
+        return True
+
+    def status(self) -> PrinterStatus:
+        return PrinterStatus.from_response(self.device.query_status(RT_STATUS_OFFLINE_CAUSE),
+                                           self.device.query_status(RT_STATUS_PAPER))
+
+    def write(self, data: bytes):
+        if self.device is None:
+            raise OSError(f"{self.url} não está aberta.")
+        self.device._raw(data)
+
+    def close(self):
+        if self.device is not None:
+            self.device.close()
+            self.device = None
+
+
+class NetworkSink(EscposSink):
+    """TCP printer. Attributes: host (str), port (int), timeout (float)."""
+
+    def __init__(self, host: str, port: int = 9100, timeout: float = 10):
+        super().__init__(f"network://{host}:{port}")
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def create(self):
+        from escpos.printer import Network
+        return Network(self.host, port=self.port, timeout=self.timeout)
+
+
+class UsbSink(EscposSink):
+    """USB printer (requires pyusb). Attributes: vendor_id (int), product_id (int), timeout (float)."""
+
+    def __init__(self, vendor_id: int, product_id: int, timeout: float = 10):
+        super().__init__(f"usb://{vendor_id:#06x}:{product_id:#06x}")
+        self.vendor_id = vendor_id
+        self.product_id = product_id
+        self.timeout = timeout
+
+    def create(self):
+        from escpos.printer import Usb
+        return Usb(self.vendor_id, self.product_id, timeout=int(self.timeout * 1000))
+
+
+class SerialSink(EscposSink):
+    """Serial printer (requires pyserial). Attributes: devfile (str), baudrate (int), timeout (float)."""
+
+    def __init__(self, devfile: str, baudrate: int = 9600, timeout: float = 10):
+        super().__init__(f"serial://{devfile}?baudrate={baudrate}")
+        self.devfile = devfile
+        self.baudrate = baudrate
+        self.timeout = timeout
+
+    def create(self):
+        from escpos.printer import Serial
+        return Serial(self.devfile, baudrate=self.baudrate, timeout=self.timeout)
+
+
+class FileSink(EscposSink):
+    """Device node or file the bytes are appended to (e.g. /dev/usb/lp0). Always online once open."""
+
+    def __init__(self, path: str):
+        super().__init__(f"file://{path}")
+        self.path = path
+
+    def create(self):
+        from escpos.printer import File
+        return File(self.path)
+
+    def is_online(self) -> bool:
+        return True
+
+    def status(self) -> PrinterStatus:
+        return PrinterStatus.READY  # Nothing can be read back
+
+
+class SpoolSink(Sink):
+    """
+    Directory receiving every receipt as its own file, for a print spooler or archiving.
+
+    Files are written under a temporary name and renamed, so a reader never sees a partial
+    receipt. Names sort by time: "<nanoseconds>-<sequence>.bin".
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(f"spool://{directory}")
+        self.directory = directory
+        self.sequence = itertools.count()
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+    def is_online(self) -> bool:
+        return os.path.isdir(self.directory) and os.access(self.directory, os.W_OK)
+
+    def write(self, data: bytes):
+        name = os.path.join(self.directory, f"{time.time_ns()}-{next(self.sequence):06d}.bin")
+        with open(name + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(name + ".tmp", name)
+
+
+class MemorySink(Sink):
+    """
+    Counts what would have been printed, without any I/O.
+
+    Attributes:
+        jobs (int): Number of writes.
+        bytes (int): Total bytes written.
+        last (deque): The last `keep` byte strings written (empty if keep is 0).
+    """
+    blocking = False
+
+    def __init__(self, url: str = "memory://", keep: int = 0):
+        super().__init__(url)
+        self.jobs = 0
+        self.bytes = 0
+        self.last = deque(maxlen=keep)
+        self.lock = threading.Lock()
+
+    def write(self, data: bytes):
+        with self.lock:
+            self.jobs += 1
+            self.bytes += len(data)
+            if self.last.maxlen:
+                self.last.append(data)
+
+
+def memory_sink(url: str) -> MemorySink:
+    """Returns the memory sink standing for `url`, shared so its counters cover every connection."""
+    with _memory_lock:
+        if url not in _memory_sinks:
+            _memory_sinks[url] = MemorySink(url)
+        return _memory_sinks[url]
+
+
+def create_sink(url: str, timeout: float = 10) -> Sink:
+    """
+    Builds the sink of a sink URL (see the module docstring). A URL without scheme is a network
+    printer ("host" or "host:port"). With DRY_RUN every sink is a memory sink.
+
+    Raises:
+        ValueError: If the scheme is unknown.
+    """
+    if "://" not in url:
+        url = f"network://{url}"
+    if DRY_RUN:
+        return memory_sink(url)
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    path = parts.netloc + parts.path  # "serial://COM3" and "serial:///dev/ttyS0"
+    options = dict(parse_qsl(parts.query))
+    if scheme == "network":
+        return NetworkSink(parts.hostname, parts.port or 9100, timeout)
+    if scheme == "usb":
+        vendor, _, product = parts.netloc.partition(":")
+        return UsbSink(int(vendor, 0), int(product, 0), timeout)
+    if scheme == "serial":
+        return SerialSink(path, int(options.get("baudrate", 9600)), timeout)
+    if scheme == "file":
+        return FileSink(path)
+    if scheme == "spool":
+        return SpoolSink(path)
+    if scheme == "memory":
+        return memory_sink(url)
+    raise ValueError(f"Tipo de impressora desconhecido: {url}")
@@ -0,0 +1,65 @@
+"""
+Kitchen ticket routing.
+
+Each product is routed by its category to a kitchen station (CATEGORY_STATIONS) and every
+station prints its own ticket on its own printer (STATION_PRINTERS), in parallel with the
+full receipt printed on the site printer. Products of unmapped categories only appear on
+the full receipt.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from models.order import OrderDto
+from models.site import Site
+from app.settings import STATION_WORKERS
+from services.printer import render_station_ticket
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_station_pool() -> ThreadPoolExecutor:
+    """
+    Returns the thread pool sending kitchen tickets, shared by every site and created on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=STATION_WORKERS, thread_name_prefix="StationPrinter")
+        return _pool
+
+
+def split_order(order_dto: OrderDto, site: Site) -> dict:
+    """
+    Groups the products of an order by kitchen station.
+
+    Args:
+        order_dto (OrderDto): The order to split.
+        site (Site): Site whose category -> station mapping is used.
+
+    Returns:
+        dict: Station name -> list of OrderProduct, in the order of the receipt. Empty if the
+              site has no stations or no product is routed.
+    """
+    if not site.station_printers or not site.category_stations:
+        return {}
+
+    _, order = order_dto.manipulate_orderDto()
+    stations = {}
+    for instance in order.order_products:
+        station = site.station_for(instance.product.category)
+        if station is not None:
+            stations.setdefault(station, []).append(instance)
+    return stations
+
+
+def render_station_tickets(order_dto: OrderDto, site: Site, reprint: bool = False) -> dict:
+    """
+    Renders the kitchen tickets of an order (with the reprint banner if `reprint`).
+
+    Returns:
+        dict: Station name -> ESC/POS bytes of its ticket.
+    """
+    return {station: render_station_ticket(order_dto, station, products, reprint)
+            for station, products in split_order(order_dto, site).items()}
@@ -0,0 +1,194 @@
+"""
+Seeded synthetic orders, for load and soak tests without a backend.
+
+`SyntheticOrderGenerator` is an endless iterator of orders in the format of the orders endpoint,
+with realistic distributions (products per order, notes, Portuguese names and addresses with
+diacritics, pickups, points purchases, delivery times). Orders are built one at a time, so
+millions can be streamed in constant memory. `SyntheticOrderSource` plugs it into the
+controllers in place of the API (ORDER_SOURCE=synthetic).
+"""
+
+import math
+import random
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from app.settings import SYNTHETIC_BATCH, SYNTHETIC_SEED
+from models.order import OrderDto
+from models.site import Site
+from services.order_services import OrderSource
+
+FIRST_NAMES = ["João", "José", "Inês", "Conceição", "Gonçalo", "Sónia", "António", "Luís", "Márcia", "Tomás",
+               "Beatriz", "Joana", "Fábio", "Cátia", "Rúben", "Mariana"]
+LAST_NAMES = ["Gonçalves", "Araújo", "Simões", "Magalhães", "Brandão", "Guimarães", "Sá", "Gião", "Pereira",
+              "Conceição", "Antunes", "Estêvão"]
+STREETS = ["Rua de São João", "Avenida da Liberdade", "Travessa do Açúcar", "Praça D. João I",
+           "Rua Cândido dos Reis", "Rua de Santa Catarina", "Avenida dos Aliados", "Largo do Pelourinho"]
+LOCALITIES = ["Porto", "Vila Nova de Gaia", "Matosinhos", "Maia", "Gondomar", "Póvoa de Varzim", "Valongo"]
+INDICATIONS = ["Junto à farmácia", "Prédio azul, 3º esquerdo", "Em frente à escola", "Portão verde"]
+
+# category -> [(product name, accompaniment, price)]
+MENU = {
+    "Grelhados": [("Picanha à Brasileira", "Arroz e feijão preto", 14.5), ("Frango no Churrasco", "Batata frita", 9.0),
+                  ("Costeleta de Novilho", "Salada mista", 16.0), ("Espetada Mista", "Arroz de feijão", 12.5)],
+    "Rodízio": [("Rodízio Completo", "Buffet de acompanhamentos", 21.9), ("Rodízio Júnior", "", 11.5)],
+    "Bebidas": [("Água das Pedras", "", 1.8), ("Sumo de Laranja Natural", "", 3.2), ("Vinho Verde Alvarinho", "", 14.0),
+                ("Café", "", 1.0)],
+    "Sobremesas": [("Pudim Flan", "", 3.5), ("Mousse de Chocolate", "", 3.5), ("Pastel de Nata", "", 1.5),
+                   ("Leite-Creme Queimado", "", 4.0)]
+}
+CATEGORY_WEIGHTS = {"Grelhados": 40, "Rodízio": 15, "Bebidas": 30, "Sobremesas": 15}
+NOTE_FRAGMENTS = ["sem cebola", "bem passado", "molho à parte", "sem glúten", "pão extra", "cortar às fatias",
+                  "alergia a frutos secos", "pouco sal", "sem pimentos", "tocar à campainha do 3º esquerdo",
+                  "troco para 50€", "acompanhamento trocado por salada", "não pôr coentros", "gelo à parte"]
+
+
+def ascii_only(text: str) -> str:
+    """Removes the diacritics of a text (used for e-mail addresses)."""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+class SyntheticOrderGenerator:
+    """
+    Endless, seeded iterator of orders (dicts in the format of the orders endpoint).
+
+    The same seed produces the same orders, apart from `created` and `delivery_time`, which are
+    relative to the moment each order is generated.
+
+    Attributes:
+        mean_items (float): Mean number of products per order (at least 1, geometric tail).
+        max_items (int): Maximum number of products per order.
+        note_probability (float): Probability of a product having a note.
+        mean_note_length (int): Mean length of the notes, in characters.
+        pickup_probability (float): Probability of an order being a pickup (no address).
+        points_probability (float): Probability of a product being bought with points.
+        scheduled_probability (float): Probability of an order being scheduled hours ahead.
+    """
+
+    def __init__(self, seed: int = SYNTHETIC_SEED, mean_items: float = 3, max_items: int = 30,
+                 note_probability: float = 0.3, mean_note_length: int = 40, pickup_probability: float = 0.35,
+                 points_probability: float = 0.05, scheduled_probability: float = 0.1, first_id: int = 1):
+        self.rng = random.Random(seed)
+        self.mean_items = mean_items
+        self.max_items = max_items
+        self.note_probability = note_probability
+        self.mean_note_length = mean_note_length
+        self.pickup_probability = pickup_probability
+        self.points_probability = points_probability
+        self.scheduled_probability = scheduled_probability
+        self.next_id = first_id
+        self.categories = list(CATEGORY_WEIGHTS)
+        self.category_weights = list(CATEGORY_WEIGHTS.values())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> dict:
+        return self.order()
+
+    def items_count(self) -> int:
+        # 1 + geometric number of extra products (floor of an exponential), averaging mean_items
+        if self.mean_items <= 1:
+            return 1
+        extra = int(self.rng.expovariate(math.log(self.mean_items / (self.mean_items - 1))))
+        return min(self.max_items, 1 + extra)
+
+    def note(self) -> str:
+        if self.rng.random() >= self.note_probability:
+            return ""
+        length = min(250, max(5, int(self.rng.lognormvariate(0, 0.6) * self.mean_note_length)))
+        note = ""
+        for fragment in self.rng.sample(NOTE_FRAGMENTS, len(NOTE_FRAGMENTS)):
+            note = f"{note}, {fragment}" if note else fragment
+            if len(note) >= length:
+                break
+        return note[:length]
+
+    def product(self) -> dict:
+        rng = self.rng
+        category = rng.choices(self.categories, self.category_weights)[0]
+        name, accompaniment, price = rng.choice(MENU[category])
+        quantity = rng.choices((1, 2, 3, 4), (70, 20, 7, 3))[0]
+        with_points = rng.random() < self.points_probability
+        return {
+            "category": category,
+            "product_name": name,
+            "product_accompaniment": accompaniment,
+            "purchased_with_points": with_points,
+            "quantity": quantity,
+            "points": int(price * 10) * quantity if with_points else 0,
+            "price": 0.0 if with_points else round(price * quantity, 2),
+            "note": self.note()
+        }
+
+    def order(self, now: datetime = None) -> dict:
+        """Generates the next order, created at `now` (default: the current time)."""
+        rng = self.rng
+        now = now or datetime.now()
+        order_id = self.next_id
+        self.next_id += 1
+
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        pickup = rng.random() < self.pickup_probability
+        minutes = rng.triangular(20, 90, 40)
+        if rng.random() < self.scheduled_probability:
+            minutes += rng.randint(2, 8) * 60
+        products = [self.product() for _ in range(self.items_count())]
+
+        return {
+            "id": order_id,
+            "customer": f"{first} {last}",
+            "email": ascii_only(f"{first}.{last}{order_id % 100}@example.pt").lower(),
+            "nif": rng.randint(100000000, 299999999),
+            "full_address": "" if pickup else f"{rng.choice(STREETS)} {rng.randint(1, 400)}, {rng.randint(4000, 4999)}-{rng.randint(0, 999):03d}",
+            "locality_name": None if pickup else rng.choice(LOCALITIES),
+            "indication": None if pickup or rng.random() < 0.6 else rng.choice(INDICATIONS),
+            "phone_number": f"9{rng.choice('1236')}{rng.randint(0, 9999999):07d}",
+            "delivery_time": (now + timedelta(minutes=minutes)).isoformat(),
+            "created": now.isoformat(),
+            "order_products": products,
+            "total_price": round(sum(product["price"] for product in products), 2),
+            "printed": False
+        }
+
+
+class SyntheticOrderSource(OrderSource):
+    """
+    Order source serving synthetic orders: every request adds `batch` new orders to the pending ones,
+    acknowledgements remove them. Memory is bounded by `max_pending`, no new orders are added while
+    that many are waiting (e.g. while the printer is down).
+
+    Attributes:
+        generator (SyntheticOrderGenerator): Stream of orders.
+        batch (int): New orders per request.
+        max_pending (int): Maximum number of orders waiting to be acknowledged.
+        generated (int): Orders generated so far.
+        acknowledged (int): Orders acknowledged so far.
+    """
+    remote = False  # No internet, server checks nor authentication
+
+    def __init__(self, generator: SyntheticOrderGenerator = None, batch: int = SYNTHETIC_BATCH,
+                 max_pending: int = 1000):
+        self.generator = generator or SyntheticOrderGenerator()
+        self.batch = batch
+        self.max_pending = max_pending
+        self.pending = OrderedDict()
+        self.generated = 0
+        self.acknowledged = 0
+        self.lock = threading.Lock()
+
+    def request_orders(self, access_token: str, site: Site) -> list[dict]:
+        with self.lock:
+            for _ in range(min(self.batch, self.max_pending - len(self.pending))):
+                order = next(self.generator)
+                self.pending[order["id"]] = order
+                self.generated += 1
+            return list(self.pending.values())
+
+    def update_order_status(self, order: OrderDto, access_token: str, site: Site) -> bool:
+        with self.lock:
+            if self.pending.pop(order.id, None) is not None:
+                self.acknowledged += 1
+        return True
@@ -0,0 +1,67 @@
+"""
+Shared fixtures of the unit tests. Run from the repository root: `python -m pytest`.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.order import OrderDto
+
+
+def order_data(order_id: int, delivery_in: float = 3600, pickup: bool = False, **fields) -> dict:
+    """Raw order as returned by `order/print-orders/`, due `delivery_in` seconds from now."""
+    now = datetime.now()
+    data = {
+        "id": order_id,
+        "customer": "João Gonçalves",
+        "email": "joao@example.com",
+        "nif": 123456789,
+        "full_address": "" if pickup else "Rua da Alegria 10, 4000-000 Porto",
+        "locality_name": None if pickup else "Porto",
+        "indication": None,
+        "phone_number": "912345678",
+        "delivery_time": (now + timedelta(seconds=delivery_in)).isoformat(),
+        "created": now.isoformat(),
+        "order_products": [{
+            "category": "Grelhados",
+            "product_name": "Picanha à Brasileira",
+            "product_accompaniment": "Arroz e feijão preto",
+            "purchased_with_points": False,
+            "quantity": 2,
+            "points": 0,
+            "price": 12.5,
+            "note": ""
+        }],
+        "total_price": 25.0,
+        "printed": False
+    }
+    data.update(fields)
+    return data
+
+
+@pytest.fixture
+def make_order():
+    """Factory of OrderDto, see order_data."""
+    return lambda order_id, **kwargs: OrderDto(**order_data(order_id, **kwargs))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Fake clock replacing time.monotonic and time.time: `clock.now` is read, `clock.advance(s)` moves it.
+    """
+    class Clock:
+        now = 1000.0
+
+        def advance(self, seconds: float):
+            self.now += seconds
+
+    fake = Clock()
+    monkeypatch.setattr("time.monotonic", lambda: fake.now)
+    monkeypatch.setattr("time.time", lambda: fake.now)
+    return fake
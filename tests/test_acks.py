@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from services.order_services import OrderSource
+
+
+class FlakySource(OrderSource):
+    """Acknowledges orders, after refusing (or failing to reach) the first `failures` updates."""
+
+    def __init__(self, failures: int = 1, error: Exception = None):
+        self.failures = failures
+        self.error = error
+        self.calls = []
+        self.acked = []
+
+    def request_orders(self, access_token, site):
+        return []
+
+    def update_order_status(self, order, access_token, site):
+        self.calls.append(order.id)
+        if self.failures:
+            self.failures -= 1
+            if self.error is not None:
+                raise self.error
+            return False
+        self.acked.append(order.id)
+        return True
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    import controllers.script
+    from controllers.script import ScriptController
+    from models.logger import Logger
+    from models.site import Site
+    from services.alerts import SilentAlert
+
+    monkeypatch.setattr(controllers.script, "OFFLINE_DIR", "")
+    monkeypatch.setattr(controllers.script, "RECEIPTS_DIR", "")
+    monkeypatch.setattr(controllers.script, "RETRY_DELAY", 2)
+    return lambda source: ScriptController(Site(name="porto", printer_sink="memory://acks"), Logger(os.devnull),
+                                           sound=SilentAlert(), source=source)
+
+
+def test_refused_ack_backs_off_then_is_sent_once(controller, make_order, clock):
+    source = FlakySource(failures=1)
+    controller = controller(source)
+    controller.journal.printed(make_order(1))
+
+    assert controller.flush_acks("token") == 0
+    assert source.calls == [1] and len(controller.journal) == 1
+    assert controller.journal.next_retry(5) == 2  # Backed off RETRY_DELAY seconds
+    assert controller.flush_acks("token") == 0    # Not due yet: not sent again
+    assert source.calls == [1]
+
+    clock.advance(2)
+    assert controller.flush_acks("token") == 1
+    assert controller.flush_acks("token") == 0
+    assert source.calls == [1, 1] and source.acked == [1]
+    assert len(controller.journal) == 0 and controller.journal.next_retry(5) is None
+
+
+def test_connection_failure_keeps_the_ack_without_backoff(controller, make_order, clock):
+    source = FlakySource(failures=1, error=ConnectionError("Server disconnected"))
+    controller = controller(source)
+    controller.journal.printed(make_order(1))
+    controller.journal.printed(make_order(2))
+
+    assert controller.flush_acks("token") is None  # Stops at the first failure
+    assert source.calls == [1] and len(controller.journal) == 2
+    assert controller.journal.next_retry(5) is None
+
+    assert controller.flush_acks("token") == 2
+    assert source.acked == [1, 2] and len(controller.journal) == 0
@@ -0,0 +1,116 @@
+import os
+import errno
+
+from models.order import OrderDto
+from services.dedup import FILE_NAME, PrintedIndex, order_digest
+from conftest import order_data
+
+
+def test_digest_ignores_printed_flag():
+    raw = order_data(1)
+    assert order_digest(OrderDto(**raw)) == order_digest(OrderDto(**dict(raw, printed=True)))
+    assert order_digest(OrderDto(**raw)) != order_digest(OrderDto(**dict(raw, phone_number="911111111")))
+
+
+def test_get_and_add():
+    index = PrintedIndex()
+    assert index.get(1) is None
+    index.add(1, "a")
+    index.add(1, "b")
+    assert index.get(1) == "b" and len(index) == 1
+
+
+def test_capacity_drops_oldest():
+    index = PrintedIndex(capacity=3)
+    for order_id in range(5):
+        index.add(order_id, str(order_id))
+    assert len(index) == 3
+    assert index.get(0) is None and index.get(1) is None and index.get(4) == "4"
+
+
+def test_entries_expire(clock):
+    index = PrintedIndex(ttl=60)
+    index.add(1, "a")
+    clock.advance(30)
+    index.add(2, "b")
+    clock.advance(31)
+    assert index.get(1) is None and index.get(2) == "b"
+
+
+def test_survives_restart_and_compacts(tmp_path, clock):
+    directory = str(tmp_path / "site")
+    index = PrintedIndex(directory, ttl=60, capacity=100)
+    for order_id in range(3):
+        index.add(order_id, "old")
+    index.add(1, "new")
+    clock.advance(10)
+
+    reloaded = PrintedIndex(directory, ttl=60, capacity=100)
+    assert (reloaded.get(0), reloaded.get(1), reloaded.get(2)) == ("old", "new", "old")
+    assert (tmp_path / "site" / FILE_NAME).read_text(encoding="UTF-8").count("\n") == 3
+
+    clock.advance(60)
+    assert len(PrintedIndex(directory, ttl=60, capacity=100)) == 0
+
+
+def test_file_stays_bounded(tmp_path):
+    directory = str(tmp_path / "site")
+    index = PrintedIndex(directory, capacity=10)
+    for order_id in range(100):
+        index.add(order_id, "h")
+    assert (tmp_path / "site" / FILE_NAME).read_text(encoding="UTF-8").count("\n") <= 20
+    assert len(PrintedIndex(directory, capacity=10)) == 10
+
+
+def test_partial_line_is_ignored(tmp_path):
+    directory = str(tmp_path / "site")
+    PrintedIndex(directory).add(1, "a")
+    with open(tmp_path / "site" / FILE_NAME, "a", encoding="UTF-8") as f:
+        f.write('{"id": 2, "ha')
+    assert PrintedIndex(directory).get(1) == "a"
+
+
+def test_controller_skips_same_contents_and_reprints_changed(monkeypatch):
+    import controllers.script
+    from controllers.script import ScriptController
+    from models.logger import Logger
+    from models.site import Site
+    from services.alerts import SilentAlert
+
+    monkeypatch.setattr(controllers.script, "OFFLINE_DIR", "")
+    monkeypatch.setattr(controllers.script, "RECEIPTS_DIR", "")
+    site = Site(name="dedup-test", base_url="http://127.0.0.1/", username="u", password="p",
+                printer_sink="memory://dedup-test")
+    controller = ScriptController(site, Logger(os.devnull), sound=SilentAlert())
+    raw = order_data(1)
+
+    order = OrderDto(**raw)
+    digest, reprint = controller.check_printed(order)
+    assert digest == order_digest(order) and not reprint
+    controller.printed_orders.add(1, digest)
+    assert controller.check_printed(OrderDto(**dict(raw, printed=True))) == (None, False)
+    changed = OrderDto(**dict(raw, phone_number="911111111"))
+    assert controller.check_printed(changed) == (order_digest(changed), True)
+
+
+
+def read_only(*args, **kwargs):
+    raise OSError(errno.EROFS, "Read-only file system")
+
+
+def test_read_only_directory_falls_back_to_memory(tmp_path, monkeypatch):
+    directory = str(tmp_path / "site")
+    PrintedIndex(directory).add(1, "a")
+    monkeypatch.setattr(os, "replace", read_only)  # As on a read-only mount (chmod does not stop root)
+    index = PrintedIndex(directory)
+    assert index.directory is None and index.get(1) == "a"
+    index.add(2, "b")
+    assert index.get(2) == "b"
+
+
+def test_directory_that_cannot_be_created(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "makedirs", read_only)
+    index = PrintedIndex(str(tmp_path / "site"))
+    assert index.directory is None
+    index.add(1, "a")
+    assert index.get(1) == "a"
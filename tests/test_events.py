@@ -0,0 +1,73 @@
+from models.event_type import EventType
+from models.log_level import LogLevel
+from services.events import EventBus
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.lines = []
+
+    def log(self, log_type, message, **fields):
+        self.lines.append((log_type, message))
+
+
+def test_publish_to_every_subscriber_in_order():
+    bus = EventBus()
+    received = []
+    bus.subscribe(lambda event: received.append(("first", event.type, event.site, event.data)))
+    bus.subscribe(lambda event: received.append(("second", event.type, event.site, event.data)))
+    bus.publish(EventType.ORDER_PRINTED, site="porto", order_id=7)
+    assert received == [("first", EventType.ORDER_PRINTED, "porto", {"order_id": 7}),
+                        ("second", EventType.ORDER_PRINTED, "porto", {"order_id": 7})]
+
+
+def test_subscribe_to_some_types():
+    bus = EventBus()
+    received = []
+    bus.subscribe(lambda event: received.append(event.type), EventType.ERROR, EventType.STATE_CHANGED)
+    bus.publish(EventType.ORDER_PRINTED, site="porto", order_id=7)
+    bus.publish(EventType.STATE_CHANGED, site="porto", running=True)
+    bus.publish(EventType.ERROR, site="porto", message="", log_message="")
+    assert received == [EventType.STATE_CHANGED, EventType.ERROR]
+
+
+def test_unsubscribe():
+    bus = EventBus()
+    received = []
+    unsubscribe = bus.subscribe(received.append)
+    bus.publish(EventType.ORDER_PRINTED, order_id=1)
+    unsubscribe()
+    unsubscribe()  # Twice is harmless
+    bus.publish(EventType.ORDER_PRINTED, order_id=2)
+    assert [event.data["order_id"] for event in received] == [1]
+
+
+def test_unsubscribe_while_publishing():
+    bus = EventBus()
+    received = []
+    unsubscribe = bus.subscribe(lambda event: unsubscribe())
+    bus.subscribe(received.append)
+    bus.publish(EventType.ORDER_PRINTED, order_id=1)  # The current delivery is not affected
+    bus.publish(EventType.ORDER_PRINTED, order_id=2)
+    assert len(received) == 2 and len(bus.subscribers) == 1
+
+
+def test_failing_subscriber_does_not_break_publishing():
+    logger = RecordingLogger()
+    bus = EventBus(logger)
+    received = []
+
+    def failing(event):
+        raise RuntimeError("avaria")
+
+    bus.subscribe(failing)
+    bus.subscribe(received.append)
+    bus.publish(EventType.ORDER_PRINTED, site="porto", order_id=7)
+    assert len(received) == 1
+    assert logger.lines == [(LogLevel.ERROR, "Erro no subscritor do evento order_printed: avaria")]
+
+
+def test_failing_subscriber_without_logger():
+    bus = EventBus()
+    bus.subscribe(lambda event: 1 / 0)
+    bus.publish(EventType.ORDER_PRINTED, order_id=7)
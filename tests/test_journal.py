@@ -0,0 +1,63 @@
+import os
+
+from services.journal import MAX_BACKOFF, OrderJournal
+from conftest import order_data
+
+
+def test_sync_pending_and_printed(make_order):
+    journal = OrderJournal()
+    assert [raw["id"] for raw in journal.sync([order_data(1), order_data(2)])] == [1, 2]
+    journal.printed(make_order(1))
+    assert [raw["id"] for raw in journal.pending()] == [2]
+    # Still listed by the API until its acknowledgement arrives, never printed again
+    assert [raw["id"] for raw in journal.sync([order_data(1), order_data(2)])] == [2]
+    assert len(journal) == 1 and [order.id for order in journal.due()] == [1]
+    journal.acknowledged(1)
+    assert len(journal) == 0
+
+
+def test_sync_drops_orders_no_longer_listed():
+    journal = OrderJournal()
+    journal.sync([order_data(1), order_data(2)])
+    journal.sync([order_data(2)])
+    assert [raw["id"] for raw in journal.pending()] == [2]
+
+
+def test_refusals_back_off(make_order, clock):
+    journal = OrderJournal(retry_delay=2)
+    journal.sync([order_data(1)])
+    journal.printed(make_order(1))
+    journal.refused(1)
+    assert journal.due() == [] and journal.next_retry(3) == 2
+    clock.advance(2)
+    assert [order.id for order in journal.due()] == [1]
+    journal.refused(1)
+    assert journal.next_retry(3) == 4
+    assert journal.next_retry(2) is None  # Refused as many times as the limit
+    for _ in range(20):
+        journal.refused(1)
+    assert journal.refusals[1][1] - clock.now == MAX_BACKOFF
+
+
+def test_files_survive_restart(tmp_path, make_order):
+    directory = str(tmp_path / "site")
+    journal = OrderJournal(directory)
+    journal.sync([order_data(1), order_data(2), order_data(3)])
+    journal.printed(make_order(2))
+    journal.printed(make_order(1))
+    assert sorted(os.listdir(os.path.join(directory, "inbox"))) == ["3.json"]
+    assert sorted(os.listdir(os.path.join(directory, "outbox"))) == ["1.json", "2.json"]
+
+    reloaded = OrderJournal(directory)
+    assert [raw["id"] for raw in reloaded.pending()] == [3]
+    assert set(reloaded.outbox) == {1, 2}
+    reloaded.acknowledged(2)
+    assert os.listdir(os.path.join(directory, "outbox")) == ["1.json"]
+
+
+def test_partial_files_are_ignored(tmp_path):
+    directory = str(tmp_path / "site")
+    OrderJournal(directory)
+    (tmp_path / "site" / "inbox" / "5.json").write_text('{"id": 5,', encoding="UTF-8")
+    (tmp_path / "site" / "inbox" / "notes.txt").write_text("x", encoding="UTF-8")
+    assert OrderJournal(directory).pending() == []
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import order_data
+from models.order import OrderDto
+from services.latency import LATE_PRINTS, OrderLatencyTracker
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.lines = []
+
+    def log(self, log_type, message, **fields):
+        self.lines.append((log_type, message, fields))
+
+
+def created_ago(order_id: int, seconds: float, delivery_in: float = 3600) -> OrderDto:
+    created = datetime.now() - timedelta(seconds=seconds)
+    return OrderDto(**order_data(order_id, delivery_in=delivery_in, created=created.isoformat()))
+
+
+def test_phases_measured_from_created():
+    tracker = OrderLatencyTracker(RecordingLogger(), site="latency-phases")
+    order = created_ago(1, 60)
+    tracker.fetched(order)
+    tracker.fetched(order)  # Listed again before its acknowledgement: counted once
+    tracker.printed(order)
+    tracker.acknowledged(order)
+    summary = tracker.summary()
+    assert [summary[phase]["total"]["count"] for phase in ("fetch", "print", "ack")] == [1, 1, 1]
+    assert summary["fetch"]["window"]["max"] == pytest.approx(60, abs=1)
+    assert summary["late_orders"] == 0
+
+
+def test_tumbling_window_rollover(clock):
+    tracker = OrderLatencyTracker(RecordingLogger(), site="latency-window", window=60)
+    for order_id in range(1, 4):
+        tracker.printed(created_ago(order_id, 600))
+    clock.advance(59)
+    tracker.printed(created_ago(4, 30))
+    assert tracker.summary()["print"]["window"]["count"] == 4
+
+    clock.advance(1)  # Window over: starts again empty
+    tracker.printed(created_ago(5, 30))
+    summary = tracker.summary()["print"]
+    assert summary["window"]["count"] == 1
+    assert summary["window"]["max"] == pytest.approx(30, abs=1)
+    assert summary["total"]["count"] == 5
+    assert summary["total"]["max"] == pytest.approx(600, abs=1)
+
+
+def test_late_print_flag():
+    logger = RecordingLogger()
+    tracker = OrderLatencyTracker(logger, site="latency-late", late_margin=600)
+    tracker.printed(created_ago(1, 60, delivery_in=3600))
+    assert tracker.summary()["late_orders"] == 0 and logger.lines == []
+
+    tracker.printed(created_ago(2, 60, delivery_in=300))  # Printed 5 minutes before delivery
+    assert tracker.summary()["late_orders"] == 1
+    assert LATE_PRINTS.get(site="latency-late") == 1
+    [(_, message, fields)] = logger.lines
+    assert message.startswith("Pedido n 2 impresso a 5.0 minutos")
+    assert fields["order_id"] == 2 and fields["delivery_margin_s"] == pytest.approx(300, abs=1)
+
+
+def test_fetched_orders_forgotten_on_ack():
+    tracker = OrderLatencyTracker(RecordingLogger(), site="latency-seen", max_seen=2)
+    order = created_ago(1, 10)
+    tracker.fetched(order)
+    tracker.acknowledged(order)
+    tracker.fetched(order)  # Listed again after it was acknowledged (a new print)
+    for order_id in (2, 3):
+        tracker.fetched(created_ago(order_id, 10))
+    assert list(tracker.seen) == [2, 3]
+    assert tracker.summary()["fetch"]["total"]["count"] == 4
@@ -0,0 +1,63 @@
+import pytest
+
+from services.metrics import Registry, Counter, Gauge, Histogram
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_labelled_counter(registry):
+    counter = Counter("test_retries_total", "Novas tentativas.", ("site", "stage"), registry=registry)
+    counter.inc(site="Porto", stage="print")
+    counter.inc(2, site="Porto", stage="print")
+    counter.inc(site='Rua "A"\\B\nC', stage="auth")
+    assert counter.get(site="Porto", stage="print") == 3
+    assert registry.render().splitlines() == [
+        "# HELP test_retries_total Novas tentativas.",
+        "# TYPE test_retries_total counter",
+        'test_retries_total{site="Porto",stage="print"} 3.0',
+        'test_retries_total{site="Rua \\"A\\"\\\\B\\nC",stage="auth"} 1.0',
+    ]
+
+
+def test_gauge_without_labels(registry):
+    gauge = Gauge("test_queue_depth", "Pedidos por imprimir.", registry=registry)
+    gauge.set(5)
+    gauge.inc()
+    gauge.dec(3)
+    assert registry.render().splitlines() == [
+        "# HELP test_queue_depth Pedidos por imprimir.",
+        "# TYPE test_queue_depth gauge",
+        "test_queue_depth 3.0",
+    ]
+
+
+def test_histogram_buckets_sum_and_count(registry):
+    histogram = Histogram("test_duration_seconds", "Duração.", ("site",), buckets=(1, 0.1), registry=registry)
+    for value in (0.05, 0.1, 0.5, 7):
+        histogram.observe(value, site="Porto")
+    assert registry.render().splitlines() == [
+        "# HELP test_duration_seconds Duração.",
+        "# TYPE test_duration_seconds histogram",
+        'test_duration_seconds_bucket{site="Porto",le="0.1"} 2',
+        'test_duration_seconds_bucket{site="Porto",le="1.0"} 3',
+        'test_duration_seconds_bucket{site="Porto",le="+Inf"} 4',
+        'test_duration_seconds_sum{site="Porto"} 7.65',
+        'test_duration_seconds_count{site="Porto"} 4',
+    ]
+
+
+def test_registry_renders_metrics_in_registration_order(registry):
+    Gauge("test_b", "B.", registry=registry).set(1)
+    Counter("test_a", "A.", registry=registry).inc()
+    rendered = registry.render()
+    assert rendered.index("# HELP test_b") < rendered.index("# HELP test_a")
+    assert rendered.endswith("test_a 1.0\n")
+
+
+def test_wrong_labels(registry):
+    counter = Counter("test_total", "Total.", ("site",), registry=registry)
+    with pytest.raises(ValueError):
+        counter.inc(stage="print")
@@ -0,0 +1,51 @@
+import pytest
+
+from models.printer_status import PrinterStatus
+from services.sinks import FileSink, MemorySink, Sink
+
+
+@pytest.mark.parametrize("offline_cause, paper, expected", [
+    (b'\x12', b'\x12', PrinterStatus.READY),
+    (b'\x16', b'\x12', PrinterStatus.COVER_OPEN),
+    (b'\x32', b'\x72', PrinterStatus.PAPER_OUT),     # Stopped by paper end, no paper
+    (b'\x12', b'\x72', PrinterStatus.PAPER_OUT),     # Paper sensor only
+    (b'\x12', b'\x1e', PrinterStatus.READY),         # Paper near end still prints
+    (b'\x36', b'\x72', PrinterStatus.COVER_OPEN),    # Cover open wins
+    (b'', b'', PrinterStatus.READY),                 # No answer
+    (None, None, PrinterStatus.READY),
+])
+def test_from_response(offline_cause, paper, expected):
+    assert PrinterStatus.from_response(offline_cause, paper) is expected
+
+
+def test_paused():
+    assert PrinterStatus.PAPER_OUT.paused and PrinterStatus.COVER_OPEN.paused
+    assert not PrinterStatus.READY.paused and not PrinterStatus.OFFLINE.paused
+
+
+def test_sink_status():
+    class OfflineSink(Sink):
+        def is_online(self):
+            return False
+
+        def write(self, data):
+            raise OSError("offline")
+
+    assert MemorySink().status() is PrinterStatus.READY
+    assert OfflineSink("test://").status() is PrinterStatus.OFFLINE
+    assert FileSink("/dev/null").status() is PrinterStatus.READY
+
+
+def test_escpos_sink_queries_offline_cause_and_paper():
+    from models.printer_status import RT_STATUS_OFFLINE_CAUSE, RT_STATUS_PAPER
+    from services.sinks import NetworkSink
+
+    class Device:
+        answers = {RT_STATUS_OFFLINE_CAUSE: b'\x32', RT_STATUS_PAPER: b'\x72'}
+
+        def query_status(self, request):
+            return self.answers[request]
+
+    sink = NetworkSink("127.0.0.1")
+    sink.device = Device()
+    assert sink.status() is PrinterStatus.PAPER_OUT
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from utils.quantiles import P2Quantile, QuantileSketch
+
+
+def test_invalid_quantile():
+    with pytest.raises(ValueError):
+        P2Quantile(1)
+
+
+def test_empty_and_warm_up_are_exact():
+    estimator = P2Quantile(0.5)
+    assert estimator.value() is None
+    for x in (5, 1, 4, 2, 3):
+        estimator.add(x)
+    assert estimator.value() == 3
+
+
+@pytest.mark.parametrize("p", [0.5, 0.95, 0.99])
+def test_uniform_stream_estimate(p):
+    rng = random.Random(0)
+    estimator = P2Quantile(p)
+    values = [rng.uniform(0, 1000) for _ in range(20000)]
+    for x in values:
+        estimator.add(x)
+    exact = sorted(values)[int(p * len(values)) - 1]
+    assert estimator.value() == pytest.approx(exact, abs=15)
+
+
+def test_constant_memory():
+    estimator = P2Quantile(0.95)
+    for x in range(100000):
+        estimator.add(x)
+    assert len(estimator._heights) == 5
+    assert estimator.count == 100000
+
+
+def test_sketch_summary():
+    sketch = QuantileSketch()
+    for x in range(1, 101):
+        sketch.add(x)
+    summary = sketch.summary()
+    assert (summary["count"], summary["min"], summary["max"], summary["mean"]) == (100, 1, 100, 50.5)
+    assert summary["p50"] == pytest.approx(50, abs=2)
+    assert summary["p99"] == pytest.approx(99, abs=2)
+    assert sketch.quantile(0.95) == summary["p95"]
+    assert QuantileSketch().summary()["p50"] is None
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from services.receipts import RecentReceipts
+
+
+@pytest.fixture(params=["memory", "disk"])
+def store(request, tmp_path, clock):
+    directory = str(tmp_path) if request.param == "disk" else None
+    return lambda **kwargs: RecentReceipts(directory=directory, **kwargs)
+
+
+def test_add_and_get(store):
+    receipts = store(capacity=10, ttl=60)
+    receipts.add(1, b"one")
+    assert receipts.get(1) == b"one" and 1 in receipts
+    assert receipts.get(2) is None
+
+
+def test_ttl_expiry(store, clock):
+    receipts = store(capacity=10, ttl=60)
+    receipts.add(1, b"one")
+    clock.advance(30)
+    receipts.add(2, b"two")
+    clock.advance(30)
+    assert receipts.ids() == [2, 1]  # Exactly ttl old is still kept
+    clock.advance(1)
+    assert receipts.get(1) is None and receipts.ids() == [2]
+    clock.advance(30)
+    assert len(receipts) == 0
+
+
+def test_capacity_drops_the_oldest(store, clock):
+    receipts = store(capacity=3, ttl=60)
+    for order_id in range(1, 6):
+        receipts.add(order_id, b"%d" % order_id)
+        clock.advance(1)
+    assert receipts.ids() == [5, 4, 3]
+    receipts.add(3, b"again")  # Stored again: now the most recent
+    receipts.add(6, b"6")
+    assert receipts.ids() == [6, 3, 5]
+    assert receipts.get(3) == b"again"
+
+
+def test_capacity_bounds_the_files(tmp_path, clock):
+    receipts = RecentReceipts(capacity=3, ttl=60, directory=str(tmp_path))
+    for order_id in range(10):
+        receipts.add(order_id, b"receipt")
+    assert sorted(os.listdir(tmp_path)) == ["7.bin", "8.bin", "9.bin"]
+
+
+def test_reload_from_disk(tmp_path, clock):
+    receipts = RecentReceipts(capacity=10, ttl=60, directory=str(tmp_path))
+    for order_id in (1, 2, 3):
+        receipts.add(order_id, b"receipt %d" % order_id)
+        os.utime(receipts.path(order_id), (clock.now, clock.now))  # Stored at the fake time
+        clock.advance(20)
+    (tmp_path / "notes.txt").write_text("")
+    (tmp_path / "4.bin.tmp").write_bytes(b"partial")  # Crash while writing
+    clock.advance(1)
+
+    reloaded = RecentReceipts(capacity=10, ttl=60, directory=str(tmp_path))
+    assert reloaded.ids() == [3, 2]  # Order 1 was stored 61s ago
+    assert reloaded.get(2) == b"receipt 2"
+    assert not os.path.exists(receipts.path(1))
+
+
+def test_reload_keeps_capacity(tmp_path, clock):
+    receipts = RecentReceipts(capacity=10, ttl=60, directory=str(tmp_path))
+    for order_id in range(5):
+        receipts.add(order_id, b"receipt")
+        os.utime(receipts.path(order_id), (clock.now + order_id, clock.now + order_id))
+    assert RecentReceipts(capacity=2, ttl=60, directory=str(tmp_path)).ids() == [4, 3]
+
+
+def test_file_removed_from_outside(tmp_path, clock):
+    receipts = RecentReceipts(capacity=10, ttl=60, directory=str(tmp_path))
+    receipts.add(1, b"one")
+    os.remove(receipts.path(1))
+    assert receipts.get(1) is None and 1 not in receipts
@@ -0,0 +1,54 @@
+import base64
+
+from services.recorder import REDACTED, Recorder, read_recording, redact
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    recorder = Recorder(path)
+    recorder.record_http("GET", "https://example.com/api/order/print-orders/", 200, '[{"id": 1}]', 0.2)
+    recorder.record_print("network://192.168.1.20:9100", b"\x1b@Pedido\x1dV\x00", order_id=1)
+    recorder.record_print("memory://bar", b"ticket", order_id=1, station="bar")
+    recorder.close()
+    recorder.record_http("GET", "https://example.com/", 200, "")  # After close: ignored
+
+    http, receipt, ticket = read_recording(path)
+    assert {key: http[key] for key in ("type", "method", "url", "status", "elapsed", "body")} == {
+        "type": "http", "method": "GET", "url": "https://example.com/api/order/print-orders/",
+        "status": 200, "elapsed": 0.2, "body": '[{"id": 1}]'}
+    assert receipt["type"] == "print" and receipt["station"] is None and receipt["order_id"] == 1
+    assert base64.b64decode(receipt["data"]) == b"\x1b@Pedido\x1dV\x00"
+    assert ticket["printer"] == "memory://bar" and ticket["station"] == "bar"
+    assert http["t"] <= receipt["t"] <= ticket["t"]
+
+
+def test_sessions_append_gzip_members(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    for order_id in (1, 2):
+        recorder = Recorder(path)
+        recorder.record_print("memory://", b"receipt", order_id=order_id)
+        recorder.close()
+    assert [record["order_id"] for record in read_recording(path)] == [1, 2]
+
+
+def test_truncated_file_read_up_to_the_last_flush(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    recorder = Recorder(path, flush_interval=0)
+    for order_id in range(3):
+        recorder.record_print("memory://", b"receipt", order_id=order_id)
+    with open(path, "rb") as f:
+        crashed = f.read()  # Flushed, never closed
+    recorder.close()
+    (tmp_path / "crashed.jsonl.gz").write_bytes(crashed)
+    assert [record["order_id"] for record in read_recording(str(tmp_path / "crashed.jsonl.gz"))] == [0, 1, 2]
+
+
+def test_tokens_redacted(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    recorder = Recorder(path)
+    recorder.record_http("POST", "https://example.com/api/auth/", 200, '{"access": "secret", "user": "ana"}')
+    recorder.close()
+    [record] = read_recording(path)
+    assert "secret" not in record["body"]
+    assert record["body"] == '{"access": "%s", "user": "ana"}' % REDACTED
+    assert redact("[1, 2]") == "[1, 2]" and redact("not json {") == "not json {" and redact(None) is None
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from services.scheduler import PrintScheduler
+
+DUE = datetime(2030, 1, 1, 20, 0)
+
+
+def popped(scheduler: PrintScheduler) -> list:
+    return [order.id for order in scheduler.drain()]
+
+
+def test_earliest_delivery_first(make_order):
+    scheduler = PrintScheduler(pickup_advance=0, aging=0, max_wait=3600)
+    scheduler.sync([make_order(1, delivery_in=3000), make_order(2, delivery_in=600), make_order(3, delivery_in=1800)])
+    assert popped(scheduler) == [2, 3, 1]
+
+
+def test_pickup_moved_forward(make_order):
+    scheduler = PrintScheduler(pickup_advance=900, aging=0, max_wait=3600)
+    scheduler.push(make_order(1, delivery_in=1200))
+    scheduler.push(make_order(2, delivery_in=1800, pickup=True))
+    assert popped(scheduler) == [2, 1]
+
+
+def test_equal_due_times_oldest_first(make_order, clock):
+    scheduler = PrintScheduler(pickup_advance=0, aging=0.5, max_wait=3600)
+    for order_id in (1, 2, 3):
+        scheduler.push(make_order(order_id, delivery_time=DUE.isoformat()))
+        clock.advance(10)
+    assert popped(scheduler) == [1, 2, 3]
+
+
+def test_aging_beats_slightly_earlier_due_time(make_order, clock):
+    scheduler = PrintScheduler(pickup_advance=0, aging=1, max_wait=3600)
+    scheduler.push(make_order(1, delivery_time=DUE.replace(second=50).isoformat()))
+    clock.advance(100)
+    # Due 50 s before order 1, but order 1 has waited 100 s at one second of priority per second
+    scheduler.push(make_order(2, delivery_time=DUE.isoformat()))
+    assert popped(scheduler) == [1, 2]
+
+
+def test_resync_keeps_arrival_order(make_order, clock):
+    scheduler = PrintScheduler(pickup_advance=0, aging=0, max_wait=3600)
+    a, b = make_order(1, delivery_time=DUE.isoformat()), make_order(2, delivery_time=DUE.isoformat())
+    scheduler.sync([a, b])
+    scheduler.sync([b, a])
+    assert popped(scheduler) == [1, 2]
+
+
+def test_max_wait_guard_after_resync(make_order, clock):
+    scheduler = PrintScheduler(pickup_advance=0, aging=0, max_wait=60)
+    a = make_order(1, delivery_in=7200)
+    scheduler.sync([a])
+    clock.advance(30)
+    b = make_order(2, delivery_in=600)
+    scheduler.sync([a, b])
+    clock.advance(40)  # a waited 70 s, b 40 s
+    scheduler.sync([b, a])
+    assert scheduler.pop().id == 1
+    assert scheduler.pop().id == 2
+
+
+def test_update_reprioritises_and_removal_drops(make_order):
+    scheduler = PrintScheduler(pickup_advance=0, aging=0, max_wait=3600)
+    scheduler.sync([make_order(1, delivery_in=600), make_order(2, delivery_in=1200), make_order(3, delivery_in=1800)])
+    scheduler.sync([make_order(1, delivery_in=600), make_order(3, delivery_in=300)])
+    assert len(scheduler) == 2 and 2 not in scheduler
+    assert popped(scheduler) == [3, 1]
+    assert scheduler.pop() is None
+
+
+def test_repeated_syncs_stay_bounded(make_order):
+    scheduler = PrintScheduler(pickup_advance=0, aging=0, max_wait=3600)
+    orders = [make_order(order_id) for order_id in range(10)]
+    for _ in range(200):
+        scheduler.sync(orders)
+    scheduler.pop()
+    assert len(scheduler.heap) <= 2 * len(scheduler) + 64
+    assert len(scheduler.fifo) == 10
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+import services.sinks as sinks
+from services.sinks import (EscposSink, FileSink, MemorySink, NetworkSink, SerialSink, SpoolSink, Sink, UsbSink,
+                            create_sink, memory_sink)
+
+
+@pytest.mark.parametrize("url, kind, attributes", [
+    ("192.168.1.20", NetworkSink, {"host": "192.168.1.20", "port": 9100}),
+    ("192.168.1.20:9101", NetworkSink, {"host": "192.168.1.20", "port": 9101}),
+    ("network://printer.local:9102", NetworkSink, {"host": "printer.local", "port": 9102}),
+    ("usb://0x04b8:0x0202", UsbSink, {"vendor_id": 0x04b8, "product_id": 0x0202}),
+    ("serial:///dev/ttyUSB0?baudrate=19200", SerialSink, {"devfile": "/dev/ttyUSB0", "baudrate": 19200}),
+    ("serial://COM3", SerialSink, {"devfile": "COM3", "baudrate": 9600}),
+    ("file:///dev/usb/lp0", FileSink, {"path": "/dev/usb/lp0"}),
+    ("spool:///var/spool/receipts", SpoolSink, {"directory": "/var/spool/receipts"}),
+])
+def test_create_sink(url, kind, attributes):
+    sink = create_sink(url)
+    assert isinstance(sink, kind)
+    for name, value in attributes.items():
+        assert getattr(sink, name) == value
+
+
+def test_unknown_scheme():
+    with pytest.raises(ValueError):
+        create_sink("lpt://1")
+
+
+def test_dry_run_replaces_every_sink(monkeypatch):
+    monkeypatch.setattr(sinks, "DRY_RUN", True)
+    sink = create_sink("usb://0x04b8:0x0202")
+    assert isinstance(sink, MemorySink) and sink.url == "usb://0x04b8:0x0202"
+
+
+def test_memory_sink_is_shared_and_counts():
+    sink = memory_sink("memory://test-shared")
+    assert create_sink("memory://test-shared") is sink
+    jobs, size = sink.jobs, sink.bytes
+    sink.write(b"abc")
+    assert (sink.jobs, sink.bytes) == (jobs + 1, size + 3)
+
+
+def test_memory_sink_keeps_last():
+    sink = MemorySink(keep=2)
+    for data in (b"1", b"2", b"3"):
+        sink.write(data)
+    assert list(sink.last) == [b"2", b"3"]
+
+
+def test_spool_sink_writes_one_file_per_receipt(tmp_path):
+    sink = SpoolSink(str(tmp_path / "spool"))
+    sink.open()
+    assert sink.is_online()
+    for data in (b"first", b"second"):
+        sink.write(data)
+    names = sorted(os.listdir(tmp_path / "spool"))
+    assert [name.endswith(".bin") for name in names] == [True, True]
+    assert [(tmp_path / "spool" / name).read_bytes() for name in names] == [b"first", b"second"]
+
+
+def test_escpos_sink_write_requires_open():
+    with pytest.raises(OSError):
+        NetworkSink("127.0.0.1").write(b"x")
+
+
+def test_sinks_must_implement_write_and_create():
+    with pytest.raises(TypeError):
+        Sink("test://")
+    with pytest.raises(TypeError):
+        EscposSink("test://")
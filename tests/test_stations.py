@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from conftest import order_data
+from models.order import OrderDto
+from models.site import Site
+from services.sinks import memory_sink
+from services.stations import split_order, render_station_tickets
+
+
+def kitchen_site(name: str = "porto") -> Site:
+    return Site(name=name, printer_sink=f"memory://{name}-main",
+                station_printers={"grill": f"memory://{name}-grill", "bar": f"memory://{name}-bar"},
+                category_stations={"Grelhados": "grill", "bebidas": "bar", "Sobremesas": "pastry"})
+
+
+def kitchen_order(order_id: int = 1) -> OrderDto:
+    data = order_data(order_id)
+    product = data["order_products"][0]
+    data["order_products"] += [dict(product, category="BEBIDAS", product_name="Café"),
+                               dict(product, category="Sobremesas", product_name="Pudim"),
+                               dict(product, category="Entradas", product_name="Pão")]
+    return OrderDto(**data)
+
+
+def test_split_order_by_category():
+    stations = split_order(kitchen_order(), kitchen_site())
+    assert {station: [instance.product.product_name for instance in products]
+            for station, products in stations.items()} == {"grill": ["Picanha à Brasileira"], "bar": ["Café"]}
+
+
+def test_unmapped_categories_only_on_the_receipt():
+    # "Sobremesas" is routed to a station without printer, "Entradas" to no station at all
+    stations = split_order(kitchen_order(), kitchen_site())
+    names = [instance.product.product_name for products in stations.values() for instance in products]
+    assert "Pudim" not in names and "Pão" not in names
+
+
+def test_site_without_stations():
+    assert split_order(kitchen_order(), Site(name="porto", printer_ip="127.0.0.1")) == {}
+    assert render_station_tickets(kitchen_order(), Site(name="porto", printer_ip="127.0.0.1")) == {}
+
+
+def test_render_station_tickets():
+    tickets = render_station_tickets(kitchen_order(), kitchen_site())
+    assert set(tickets) == {"grill", "bar"}
+    assert all(isinstance(ticket, bytes) and ticket for ticket in tickets.values())
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    import controllers.script
+    from controllers.script import ScriptController
+    from models.logger import Logger
+    from services.alerts import SilentAlert
+
+    monkeypatch.setattr(controllers.script, "OFFLINE_DIR", "")
+    monkeypatch.setattr(controllers.script, "RECEIPTS_DIR", "")
+    monkeypatch.setattr(controllers.script, "RETRY_DELAY", 0)
+    controller = ScriptController(kitchen_site("retry"), Logger(os.devnull), sound=SilentAlert())
+    controller.error_occurred = lambda message, log_message: None
+    return controller
+
+
+def test_partial_failure_resends_only_the_failed_station(controller, monkeypatch):
+    import controllers.script
+
+    failing = {"memory://retry-grill"}
+    send_ticket = controllers.script.send_ticket
+    monkeypatch.setattr(controllers.script, "send_ticket",
+                        lambda url, data, timeout=10: url not in failing and send_ticket(url, data))
+    jobs = lambda: {name: memory_sink(f"memory://retry-{name}").jobs for name in ("main", "grill", "bar")}
+    order = kitchen_order(7)
+
+    assert not controller.retry_print_operation(order)
+    assert jobs() == {"main": 1, "grill": 0, "bar": 1}
+    tickets = render_station_tickets(order, controller.site)
+    assert controller.part_sent(order.id, "bar", tickets["bar"])
+    assert not controller.part_sent(order.id, "grill", tickets["grill"])
+
+    failing.clear()
+    assert controller.retry_print_operation(order)
+    assert jobs() == {"main": 1, "grill": 1, "bar": 1}
+    assert order.id not in controller.sent_parts  # Forgotten once the whole order is out
+
+
+def test_part_sent_is_keyed_on_the_bytes(controller):
+    controller.mark_part_sent(7, "bar", b"ticket")
+    assert controller.part_sent(7, "bar", b"ticket")
+    assert not controller.part_sent(7, "bar", b"changed ticket")  # Changed order: sent again
+    assert not controller.part_sent(7, None, b"ticket")
+    controller.forget_parts(7)
+    assert not controller.part_sent(7, "bar", b"ticket")
@@ -1,5 +1,5 @@
-import requests
 from app.settings import MAX_ATTEMPTS
+from services.http import get_session
 
 def check_url(url: str) -> bool:
     """
@@ -16,17 +16,19 @@ def check_url(url: str) -> bool:
     Returns:
         bool: True if the URL is reachable (status code 200 received), False otherwise.
     """
+    from requests.exceptions import RequestException  # imported on first use, see services.http
+
     counter = 0
     status = False
     
     # Attempt to get a successful response.
     try:
         while not status and counter < MAX_ATTEMPTS:
-            response = requests.get(url, timeout=5)
+            response = get_session().get(url, timeout=5)
             if response.status_code == 200:
                 status = True
             counter += 1
-    except requests.exceptions.RequestException:
+    except RequestException:
         return False
     
     return status
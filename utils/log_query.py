@@ -0,0 +1,109 @@
+"""
+Streaming summaries of structured (LOG_FORMAT=json) log files.
+
+The file is read line by line and every stage keeps a fixed-size quantile sketch,
+so log files of any size can be summarised with constant memory.
+
+Usage:
+    python -m utils.log_query [log_file] [--order ORDER_ID] [--site SITE] [--since 2025-05-17T00:00]
+"""
+
+import sys
+import json
+import argparse
+from collections import defaultdict
+
+from app.settings import LOG_FILE
+from utils.quantiles import QuantileSketch
+
+
+def iter_events(filename: str, since: str = None, site: str = None):
+    """
+    Yields the JSON entries of a log file, skipping the text header and any non-JSON line.
+
+    Args:
+        filename (str): Path to the log file.
+        since (str): Optional ISO timestamp, older entries are skipped.
+        site (str): Optional site name, entries of other sites are skipped.
+
+    Yields:
+        dict: One log entry.
+    """
+    with open(filename, "r", encoding="UTF-8", errors="replace") as f:
+        for line in f:
+            if not line.startswith("{"):
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if since and entry.get("ts", "") < since:
+                continue
+            if site and entry.get("site") != site:
+                continue
+            yield entry
+
+
+def summarise(events) -> dict:
+    """
+    Summarises stage events: counts, failure rates and p50/p95/p99 durations per stage.
+
+    Args:
+        events (iterable): Log entries, usually from `iter_events`.
+
+    Returns:
+        dict: Keyed by stage name, each value holding "total", "failed", "failure_rate"
+              and the duration summary in milliseconds.
+    """
+    stages = defaultdict(lambda: {"total": 0, "failed": 0, "errors": defaultdict(int), "sketch": QuantileSketch()})
+
+    for entry in events:
+        stage = entry.get("stage")
+        if not stage:
+            continue
+        data = stages[stage]
+        data["total"] += 1
+        if entry.get("outcome") != "ok":
+            data["failed"] += 1
+            data["errors"][entry.get("error") or "failed"] += 1
+        if entry.get("duration_ms") is not None:
+            data["sketch"].add(entry["duration_ms"])
+
+    return {
+        stage: {
+            "total": data["total"],
+            "failed": data["failed"],
+            "failure_rate": data["failed"] / data["total"],
+            "errors": dict(data["errors"]),
+            "duration_ms": data["sketch"].summary()
+        }
+        for stage, data in stages.items()
+    }
+
+
+def order_timeline(events, order_id: int) -> list:
+    """
+    Returns every entry correlated to the given order id, in file order.
+    """
+    return [entry for entry in events if entry.get("order_id") == order_id]
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Resumo dos logs estruturados (LOG_FORMAT=json).")
+    parser.add_argument("log_file", nargs="?", default=LOG_FILE)
+    parser.add_argument("--order", type=int, help="Mostra apenas os eventos deste pedido")
+    parser.add_argument("--site", help="Mostra apenas os eventos deste site")
+    parser.add_argument("--since", help="Ignora entradas anteriores a este timestamp ISO")
+    args = parser.parse_args(argv)
+
+    events = iter_events(args.log_file, args.since, args.site)
+    if args.order is not None:
+        for entry in order_timeline(events, args.order):
+            print(json.dumps(entry, ensure_ascii=False))
+        return
+
+    print(json.dumps(summarise(events), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import math
+
+
+class P2Quantile:
+    """
+    Streaming estimate of a single quantile using the P² algorithm (Jain & Chlamtac).
+
+    Only five markers are kept, so memory stays constant no matter how many values are added.
+    The first five observations are stored as-is and the estimate is exact until then.
+
+    Attributes:
+        p (float): The quantile being estimated (e.g. 0.95).
+        count (int): Number of observations added so far.
+    """
+
+    def __init__(self, p: float):
+        """
+        Initializes the estimator.
+
+        Args:
+            p (float): The quantile to track, between 0 and 1 (exclusive).
+        """
+        if not 0 < p < 1:
+            raise ValueError("O quantil tem de estar entre 0 e 1.")
+        self.p = p
+        self.count = 0
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float):
+        """
+        Adds one observation to the estimate.
+
+        Args:
+            x (float): The observed value.
+        """
+        self.count += 1
+        h = self._heights
+
+        # Warm-up: keep the first five values sorted, they become the initial markers.
+        if len(h) < 5:
+            h.append(x)
+            h.sort()
+            return
+
+        # Find the cell k where x falls, extending the extreme markers if needed.
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= h[k + 1]:
+                k += 1
+
+        n = self._positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Adjust the three middle markers towards their desired positions.
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if h[i - 1] < candidate < h[i + 1]:
+                    h[i] = candidate
+                else:
+                    h[i] = self._linear(i, step)
+                n[i] += step
+
+    def _parabolic(self, i: int, d: int) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i: int, d: int) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + d * (h[i + d] - h[i]) / (n[i + d] - n[i])
+
+    def value(self):
+        """
+        Returns the current quantile estimate, or None if nothing was added yet.
+        """
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            # Nearest-rank on the (exact) warm-up sample.
+            index = max(0, math.ceil(self.p * self.count) - 1)
+            return self._heights[index]
+        return self._heights[2]
+
+
+class QuantileSketch:
+    """
+    Fixed-memory summary of a stream of values: count, min, max, mean and a set of quantiles.
+
+    Attributes:
+        quantiles (tuple): The quantiles tracked (defaults to p50, p95 and p99).
+        count (int): Number of observations.
+        total (float): Sum of all observations.
+        minimum (float): Smallest observation, or None.
+        maximum (float): Largest observation, or None.
+    """
+
+    def __init__(self, quantiles: tuple = (0.5, 0.95, 0.99)):
+        self.quantiles = tuple(quantiles)
+        self._estimators = [P2Quantile(q) for q in self.quantiles]
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, x: float):
+        """Adds one observation to every tracked quantile and to the running totals."""
+        self.count += 1
+        self.total += x
+        self.minimum = x if self.minimum is None else min(self.minimum, x)
+        self.maximum = x if self.maximum is None else max(self.maximum, x)
+        for estimator in self._estimators:
+            estimator.add(x)
+
+    def quantile(self, q: float):
+        """Returns the estimate for a tracked quantile q."""
+        return self._estimators[self.quantiles.index(q)].value()
+
+    def summary(self) -> dict:
+        """
+        Returns a JSON-friendly summary, with quantiles keyed as "p50", "p95", "p99", ...
+        """
+        data = {
+            "count": self.count,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": self.total / self.count if self.count else None,
+        }
+        for q, estimator in zip(self.quantiles, self._estimators):
+            data[f"p{q * 100:g}"] = estimator.value()
+        return data